@@ -0,0 +1,51 @@
+"""Benchmark: classic CAN vs CAN FD ISO-TP transfers"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.docan_bus import DoCAN
+
+PAYLOAD_SIZES = (64, 1024, 4095, 65536)
+FRAME_SIZES = (8, 16, 64)
+
+
+def bench_transfer(frame_size: int, payload_size: int, min_time: float = 0.2) -> tuple:
+    """Segment and reassemble one payload repeatedly; returns (frames, MB/s)"""
+    sender = DoCAN(frame_size, max_data_length=0xFFFFFFFF)
+    receiver = DoCAN(frame_size)
+    data = bytes(i & 0xFF for i in range(payload_size))
+    frame_count = len(sender.segment(data))
+    
+    transfers = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for frame in sender.segment(data):
+            receiver.reassemble(frame)
+        transfers += 1
+        elapsed = time.perf_counter() - start
+    return frame_count, payload_size * transfers / elapsed / 1e6
+
+
+def main():
+    """Run CAN FD benchmark"""
+    print("=" * 60)
+    print("Classic CAN vs CAN FD Transfer Benchmark (segment + reassemble)")
+    print("=" * 60)
+    
+    for payload_size in PAYLOAD_SIZES:
+        print(f"{payload_size}-byte payload:")
+        classic_frames = None
+        for frame_size in FRAME_SIZES:
+            frames, rate = bench_transfer(frame_size, payload_size)
+            classic_frames = classic_frames or frames
+            print(f"  {frame_size:2d}-byte frames: {frames:6d} frames "
+                  f"({classic_frames / frames:4.1f}x fewer), {rate:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: serial vs pooled parallel queries of a 100-ECU network"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.client import ClientPool
+from src.transport import ECUServer, VirtualCANBus
+from src.virtual_ecu import VirtualECU
+
+
+class LatencyBus(VirtualCANBus):
+    """Virtual bus with a fixed per-frame delivery delay"""
+    
+    def __init__(self, latency: float):
+        """Initialize bus"""
+        super().__init__()
+        self.latency = latency
+    
+    async def send(self, arbitration_id: int, data: bytes):
+        """Deliver the frame after the bus latency"""
+        await asyncio.sleep(self.latency)
+        await super().send(arbitration_id, data)
+
+
+async def bench_network(count: int, latency: float, parallel: bool) -> float:
+    """Read the VIN of every ECU and return the elapsed seconds"""
+    bus = LatencyBus(latency)
+    server = ECUServer(bus)
+    pool = ClientPool(bus)
+    for i in range(count):
+        ecu = VirtualECU(f"ECU_{i:04d}")
+        ecu.set_data_identifier(0xF190, f"VIN{i:014d}".encode())
+        server.add_ecu(ecu, 0x10000 + i, 0x20000 + i)
+        pool.connect(f"ECU_{i:04d}", 0x10000 + i, 0x20000 + i)
+    
+    async with server, pool:
+        start = time.perf_counter()
+        if parallel:
+            await pool.gather(lambda client: client.read_data_by_identifier(0xF190))
+        else:
+            for name in list(pool.clients):
+                await pool[name].read_data_by_identifier(0xF190)
+        return time.perf_counter() - start
+
+
+def main():
+    """Run client benchmark"""
+    print("=" * 60)
+    print("UDS Client Pool Benchmark (VIN read, 5 frames per ECU)")
+    print("=" * 60)
+    
+    for latency in (0.0, 0.001):
+        print(f"\nBus latency {latency * 1000:.0f} ms per frame:")
+        for count in (10, 100):
+            serial = asyncio.run(bench_network(count, latency, parallel=False))
+            parallel = asyncio.run(bench_network(count, latency, parallel=True))
+            print(f"  {count:4d} ECUs: serial {serial * 1000:8.1f} ms, "
+                  f"parallel {parallel * 1000:8.1f} ms ({serial / parallel:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark: instantiation time and memory of cloned ECU fleets"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.virtual_ecu import VirtualECU
+
+DID_COUNT = 500
+DTC_COUNT = 100
+
+
+def configure(ecu: VirtualECU) -> VirtualECU:
+    """Populate an ECU the imperative way"""
+    for i in range(DID_COUNT):
+        ecu.set_data_identifier(0x1000 + i, b"PART-%010d" % i)
+    for i in range(DTC_COUNT):
+        ecu.add_dtc(0xC00000 + i)
+    return ecu
+
+
+def measure(build, count: int) -> tuple:
+    """Return (seconds, bytes per ECU) for building ``count`` ECUs"""
+    gc.collect()
+    start = time.perf_counter()
+    fleet = [build(i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    del fleet
+    
+    gc.collect()
+    tracemalloc.start()
+    fleet = [build(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del fleet
+    return elapsed, size / count
+
+
+def main():
+    """Run clone benchmark"""
+    fleet_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    
+    print("=" * 60)
+    print(f"ECU Clone Benchmark ({DID_COUNT} DIDs, {DTC_COUNT} DTCs per ECU)")
+    print("=" * 60)
+    
+    template = configure(VirtualECU("TEMPLATE"))
+    naive_count = min(fleet_size, 1000)
+    
+    elapsed, per_ecu = measure(lambda i: configure(VirtualECU(f"ECU_{i:06d}")), naive_count)
+    print(f"Configured ECUs ({naive_count:,}):")
+    print(f"  {elapsed / naive_count * 1e6:8.1f} us/ECU, {per_ecu / 1024:8.1f} KiB/ECU "
+          f"(~{per_ecu * fleet_size / 2**20:,.0f} MiB for {fleet_size:,})")
+    
+    elapsed, per_ecu = measure(lambda i: template.clone(f"ECU_{i:06d}"), fleet_size)
+    print(f"Clones ({fleet_size:,}):")
+    print(f"  {elapsed / fleet_size * 1e6:8.1f} us/ECU, {per_ecu / 1024:8.1f} KiB/ECU "
+          f"({per_ecu * fleet_size / 2**20:,.0f} MiB total, {elapsed:.2f} s)")
+    
+    def written_clone(i):
+        clone = template.clone(f"ECU_{i:06d}")
+        clone.process_uds_request(b"\x2E\x10\x00" + b"%016d" % i)
+        clone.add_dtc(0xD00000 + i % 0x10000)
+        return clone
+    
+    elapsed, per_ecu = measure(written_clone, fleet_size)
+    print(f"Clones with one DID and one DTC written ({fleet_size:,}):")
+    print(f"  {elapsed / fleet_size * 1e6:8.1f} us/ECU, {per_ecu / 1024:8.1f} KiB/ECU "
+          f"({per_ecu * fleet_size / 2**20:,.0f} MiB total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark: concurrent testers on one ECU, channels vs a global lock"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.virtual_ecu import VirtualECU
+
+REQUESTS_PER_TESTER = 4000
+TESTER_COUNTS = (1, 2, 4, 8, 16, 32)
+
+
+def tester_frames(tester: int) -> list:
+    """Mixed traffic of one tester: mostly reads, one write in ten"""
+    frames = []
+    for i in range(REQUESTS_PER_TESTER):
+        if i % 10 == 9:
+            frames.append(bytes([0x05, 0x2E, 0x10, tester, i & 0xFF, 0x00]))
+        else:
+            frames.append(b"\x03\x22\x01\x00")
+    return frames
+
+
+def make_ecu() -> VirtualECU:
+    """ECU with the DIDs the testers read and write"""
+    ecu = VirtualECU("CONTENDED_ECU")
+    ecu.set_data_identifier(0x0100, b"\x12\x34")
+    for tester in range(max(TESTER_COUNTS)):
+        ecu.set_data_identifier(0x1000 | tester, b"\x00\x00")
+    return ecu
+
+
+def run_channels(testers: int, pool: ThreadPoolExecutor) -> float:
+    """Every tester on its own channel; returns requests per second"""
+    ecu = make_ecu()
+    requests = [(tester, frame) for tester in range(testers) for frame in tester_frames(tester)]
+    start = time.perf_counter()
+    ecu.process_concurrently(requests, pool)
+    return len(requests) / (time.perf_counter() - start)
+
+
+def run_global_lock(testers: int, pool: ThreadPoolExecutor) -> float:
+    """All testers on the ECU itself, serialized by one lock (the only safe option before)"""
+    ecu = make_ecu()
+    lock = threading.Lock()
+    
+    def serve(frames):
+        for frame in frames:
+            with lock:
+                ecu.process_frame(frame)
+    
+    work = [tester_frames(tester) for tester in range(testers)]
+    start = time.perf_counter()
+    for future in [pool.submit(serve, frames) for frames in work]:
+        future.result()
+    return testers * REQUESTS_PER_TESTER / (time.perf_counter() - start)
+
+
+def main():
+    """Run contention benchmark"""
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("=" * 60)
+    print(f"Concurrent Tester Benchmark ({'GIL' if gil else 'free-threaded'} build)")
+    print("=" * 60)
+    print(f"{'Testers':>8} {'Channels (req/s)':>18} {'Global lock (req/s)':>21}")
+    
+    with ThreadPoolExecutor(max_workers=max(TESTER_COUNTS)) as pool:
+        for testers in TESTER_COUNTS:
+            channels = run_channels(testers, pool)
+            locked = run_global_lock(testers, pool)
+            print(f"{testers:8d} {channels:18,.0f} {locked:21,.0f}")
+
+
+if __name__ == "__main__":
+    main()
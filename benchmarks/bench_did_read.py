@@ -0,0 +1,45 @@
+"""Benchmark: bulk multi-DID reads sent as segmented responses"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.virtual_ecu import VirtualECU
+
+
+def main():
+    """Run multi-DID read benchmark"""
+    print("=" * 60)
+    print("ReadDataByIdentifier Segmented Response Benchmark")
+    print("=" * 60)
+    
+    ecu = VirtualECU("BENCH_ECU")
+    flow_control = bytes([0x30, 0x00, 0x00])
+    for count, size in ((1, 17), (8, 32), (40, 96)):
+        dids = [0xF100 + i for i in range(count)]
+        for did in dids:
+            ecu.set_data_identifier(did, bytes(size))
+        request = bytes([0x22]) + b"".join(did.to_bytes(2, "big") for did in dids)
+        frames = ecu.docan.segment(request)
+        
+        iterations = 20000 // count
+        total_frames = 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for frame in frames:
+                response = ecu.process_frame(frame)
+            total_frames += len(response)
+            if response[0][0] >> 4 == 0x1:
+                total_frames += len(ecu.process_frame(flow_control))
+        elapsed = time.perf_counter() - start
+        
+        response_bytes = 1 + count * (2 + size)
+        print(f"  {count:3d} DIDs x {size:3d} bytes ({response_bytes:4d}-byte response): "
+              f"{iterations / elapsed:9,.0f} req/s  {total_frames / elapsed:11,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: DTC reads and clears with large DTC counts"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.virtual_ecu import VirtualECU
+
+
+def list_report(dtc_codes: list) -> bytes:
+    """Reference 0x19 0x02 serialization over a plain list"""
+    response = bytes([0x59, 0x02])
+    for dtc in dtc_codes:
+        response += dtc.to_bytes(3, "big") + b"\x00"
+    return response
+
+
+def timed(func, repeat: int) -> float:
+    """Return average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    """Run DTC store benchmark"""
+    print("=" * 60)
+    print("DTC Store Benchmark")
+    print("=" * 60)
+    
+    for count in (10, 1000, 100000):
+        ecu = VirtualECU("BENCH_ECU")
+        for i in range(count):
+            ecu.add_dtc(0x100000 + i, 0x09 if i % 2 else 0x04)
+        dtc_list = list(ecu.dtc_codes)
+        repeat = max(1, 10000 // count)
+        
+        old = timed(lambda: list_report(dtc_list), repeat) if count <= 1000 else float("nan")
+        report = timed(lambda: ecu._handle_report_dtc(b"\x02\x08"), repeat)
+        number = timed(lambda: ecu._handle_report_number_of_dtc(b"\x01\x08"), repeat)
+        print(f"  {count:6d} DTCs: list loop {old:9.3f} ms  report {report:9.3f} ms  "
+              f"count {number:7.3f} ms")
+    
+    start = time.perf_counter()
+    ecu._handle_clear_diagnostic_information(b"\xFF\xFF\xFF")
+    print(f"  clear 100000 DTCs: {(time.perf_counter() - start) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
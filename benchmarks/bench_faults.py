@@ -0,0 +1,69 @@
+"""Benchmark: cost of the seeded fault schedule and fault layer"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.faults import FaultInjector, FaultSchedule
+from src.virtual_ecu import VirtualECU
+
+DRAWS = 2_000_000
+RATES = {"drop": 0.005, "duplicate": 0.003, "reorder": 0.001, "wrong_sequence": 0.001}
+
+
+def per_frame_draw(rng: random.Random, kinds: list, weights: list):
+    """Fault for one frame, drawing a random number per frame (baseline)"""
+    if rng.random() < 0.01:
+        return rng.choices(kinds, weights)[0]
+    return None
+
+
+def bench_transfers(ecu: VirtualECU, transfers: int = 5000) -> float:
+    """Read a 4 KiB DID repeatedly and return ECU frames per second"""
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(transfers):
+        frames += len(ecu.process_frame(b"\x03\x22\xF1\x90"))
+        frames += len(ecu.process_frame(b"\x30\x00\x00"))
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    """Run fault injection benchmark"""
+    print("=" * 60)
+    print("Fault Injection Benchmark (1% of frames faulty)")
+    print("=" * 60)
+    
+    schedule = FaultSchedule(RATES, seed=1)
+    draw = schedule.draw
+    start = time.perf_counter()
+    for _ in range(DRAWS):
+        draw()
+    scheduled = DRAWS / (time.perf_counter() - start)
+    
+    rng = random.Random(1)
+    kinds, weights = list(RATES), list(RATES.values())
+    start = time.perf_counter()
+    for _ in range(DRAWS):
+        per_frame_draw(rng, kinds, weights)
+    baseline = DRAWS / (time.perf_counter() - start)
+    
+    print(f"Block schedule:   {scheduled:12,.0f} frames/s")
+    print(f"Per-frame random: {baseline:12,.0f} frames/s ({scheduled / baseline:.1f}x)")
+    
+    ecu = VirtualECU("BENCH_ECU")
+    ecu.set_data_identifier(0xF190, bytes(4000))
+    clean = bench_transfers(ecu)
+    FaultInjector(seed=1, **RATES).install(ecu)
+    faulty = bench_transfers(ecu)
+    print(f"Frame path, no fault layer: {clean:12,.0f} frames/s")
+    print(f"Frame path, fault layer:    {faulty:12,.0f} frames/s "
+          f"({(clean / faulty - 1) * 100:.0f}% overhead)")
+
+
+if __name__ == "__main__":
+    main()
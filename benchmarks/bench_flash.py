@@ -0,0 +1,68 @@
+"""Benchmark: streaming flash download throughput"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.flash import FlashMemory, FlashTransfer
+from src.virtual_ecu import VirtualECU
+
+IMAGE_SIZE = 16 * 1024 * 1024
+
+
+def download(ecu, image: bytes, block: int, frames: bool) -> float:
+    """Download an image and return the elapsed time"""
+    request = bytes([0x34, 0x00, 0x44, 0, 0, 0, 0]) + len(image).to_bytes(4, "big")
+    flow_control = bytes([0x30, 0x00, 0x00])
+    start = time.perf_counter()
+    ecu.process_uds_request(request)
+    for i, offset in enumerate(range(0, len(image), block)):
+        transfer = bytes([0x36, (i + 1) & 0xFF]) + image[offset:offset + block]
+        if frames:
+            # Tester side: segment the request and send it frame by frame
+            segments = ecu.docan.segment(transfer)
+            ecu.process_frame(segments[0])
+            for frame in segments[1:]:
+                ecu.process_frame(frame)
+            if ecu.docan.transmitting:
+                ecu.process_frame(flow_control)
+        else:
+            ecu.process_uds_request(transfer)
+    response = ecu.process_uds_request(b"\x37")
+    elapsed = time.perf_counter() - start
+    assert response[0] == 0x77, response
+    return elapsed
+
+
+def main():
+    """Run flash throughput benchmark"""
+    print("=" * 60)
+    print("Flash Transfer Throughput Benchmark")
+    print("=" * 60)
+    
+    image = os.urandom(IMAGE_SIZE)
+    with tempfile.TemporaryDirectory() as tmp:
+        for hash_algorithm in (None, "sha256"):
+            memory = FlashMemory(os.path.join(tmp, "flash.bin"), IMAGE_SIZE)
+            ecu = VirtualECU("BENCH_ECU")
+            FlashTransfer(memory, hash_algorithm=hash_algorithm).install(ecu)
+            label = hash_algorithm or "crc32"
+            
+            for block in (254, 1022, 4093):
+                elapsed = download(ecu, image, block, frames=False)
+                print(f"  UDS level,   {block:4d}-byte blocks, {label:6s}: "
+                      f"{IMAGE_SIZE / elapsed / 1e6:8.1f} MB/s")
+            
+            elapsed = download(ecu, image[:IMAGE_SIZE // 16], 4093, frames=True)
+            print(f"  Frame level, 4093-byte blocks, {label:6s}: "
+                  f"{IMAGE_SIZE / 16 / elapsed / 1e6:8.1f} MB/s")
+            memory.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark: frame codec allocations and speed (dict/bytes vs Frame/pack_into)"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.docan_bus import DoCAN, Frame
+
+FRAMES = 100000
+
+RAW_FRAMES = [
+    bytes([0x03, 0x22, 0xF1, 0x90]),
+    bytes([0x10, 0x14, 0x62, 0xF1, 0x90, 0x57, 0x56, 0x57]),
+    bytes([0x21, 0x5A, 0x5A, 0x5A, 0x31, 0x4A, 0x5A, 0x58]),
+    bytes([0x30, 0x00, 0x00]),
+] * (FRAMES // 4)
+
+
+def legacy_create_single_frame(data: bytes) -> bytes:
+    """Single frame built as before: list -> bytes, then concatenation"""
+    return bytes([len(data)]) + data
+
+
+def allocations(run) -> tuple:
+    """Memory blocks and bytes still held per frame after ``run``"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = run()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del kept
+    return blocks / FRAMES, size / FRAMES
+
+
+def timed(run) -> float:
+    """Frames per second for ``run``"""
+    start = time.perf_counter()
+    run()
+    return FRAMES / (time.perf_counter() - start)
+
+
+def main():
+    """Run frame codec benchmark"""
+    print("=" * 60)
+    print("Frame Codec Allocation Benchmark")
+    print("=" * 60)
+    
+    docan = DoCAN()
+    frame = Frame()
+    buffer = bytearray(8 * FRAMES)
+    payload = bytes([0x62, 0xF1, 0x90])
+    
+    cases = {
+        "parse_frame -> dict": lambda: [docan.parse_frame(raw) for raw in RAW_FRAMES],
+        "decode -> new Frame": lambda: [docan.decode(raw) for raw in RAW_FRAMES],
+        "decode into Frame": lambda: [docan.decode(raw, frame) for raw in RAW_FRAMES],
+        "legacy bytes([pci]) + data": lambda: [legacy_create_single_frame(payload)
+                                               for _ in range(FRAMES)],
+        "create_single_frame": lambda: [docan.create_single_frame(payload) for _ in range(FRAMES)],
+        "pack_single_frame_into": lambda: [docan.pack_single_frame_into(buffer, i * 8, payload)
+                                           for i in range(FRAMES)],
+    }
+    
+    # The list comprehension itself keeps one pointer per frame (~8 bytes);
+    # anything beyond that is allocated by the codec.
+    for name, run in cases.items():
+        blocks, size = allocations(run)
+        rate = max(timed(run) for _ in range(3))
+        print(f"  {name:28s} {blocks:5.2f} blocks/frame {size:7.1f} B/frame {rate:11,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark: gateway routing rate as the ECU count grows"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.gateway import Gateway
+from src.virtual_ecu import VirtualECU
+
+
+def build_gateway(count: int) -> Gateway:
+    """Create a gateway with ``count`` ECUs"""
+    gateway = Gateway()
+    for i in range(count):
+        ecu = VirtualECU(f"ECU_{i:04d}")
+        ecu.set_data_identifier(0xF190, b"\x01\x02")
+        gateway.add_ecu(ecu, 0x1000 + i, 0x2000 + i)
+    return gateway
+
+
+def main():
+    """Run gateway benchmark"""
+    print("=" * 60)
+    print("Gateway Routing Benchmark")
+    print("=" * 60)
+    
+    frame = bytes([0x03, 0x22, 0xF1, 0x90])
+    for count in (10, 50, 150, 500):
+        gateway = build_gateway(count)
+        route = gateway.route
+        frames = 100000
+        
+        start = time.perf_counter()
+        for i in range(frames):
+            route(0x1000 + i % count, frame)
+        physical = frames / (time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        for _ in range(200):
+            route(Gateway.OBD_FUNCTIONAL_ID, frame)
+        functional = 200 * count / (time.perf_counter() - start)
+        
+        print(f"  {count:4d} ECUs: physical {physical:10,.0f} frames/s, "
+              f"functional {functional:10,.0f} responses/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: import time of the core and optional modules (python -X importtime)"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+MODULES = ("src.virtual_ecu", "src.metrics", "src.ecu_profile", "src.transport", "src.client",
+           "src.sharding")
+RUNS = 5
+
+
+def import_time_us(module: str) -> int:
+    """Best cumulative import time of ``module`` in fresh interpreters, in microseconds"""
+    best = None
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                micros = int(fields[1])
+                best = micros if best is None else min(best, micros)
+    return best
+
+
+def spawn_time(code: str) -> float:
+    """Best wall time of a fresh interpreter running ``code``, in seconds"""
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run import time benchmark"""
+    print("=" * 60)
+    print(f"Import Time Benchmark (best of {RUNS} fresh interpreters)")
+    print("=" * 60)
+    
+    for module in MODULES:
+        print(f"{module:18s} {import_time_us(module) / 1000:8.1f} ms")
+    
+    bare = spawn_time("pass")
+    worker = spawn_time("from src.virtual_ecu import VirtualECU; VirtualECU()")
+    print(f"Bare interpreter start:       {bare * 1000:8.1f} ms")
+    print(f"Worker start (one VirtualECU): {worker * 1000:7.1f} ms "
+          f"(+{(worker - bare) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
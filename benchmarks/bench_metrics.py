@@ -0,0 +1,64 @@
+"""Benchmark: instrumentation overhead on the request path"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.virtual_ecu import VirtualECU
+
+ITERATIONS = 200000
+
+REQUESTS = {
+    "TesterPresent": bytes([0x02, 0x3E, 0x00]),
+    "ReadDataByIdentifier": bytes([0x03, 0x22, 0xF1, 0x90]),
+    "Unsupported (NRC)": bytes([0x01, 0xFF]),
+}
+
+
+def measure(ecu, request: bytes) -> float:
+    """Seconds per process_request call"""
+    process_request = ecu.process_request
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        process_request(request)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main():
+    """Run metrics overhead benchmark"""
+    print("=" * 60)
+    print("Metrics Overhead Benchmark")
+    print("=" * 60)
+    
+    ecu = VirtualECU("BENCH_ECU")
+    ecu.set_data_identifier(0xF190, b"\x01\x02")
+    
+    for name, request in REQUESTS.items():
+        ecu.disable_metrics()
+        disabled = min(measure(ecu, request) for _ in range(3))
+        ecu.enable_metrics()
+        enabled = min(measure(ecu, request) for _ in range(3))
+        print(f"  {name:22s} disabled {disabled * 1e9:6.0f} ns  enabled {enabled * 1e9:6.0f} ns "
+              f"(+{(enabled - disabled) * 1e9:4.0f} ns, {enabled / disabled - 1:+6.1%})")
+    
+    frames = bytes([0x02, 0x3E, 0x00, 0, 0, 0, 0, 0]) * ITERATIONS
+    for enabled in (False, True):
+        if enabled:
+            ecu.enable_metrics()
+        else:
+            ecu.disable_metrics()
+        start = time.perf_counter()
+        ecu.process_many(frames)
+        elapsed = time.perf_counter() - start
+        label = "enabled" if enabled else "disabled"
+        print(f"  process_many, {label:8s}    {ITERATIONS / elapsed:11,.0f} frames/s")
+    
+    print()
+    print(ecu.metrics.to_prometheus().splitlines()[2])
+
+
+if __name__ == "__main__":
+    main()
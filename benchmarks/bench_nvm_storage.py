@@ -0,0 +1,58 @@
+"""Benchmark: ECU cold start from an NVM image vs. DID dict population"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.nvm_storage import NVMImage
+from src.virtual_ecu import VirtualECU
+
+
+def main():
+    """Run NVM cold-start benchmark"""
+    print("=" * 60)
+    print("NVM Image Cold Start Benchmark")
+    print("=" * 60)
+    
+    count = 10000
+    dids = {0x1000 + i: i.to_bytes(4, "big") * 4 for i in range(count)}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "ecu.nvm")
+        NVMImage.build(path, dids, [(0xC00000 + i, 0x09) for i in range(1000)]).close()
+        
+        start = time.perf_counter()
+        ecu = VirtualECU("DICT_ECU")
+        for did, value in dids.items():
+            ecu.set_data_identifier(did, value)
+        for i in range(1000):
+            ecu.add_dtc(0xC00000 + i)
+        populate = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        image = NVMImage(path)
+        nvm_ecu = image.attach(VirtualECU("NVM_ECU"))
+        open_time = (time.perf_counter() - start) * 1000
+        
+        request = bytes([0x03, 0x22, 0x10, 0x20])
+        start = time.perf_counter()
+        for _ in range(100000):
+            nvm_ecu.process_request(request)
+        nvm_read = (time.perf_counter() - start) * 10
+        start = time.perf_counter()
+        for _ in range(100000):
+            ecu.process_request(request)
+        dict_read = (time.perf_counter() - start) * 10
+        image.close()
+    
+    print(f"  dict population ({count} DIDs, 1000 DTCs): {populate:8.2f} ms")
+    print(f"  NVM image open + attach (incl. DTCs):   {open_time:8.2f} ms")
+    print(f"  0x22 read: dict {dict_read:.2f} us, NVM {nvm_read:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark: spawning an ECU fleet from one declarative profile"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import ecu_profile
+from src.ecu_profile import ECUProfile, load_profile, parse_profile
+
+FLEET_SIZE = 1000
+DID_COUNT = 500
+DTC_COUNT = 200
+
+
+def make_document() -> dict:
+    """Profile with many DIDs of mixed encodings and DTCs"""
+    dids = {}
+    for i in range(DID_COUNT):
+        if i % 3 == 0:
+            dids[f"0x{0x1000 + i:04X}"] = {"type": "ascii", "value": f"PART-{i:06d}", "length": 16}
+        elif i % 3 == 1:
+            dids[f"0x{0x1000 + i:04X}"] = {"type": "uint16", "value": i * 0.5, "scale": 0.01}
+        else:
+            dids[f"0x{0x1000 + i:04X}"] = {"type": "hex", "value": f"{i:08X}"}
+    return {
+        "name": "BENCH",
+        "services": ["0x10", "0x14", "0x19", "0x22", "0x27", "0x2E", "0x3E"],
+        "security": {"levels": [1, 2]},
+        "dids": dids,
+        "dtcs": {f"0x{0xC00000 + i:06X}": "0x09" for i in range(DTC_COUNT)},
+    }
+
+
+def main():
+    """Run profile benchmark"""
+    print("=" * 60)
+    print(f"ECU Profile Benchmark ({DID_COUNT} DIDs, {DTC_COUNT} DTCs, {FLEET_SIZE} ECUs)")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "bench.json"
+        path.write_text(json.dumps(make_document()))
+        data = path.read_bytes()
+        cache_dir = str(Path(directory) / "cache")
+        
+        start = time.perf_counter()
+        for i in range(FLEET_SIZE):
+            ECUProfile.compile(parse_profile(data, ".json")).spawn(f"ECU_{i:04d}")
+        reparse = time.perf_counter() - start
+        print(f"Parse + compile per ECU:   {reparse * 1000:9.1f} ms")
+        
+        start = time.perf_counter()
+        load_profile(str(path), cache_dir)
+        cold = time.perf_counter() - start
+        
+        ecu_profile._compiled.clear()
+        start = time.perf_counter()
+        profile = load_profile(str(path), cache_dir)
+        warm = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        load_profile(str(path), cache_dir)
+        memo = time.perf_counter() - start
+        print(f"Load, compile and cache:   {cold * 1000:9.3f} ms")
+        print(f"Load from disk cache:      {warm * 1000:9.3f} ms")
+        print(f"Load compiled in process:  {memo * 1000:9.3f} ms")
+        
+        start = time.perf_counter()
+        ecus = [profile.spawn(f"ECU_{i:04d}") for i in range(FLEET_SIZE)]
+        spawn = time.perf_counter() - start
+        print(f"Spawn from shared profile: {spawn * 1000:9.1f} ms ({reparse / spawn:.1f}x faster)")
+        
+        shared = all(
+            ecu.data_identifiers[did] is value
+            for ecu in ecus for did, value in profile.data_identifiers.items()
+        )
+        print(f"DID values shared by all ECUs: {shared}")
+
+
+if __name__ == "__main__":
+    main()
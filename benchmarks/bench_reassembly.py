@@ -0,0 +1,40 @@
+"""Benchmark: DoCAN multi-frame reassembly throughput"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.docan_bus import DoCAN
+
+
+def bench_reassembly(payload_size: int = 4095, transfers: int = 2000) -> float:
+    """Reassemble repeated transfers and return frames per second"""
+    docan = DoCAN()
+    frames = docan.segment(bytes(i & 0xFF for i in range(payload_size)))
+    reassemble = docan.reassemble
+    
+    start = time.perf_counter()
+    for _ in range(transfers):
+        for frame in frames:
+            reassemble(frame)
+    elapsed = time.perf_counter() - start
+    
+    return len(frames) * transfers / elapsed
+
+
+def main():
+    """Run reassembly benchmark"""
+    print("=" * 60)
+    print("DoCAN Reassembly Benchmark")
+    print("=" * 60)
+    
+    for size in (64, 1024, 4095):
+        rate = bench_reassembly(size)
+        print(f"  {size:5d}-byte payload: {rate:12,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark: read-service response cache on repeated tester polling"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.virtual_ecu import VirtualECU
+
+ROUNDS = 2000
+DTC_COUNT = 500
+
+# A tester polling loop: a multi-DID read and a DTC report, repeated
+POLL = [
+    b"\x07\x22\x01\x00\x01\x01\x01\x02",
+    b"\x03\x19\x02\xFF",
+    b"\x03\x22\xF1\x90",
+]
+
+
+def make_ecu(cached: bool) -> VirtualECU:
+    """ECU with a few DIDs and a large DTC table"""
+    ecu = VirtualECU("POLLED_ECU")
+    ecu.set_data_identifier(0x0100, b"\x12\x34")
+    ecu.set_data_identifier(0x0101, b"\x56")
+    ecu.set_data_identifier(0x0102, bytes(range(3)))
+    for i in range(DTC_COUNT):
+        ecu.add_dtc(0x100000 + i, 0x08)
+    ecu.enable_metrics()
+    if cached:
+        ecu.enable_response_cache()
+    return ecu
+
+
+def bench(ecu: VirtualECU) -> float:
+    """Serve the polling loop; returns requests per second"""
+    requests = POLL * ROUNDS
+    start = time.perf_counter()
+    for request in requests:
+        ecu.process_request(request)
+    return len(requests) / (time.perf_counter() - start)
+
+
+def main():
+    """Run response cache benchmark"""
+    print("=" * 60)
+    print(f"Response Cache Benchmark ({DTC_COUNT} DTCs, {len(POLL)}-request poll)")
+    print("=" * 60)
+    
+    uncached_ecu = make_ecu(cached=False)
+    cached_ecu = make_ecu(cached=True)
+    uncached = bench(uncached_ecu)
+    cached = bench(cached_ecu)
+    print(f"Uncached: {uncached:12,.0f} req/s")
+    print(f"Cached:   {cached:12,.0f} req/s ({cached / uncached:.1f}x)")
+    print(f"Hit ratio: {cached_ecu.response_cache.hit_ratio:.3f}")
+    
+    for sid in ("0x22", "0x19"):
+        before = uncached_ecu.metrics.snapshot()["services"][sid]["latency_seconds"]["p50"]
+        after = cached_ecu.metrics.snapshot()["services"][sid]["latency_seconds"]["p50"]
+        print(f"Service {sid} p50 latency: {before * 1e6:8.1f} us -> {after * 1e6:8.1f} us")
+    
+    # Every poll round invalidated by a DID write: the cache's worst case
+    ecu = make_ecu(cached=True)
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        ecu.set_data_identifier(0x0101, bytes([i & 0xFF]))
+        for request in POLL:
+            ecu.process_request(request)
+    churn = len(POLL) * ROUNDS / (time.perf_counter() - start)
+    print(f"Write every round: {churn:12,.0f} req/s (hit ratio {ecu.response_cache.hit_ratio:.3f})")
+
+
+if __name__ == "__main__":
+    main()
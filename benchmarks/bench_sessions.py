@@ -0,0 +1,76 @@
+"""Benchmark: session timers for a large ECU fleet on one timer wheel"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.timer_wheel import TimerWheel
+from src.virtual_ecu import VirtualECU
+
+FLEET_SIZE = 10000
+
+
+class FakeClock:
+    """Manually advanced clock so the benchmark does not sleep"""
+    
+    def __init__(self):
+        """Start at zero"""
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        """Current time"""
+        return self.now
+
+
+def main():
+    """Run session timer benchmark"""
+    print("=" * 60)
+    print("Session Timer Wheel Benchmark")
+    print("=" * 60)
+    
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    ecus = [VirtualECU(f"ECU_{i:05d}", timers=wheel) for i in range(FLEET_SIZE)]
+    
+    start = time.perf_counter()
+    for ecu in ecus:
+        ecu.process_uds_request(b"\x10\x03")
+    elapsed = time.perf_counter() - start
+    print(f"  Enter extended session:      {FLEET_SIZE / elapsed:11,.0f} ECUs/s "
+          f"({len(wheel)} timers on one wheel)")
+    
+    # TesterPresent from every tester once a second for 30 s
+    requests = 0
+    start = time.perf_counter()
+    for second in range(1, 31):
+        clock.now = float(second)
+        for ecu in ecus:
+            ecu.process_uds_request(b"\x3E\x80")
+        requests += FLEET_SIZE
+    elapsed = time.perf_counter() - start
+    active = sum(ecu.session.session == 0x03 for ecu in ecus)
+    print(f"  TesterPresent (S3 restart):  {requests / elapsed:11,.0f} req/s "
+          f"({active} sessions kept)")
+    
+    clock.now = 40.0
+    start = time.perf_counter()
+    fired = wheel.advance()
+    elapsed = time.perf_counter() - start
+    active = sum(ecu.session.session == 0x03 for ecu in ecus)
+    print(f"  S3 expiry of the fleet:      {fired / elapsed:11,.0f} timers/s "
+          f"({active} sessions left)")
+    
+    idle = TimerWheel(clock=clock)
+    idle.schedule(3600.0, lambda: None)
+    start = time.perf_counter()
+    for tick in range(1, 100001):
+        idle.advance(40.0 + tick * idle.tick)
+    elapsed = time.perf_counter() - start
+    print(f"  Advance one tick:            {100000 / elapsed:11,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark: sharded ECU fleet throughput vs. worker count"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.sharding import ShardedRuntime
+from src.virtual_ecu import VirtualECU
+
+
+def make_ecu(ecu_id: str) -> VirtualECU:
+    """Create a fleet ECU"""
+    ecu = VirtualECU(ecu_id)
+    ecu.set_data_identifier(0xF190, b"\x01\x02\x03\x04")
+    return ecu
+
+
+def main():
+    """Run sharding benchmark"""
+    print("=" * 60)
+    print("Sharded Runtime Benchmark")
+    print("=" * 60)
+    
+    ecu_ids = [f"ECU_{i:04d}" for i in range(256)]
+    count = 400000
+    targets = [ecu_ids[i % len(ecu_ids)] for i in range(count)]
+    frames = bytes([0x03, 0x22, 0xF1, 0x90, 0, 0, 0, 0]) * count
+    
+    ecus = {ecu_id: make_ecu(ecu_id) for ecu_id in ecu_ids}
+    start = time.perf_counter()
+    for i, ecu_id in enumerate(targets):
+        ecus[ecu_id].process_request(frames[i * 8:i * 8 + 8])
+    baseline = count / (time.perf_counter() - start)
+    print(f"  single process: {baseline:12,.0f} frames/s")
+    
+    cores = os.cpu_count() or 1
+    for workers in sorted({1, 2, 4, cores}):
+        with ShardedRuntime(ecu_ids, make_ecu, workers=workers) as runtime:
+            runtime.process(targets[:1000], frames[:8000])  # Warm up
+            start = time.perf_counter()
+            runtime.process(targets, frames)
+            rate = count / (time.perf_counter() - start)
+        print(f"  {workers:3d} workers:    {rate:12,.0f} frames/s ({rate / baseline:.2f}x)")
+    print(f"  ({cores} CPU cores available)")
+
+
+if __name__ == "__main__":
+    main()
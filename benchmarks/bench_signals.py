@@ -0,0 +1,105 @@
+"""Benchmark: lazy DID providers vs pushing live values into the DID table"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.signals import DataProviders, Sine
+from src.virtual_ecu import VirtualECU
+
+SIGNALS = 20
+SIMULATED_SECONDS = 5
+UPDATE_PERIOD = 0.001  # Background updates at 1 kHz
+READ_PERIOD = 0.1  # Tester polls every signal at 10 Hz
+READS = 200_000
+
+
+class SimulatedClock:
+    """Clock set by the simulation loop"""
+    
+    def __init__(self):
+        """Start at zero"""
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        """Current simulated time"""
+        return self.now
+
+
+def read_requests() -> list:
+    """One ReadDataByIdentifier per signal"""
+    return [bytes([0x03, 0x22, 0x0C, did]) for did in range(SIGNALS)]
+
+
+def run_pushed() -> float:
+    """Signals written with set_data_identifier at 1 kHz; returns wall seconds"""
+    ecu = VirtualECU("PUSHED_ECU")
+    waves = [Sine(amplitude=1000.0, period=1.0 + did, offset=2000.0) for did in range(SIGNALS)]
+    requests = read_requests()
+    updates_per_read = round(READ_PERIOD / UPDATE_PERIOD)
+    start = time.perf_counter()
+    t = 0.0
+    for _ in range(round(SIMULATED_SECONDS / READ_PERIOD)):
+        for _ in range(updates_per_read):
+            t += UPDATE_PERIOD
+            for did, wave in enumerate(waves):
+                ecu.set_data_identifier(0x0C00 + did, round(wave(t)).to_bytes(2, "big"))
+        for request in requests:
+            ecu.process_request(request)
+    return time.perf_counter() - start
+
+
+def run_lazy() -> float:
+    """Signals computed by providers on read; returns wall seconds"""
+    ecu = VirtualECU("LAZY_ECU")
+    clock = SimulatedClock()
+    signals = DataProviders(clock).install(ecu)
+    for did in range(SIGNALS):
+        signals.register(0x0C00 + did, Sine(amplitude=1000.0, period=1.0 + did, offset=2000.0),
+                         "uint16")
+    requests = read_requests()
+    start = time.perf_counter()
+    for _ in range(round(SIMULATED_SECONDS / READ_PERIOD)):
+        clock.now += READ_PERIOD
+        for request in requests:
+            ecu.process_request(request)
+    return time.perf_counter() - start
+
+
+def bench_reads(ecu: VirtualECU) -> float:
+    """Read DID 0x0C00 repeatedly; returns reads per second"""
+    process = ecu.process_request
+    start = time.perf_counter()
+    for _ in range(READS):
+        process(b"\x03\x22\x0C\x00")
+    return READS / (time.perf_counter() - start)
+
+
+def main():
+    """Run signal provider benchmark"""
+    print("=" * 60)
+    print(f"Live Signal Benchmark ({SIGNALS} signals, {SIMULATED_SECONDS} s simulated)")
+    print("=" * 60)
+    
+    pushed = run_pushed()
+    lazy = run_lazy()
+    print(f"Pushed at 1 kHz:   {pushed * 1000:8.1f} ms")
+    print(f"Lazy providers:    {lazy * 1000:8.1f} ms ({pushed / lazy:.0f}x less work)")
+    
+    static = VirtualECU("STATIC_ECU")
+    static.set_data_identifier(0x0C00, b"\x07\xD0")
+    provided = VirtualECU("PROVIDED_ECU")
+    DataProviders().install(provided).register(0x0C00, Sine(1000.0, 1.0, 2000.0), "uint16")
+    cached = VirtualECU("TTL_ECU")
+    DataProviders().install(cached).register(0x0C00, Sine(1000.0, 1.0, 2000.0), "uint16",
+                                             ttl=0.01)
+    print(f"Static DID read:         {bench_reads(static):10,.0f} reads/s")
+    print(f"Provided DID read:       {bench_reads(provided):10,.0f} reads/s")
+    print(f"Provided DID, 10 ms TTL: {bench_reads(cached):10,.0f} reads/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark: streaming replay of a large candump trace"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.trace import TracePlayer, read_candump
+from src.virtual_ecu import VirtualECU
+
+# Frame count can be overridden on the command line, e.g. bench_trace.py 1000000
+DEFAULT_FRAMES = 10_000_000
+
+# Request / vehicle-response pattern repeated through the trace
+PATTERN = (
+    "7E0#023E00",
+    "7E8#027E00",
+    "7E0#0322F190",
+    "7E8#100B62F190574D57",
+    "7E0#300000",
+    "7E0#0322F187",
+    "7E0#021901",
+    "7E0#0322F190",
+)
+
+
+def write_trace(path: str, frames: int):
+    """Write a candump log of ``frames`` lines"""
+    with open(path, "w", buffering=1 << 20) as fh:
+        for i in range(frames):
+            fh.write(f"({1700000000 + i * 0.0005:.6f}) can0 {PATTERN[i % len(PATTERN)]}\n")
+
+
+def main():
+    """Run trace replay benchmark"""
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FRAMES
+    print("=" * 60)
+    print("Trace Replay Benchmark")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        trace = os.path.join(tmp, "trace.log")
+        recording = os.path.join(tmp, "responses.rec")
+        
+        start = time.perf_counter()
+        write_trace(trace, frames)
+        print(f"  Wrote {frames:,} frames in {time.perf_counter() - start:.1f} s "
+              f"({os.path.getsize(trace) / 1e6:,.0f} MB)")
+        
+        start = time.perf_counter()
+        parsed = sum(1 for _ in read_candump(trace))
+        elapsed = time.perf_counter() - start
+        print(f"  Parse only:          {parsed / elapsed:11,.0f} frames/s")
+        
+        ecu = VirtualECU("BENCH_ECU")
+        ecu.set_data_identifier(0xF190, b"WVWZZZ1JZXW000001")
+        ecu.set_data_identifier(0xF187, b"SW-01")
+        player = TracePlayer.for_ecu(ecu, 0x7E0, 0x7E8)
+        
+        start = time.perf_counter()
+        written = player.record(read_candump(trace), recording)
+        elapsed = time.perf_counter() - start
+        print(f"  Replay + record:     {player.frames_in / elapsed:11,.0f} frames/s "
+              f"({written:,} responses, {os.path.getsize(recording) / 1e6:,.0f} MB)")
+    
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"  Peak RSS:            {peak:11,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark: concurrent testers against an asyncio ECU server"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.transport import ECUServer, IsoTpChannel, VirtualCANBus
+from src.virtual_ecu import VirtualECU
+
+
+async def bench_testers(count: int, requests: int = 200) -> float:
+    """Run ``count`` concurrent testers and return round trips per second"""
+    bus = VirtualCANBus()
+    server = ECUServer(bus)
+    testers = []
+    for i in range(count):
+        ecu = VirtualECU(f"ECU_{i:04d}")
+        ecu.set_data_identifier(0xF190, b"\x01\x02")
+        server.add_ecu(ecu, 0x10000 + i, 0x20000 + i)
+        testers.append(IsoTpChannel(bus, 0x20000 + i, 0x10000 + i))
+    
+    async def run_tester(tester):
+        for _ in range(requests):
+            await tester.request(b"\x22\xF1\x90", timeout=1)
+    
+    async with server:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_tester(tester) for tester in testers))
+        elapsed = time.perf_counter() - start
+    return count * requests / elapsed
+
+
+def main():
+    """Run transport benchmark"""
+    print("=" * 60)
+    print("Asyncio Transport Benchmark")
+    print("=" * 60)
+    
+    for count in (1, 10, 100, 500):
+        rate = asyncio.run(bench_testers(count))
+        print(f"  {count:4d} testers: {rate:10,.0f} round trips/s")
+
+
+if __name__ == "__main__":
+    main()
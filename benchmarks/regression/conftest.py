@@ -0,0 +1,38 @@
+"""Fixtures for the performance regression suite
+
+The suite runs on pytest-benchmark; without it the modules are not collected.
+Save a baseline with ``--benchmark-save`` and compare later runs with
+``--benchmark-compare --benchmark-compare-fail=mean:10%`` (see ``make perf``).
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path so we can import src
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.virtual_ecu import VirtualECU
+
+if importlib.util.find_spec("pytest_benchmark") is None:
+    collect_ignore_glob = ["test_*.py"]
+
+
+@pytest.fixture
+def ecu():
+    """ECU with a VIN and a short DID"""
+    ecu = VirtualECU("PERF_ECU")
+    ecu.set_data_identifier(0xF190, b"WVWZZZ1JZXW000001")
+    ecu.set_data_identifier(0x0102, b"\x12\x34")
+    return ecu
+
+
+@pytest.fixture(params=[10, 1000, 100000], ids=lambda count: f"{count}_dtcs")
+def dtc_ecu(request):
+    """ECU holding 10, 1k or 100k DTCs with mixed status bytes"""
+    ecu = VirtualECU("PERF_DTC_ECU")
+    for i in range(request.param):
+        ecu.add_dtc(0x100000 + i, 0x09 if i % 3 else 0x04)
+    return ecu
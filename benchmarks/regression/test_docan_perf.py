@@ -0,0 +1,55 @@
+"""Performance regression tests for DoCAN frame handling"""
+
+import pytest
+from src.docan_bus import DoCAN
+
+FRAMES = {
+    "single": bytes([0x03, 0x22, 0xF1, 0x90]),
+    "first": bytes([0x10, 0x14, 0x62, 0xF1, 0x90, 0x57, 0x56, 0x57]),
+    "consecutive": bytes([0x21, 0x5A, 0x5A, 0x5A, 0x31, 0x4A, 0x5A, 0x58]),
+    "flow_control": bytes([0x30, 0x00, 0x00]),
+}
+
+
+class TestDoCANPerformance:
+    """Benchmarks for DoCAN"""
+    
+    @pytest.fixture
+    def docan(self):
+        """Create DoCAN instance"""
+        return DoCAN()
+    
+    @pytest.mark.parametrize("kind", FRAMES)
+    def test_parse_frame(self, benchmark, docan, kind):
+        """Benchmark parse_frame per frame type"""
+        result = benchmark(docan.parse_frame, FRAMES[kind])
+        assert "error" not in result
+    
+    def test_create_single_frame(self, benchmark, docan):
+        """Benchmark create_single_frame"""
+        benchmark(docan.create_single_frame, bytes([0x22, 0xF1, 0x90]))
+    
+    def test_create_first_frame(self, benchmark, docan):
+        """Benchmark create_first_frame"""
+        benchmark(docan.create_first_frame, bytes(range(20)), 20)
+    
+    def test_create_consecutive_frame(self, benchmark, docan):
+        """Benchmark create_consecutive_frame"""
+        benchmark(docan.create_consecutive_frame, bytes(range(7)), 1)
+    
+    def test_create_flow_control_frame(self, benchmark, docan):
+        """Benchmark create_flow_control_frame"""
+        benchmark(docan.create_flow_control_frame, DoCAN.FC_CONTINUE_TO_SEND, 8, 0)
+    
+    @pytest.mark.parametrize("length", [20, 4095])
+    def test_reassembly(self, benchmark, docan, length):
+        """Benchmark reassembling a multi-frame message"""
+        frames = docan.segment(bytes(length))
+        reassemble = docan.reassemble
+        
+        def run():
+            for frame in frames:
+                result = reassemble(frame)
+            return result
+        
+        assert len(benchmark(run)["data"]) == length
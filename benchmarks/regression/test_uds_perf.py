@@ -0,0 +1,50 @@
+"""Performance regression tests for UDS request handling"""
+
+import pytest
+from src.uds_protocol import UDSProtocol
+
+SERVICE_REQUESTS = {
+    "tester_present": bytes([0x02, 0x3E, 0x00]),
+    "session_control": bytes([0x02, 0x10, 0x03]),
+    "read_did": bytes([0x03, 0x22, 0xF1, 0x90]),
+    "read_multi_did": bytes([0x05, 0x22, 0x01, 0x02, 0xF1, 0x90]),
+    "write_did": bytes([0x05, 0x2E, 0x01, 0x02, 0xAB, 0xCD]),
+    "dtc_count": bytes([0x03, 0x19, 0x01, 0xFF]),
+    "dtc_report": bytes([0x03, 0x19, 0x02, 0xFF]),
+    "clear_dtc": bytes([0x04, 0x14, 0xFF, 0xFF, 0xFF]),
+    "unsupported": bytes([0x01, 0xFF]),
+}
+
+
+class TestUDSPerformance:
+    """Benchmarks for UDS parsing and per-service request handling"""
+    
+    def test_parse_request(self, benchmark):
+        """Benchmark UDSProtocol.parse_request"""
+        uds = UDSProtocol()
+        result = benchmark(uds.parse_request, bytes([0x22, 0xF1, 0x90]))
+        assert result["service_id"] == 0x22
+    
+    @pytest.mark.parametrize("service", SERVICE_REQUESTS)
+    def test_process_request(self, benchmark, ecu, service):
+        """Benchmark VirtualECU.process_request per service"""
+        response = benchmark(ecu.process_request, SERVICE_REQUESTS[service])
+        assert response
+    
+    def test_read_did_segmented(self, benchmark, ecu):
+        """Benchmark a segmented DID response including the Flow Control round trip"""
+        def run():
+            ecu.process_frame(bytes([0x03, 0x22, 0xF1, 0x90]))
+            return ecu.process_frame(bytes([0x30, 0x00, 0x00]))
+        
+        assert len(benchmark(run)) == 2
+    
+    def test_dtc_count(self, benchmark, dtc_ecu):
+        """Benchmark reportNumberOfDTCByStatusMask"""
+        response = benchmark(dtc_ecu.process_uds_request, bytes([0x19, 0x01, 0x08]))
+        assert response[0] == 0x59
+    
+    def test_dtc_report(self, benchmark, dtc_ecu):
+        """Benchmark reportDTCByStatusMask (UDS level; large reports exceed one DoCAN message)"""
+        response = benchmark(dtc_ecu.process_uds_request, bytes([0x19, 0x02, 0x08]))
+        assert response[0] == 0x59
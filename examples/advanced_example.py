@@ -7,18 +7,33 @@ import time
 # Add parent directory to path so we can import src
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.docan_bus import DoCAN
 from src.virtual_ecu import VirtualECU
 
 
 class DiagnosticClient:
     """Simulated diagnostic client"""
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, tester_address: int):
         self.name = name
+        self.tester_address = tester_address
     
     def send_request(self, ecu: VirtualECU, request: bytes) -> bytes:
-        """Send request to ECU"""
-        return ecu.process_request(request)
+        """Send request to ECU on this tester's channel (own session and reassembly)"""
+        return ecu.channel(self.tester_address).process_request(request)
+    
+    def read_message(self, ecu: VirtualECU, request: bytes) -> bytes:
+        """Send a single-frame request and reassemble the full UDS response"""
+        channel = ecu.channel(self.tester_address)
+        frames = channel.process_frame(request)
+        if frames and frames[0][0] >> 4 == DoCAN.FIRST_FRAME:
+            frames += channel.process_frame(bytes([0x30, 0x00, 0x00]))  # Flow control
+        
+        receiver = DoCAN()
+        result = {}
+        for frame in frames:
+            result = receiver.reassemble(frame)
+        return bytes(result.get("data", b""))
     
     def test_session(self, ecu: VirtualECU):
         """Test diagnostic session"""
@@ -47,22 +62,22 @@ class DiagnosticClient:
         
         for did, name in dids_to_read:
             request = bytes([0x03, 0x22, (did >> 8) & 0xFF, did & 0xFF])
-            response = self.send_request(ecu, request)
-            data = response[4:] if len(response) > 4 else b""
+            response = self.read_message(ecu, request)
+            data = response[3:] if response[:1] == b"\x62" else b""
             print(f"    → {name} (0x{did:04X}): {data.hex().upper()}")
     
     def read_dtcs(self, ecu: VirtualECU):
         """Read diagnostic trouble codes"""
         print(f"\n[{self.name}] Reading DTCs...")
         
-        request = bytes([0x02, 0x19, 0x01])
+        request = bytes([0x03, 0x19, 0x01, 0xFF])
         response = self.send_request(ecu, request)
-        num_dtcs = response[3] if len(response) > 3 else 0
+        num_dtcs = int.from_bytes(response[5:7], "big") if len(response) > 6 else 0
         print(f"    → Total DTCs: {num_dtcs}")
         
         if num_dtcs > 0:
-            request = bytes([0x02, 0x19, 0x02])
-            response = self.send_request(ecu, request)
+            request = bytes([0x03, 0x19, 0x02, 0xFF])
+            response = self.read_message(ecu, request)
             print(f"    → DTC Data: {response.hex().upper()}")
 
 
@@ -88,11 +103,12 @@ def main():
     
     # Create diagnostic clients
     clients = [
-        DiagnosticClient("Scanner_1"),
-        DiagnosticClient("Programmer"),
+        DiagnosticClient("Scanner_1", 0xF1),
+        DiagnosticClient("Programmer", 0xF2),
     ]
     
-    # Run diagnostics
+    # Run diagnostics; each client talks on its own channel, so they could
+    # also run in parallel threads
     for client in clients:
         client.test_session(ecu)
         client.read_vehicle_data(ecu)
@@ -6,6 +6,7 @@ from pathlib import Path
 # Add parent directory to path so we can import src
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.docan_bus import DoCAN
 from src.virtual_ecu import VirtualECU
 
 
@@ -52,18 +53,24 @@ def main():
     # Test 3: Read Data By Identifier
     print("\n[3] Read Data By Identifier (0x22)")
     request = bytes([0x03, 0x22, 0x01, 0x02])  # Read DID 0x0102
-    response = ecu.process_request(request)
+    frames = ecu.process_frame(request)
+    if frames[0][0] >> 4 == DoCAN.FIRST_FRAME:
+        # Long response: send Flow Control to receive the Consecutive Frames
+        frames += ecu.process_frame(bytes([0x30, 0x00, 0x00]))
+    tester = DoCAN()
+    for frame in frames:
+        response = tester.reassemble(frame)
     print(f"    Request:  {request.hex().upper()}")
-    print(f"    Response: {response.hex().upper()}")
-    print(f"    Data: {response[4:].decode('ascii', errors='ignore')}")
+    print(f"    Response: {' '.join(frame.hex().upper() for frame in frames)}")
+    print(f"    Data: {response['data'][3:].decode('ascii', errors='ignore')}")
     
     # Test 4: Read DTC Information
     print("\n[4] Read DTC Information (0x19)")
-    request = bytes([0x02, 0x19, 0x01])  # Read number of DTCs
+    request = bytes([0x03, 0x19, 0x01, 0xFF])  # Read number of DTCs, any status
     response = ecu.process_request(request)
     print(f"    Request:  {request.hex().upper()}")
     print(f"    Response: {response.hex().upper()}")
-    num_dtcs = response[3]
+    num_dtcs = int.from_bytes(response[5:7], "big")
     print(f"    DTCs Available: {num_dtcs}")
     
     print("\n" + "=" * 60)
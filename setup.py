@@ -28,13 +28,24 @@ setup(
         "Topic :: Communications",
     ],
     python_requires=">=3.8",
-    install_requires=[
-        "python-can>=3.3.0",
-    ],
+    # The core (VirtualECU, DoCAN, UDS) has no third-party dependencies
+    install_requires=[],
     extras_require={
+        "can": [
+            "python-can>=3.3.0",
+        ],
+        "numpy": [
+            "numpy>=1.17",
+        ],
+        "yaml": [
+            "PyYAML>=5.1",
+        ],
         "dev": [
             "pytest>=6.0",
             "pytest-cov>=2.10",
+            "pytest-benchmark>=3.4",
+            "python-can>=3.3.0",
+            "PyYAML>=5.1",
             "black>=21.0",
             "flake8>=3.9",
             "mypy>=0.900",
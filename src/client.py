@@ -0,0 +1,288 @@
+"""Tester-side UDS Client with ISO-TP Channel Pool"""
+
+import asyncio
+import zlib
+from typing import NamedTuple, Optional
+
+from .transport import IsoTpChannel, IsoTpConfig
+
+NRC_RESPONSE_PENDING = 0x78
+
+NRC_NAMES = {
+    0x10: "generalReject",
+    0x11: "serviceNotSupported",
+    0x12: "subFunctionNotSupported",
+    0x13: "incorrectMessageLengthOrInvalidFormat",
+    0x14: "responseTooLong",
+    0x22: "conditionsNotCorrect",
+    0x24: "requestSequenceError",
+    0x31: "requestOutOfRange",
+    0x33: "securityAccessDenied",
+    0x35: "invalidKey",
+    0x36: "exceedNumberOfAttempts",
+    0x37: "requiredTimeDelayNotExpired",
+    0x70: "uploadDownloadNotAccepted",
+    0x71: "transferDataSuspended",
+    0x72: "generalProgrammingFailure",
+    0x73: "wrongBlockSequenceCounter",
+    0x78: "requestCorrectlyReceivedResponsePending",
+    0x7E: "subFunctionNotSupportedInActiveSession",
+    0x7F: "serviceNotSupportedInActiveSession",
+}
+
+
+class UDSClientError(Exception):
+    """Malformed or unexpected response from the ECU"""
+
+
+class NegativeResponseError(UDSClientError):
+    """ECU answered with a negative response"""
+    
+    def __init__(self, service_id: int, nrc: int):
+        """Initialize from the request SID and the NRC"""
+        self.service_id = service_id
+        self.nrc = nrc
+        name = NRC_NAMES.get(nrc, "unknown")
+        super().__init__(f"Service 0x{service_id:02X} rejected: NRC 0x{nrc:02X} ({name})")
+
+
+class ServiceNotSupportedError(NegativeResponseError):
+    """NRC 0x11 / 0x12 / 0x7E / 0x7F"""
+
+
+class IncorrectLengthError(NegativeResponseError):
+    """NRC 0x13"""
+
+
+class ConditionsNotCorrectError(NegativeResponseError):
+    """NRC 0x22 / 0x24"""
+
+
+class RequestOutOfRangeError(NegativeResponseError):
+    """NRC 0x31"""
+
+
+class SecurityAccessError(NegativeResponseError):
+    """NRC 0x33 / 0x35 / 0x36 / 0x37"""
+
+
+class TransferError(NegativeResponseError):
+    """NRC 0x70 - 0x73"""
+
+
+NRC_EXCEPTIONS = {
+    0x11: ServiceNotSupportedError,
+    0x12: ServiceNotSupportedError,
+    0x7E: ServiceNotSupportedError,
+    0x7F: ServiceNotSupportedError,
+    0x13: IncorrectLengthError,
+    0x22: ConditionsNotCorrectError,
+    0x24: ConditionsNotCorrectError,
+    0x31: RequestOutOfRangeError,
+    0x33: SecurityAccessError,
+    0x35: SecurityAccessError,
+    0x36: SecurityAccessError,
+    0x37: SecurityAccessError,
+    0x70: TransferError,
+    0x71: TransferError,
+    0x72: TransferError,
+    0x73: TransferError,
+}
+
+
+class SessionTiming(NamedTuple):
+    """DiagnosticSessionControl positive response"""
+    session: int
+    p2_server: float
+    p2_star_server: float
+
+
+class UDSClient:
+    """Typed UDS requests over one ISO-TP channel
+    
+    Requests on one client are serialized (one outstanding request per
+    ECU); requests to different ECUs run concurrently. Negative responses
+    raise a ``NegativeResponseError`` subclass, and ResponsePending (NRC
+    0x78) extends the wait to ``p2_star`` per pending message.
+    """
+    
+    def __init__(self, channel: IsoTpChannel, timeout: float = 1.0, p2_star: float = 5.0):
+        """Initialize client on an open channel"""
+        self.channel = channel
+        self.timeout = timeout
+        self.p2_star = p2_star
+        self._lock = asyncio.Lock()
+    
+    async def request(self, data: bytes) -> bytes:
+        """Send a raw request and return the positive response"""
+        service_id = data[0]
+        async with self._lock:
+            await self.channel.send(data)
+            timeout = self.timeout
+            while True:
+                response = await self.channel.recv(timeout)
+                if response[:1] == b"\x7F" and len(response) >= 3:
+                    if response[2] == NRC_RESPONSE_PENDING:
+                        timeout = self.p2_star
+                        continue
+                    error = NRC_EXCEPTIONS.get(response[2], NegativeResponseError)
+                    raise error(service_id, response[2])
+                if response[:1] != bytes([service_id + 0x40]):
+                    raise UDSClientError(f"Unexpected response to 0x{service_id:02X}: "
+                                         f"{response.hex()}")
+                return response
+    
+    async def diagnostic_session_control(self, session: int) -> SessionTiming:
+        """Switch diagnostic session (0x10)"""
+        response = await self.request(bytes([0x10, session]))
+        if len(response) >= 6:
+            p2 = int.from_bytes(response[2:4], "big") / 1000
+            p2_star = int.from_bytes(response[4:6], "big") / 100
+            return SessionTiming(response[1], p2, p2_star)
+        return SessionTiming(response[1], 0.0, 0.0)
+    
+    async def tester_present(self):
+        """Keep the session alive (0x3E)"""
+        await self.request(b"\x3E\x00")
+    
+    async def request_seed(self, level: int = 1) -> bytes:
+        """SecurityAccess requestSeed (0x27, odd sub-function)"""
+        response = await self.request(bytes([0x27, 2 * level - 1]))
+        return response[2:]
+    
+    async def send_key(self, level: int, key: bytes):
+        """SecurityAccess sendKey (0x27, even sub-function)"""
+        await self.request(bytes([0x27, 2 * level]) + key)
+    
+    async def unlock(self, level: int, key_function):
+        """Request a seed and answer with ``key_function(seed, level)``"""
+        seed = await self.request_seed(level)
+        if any(seed):
+            await self.send_key(level, key_function(seed, level))
+    
+    async def read_data_by_identifier(self, did: int) -> bytes:
+        """Read one DID (0x22) and return its value"""
+        response = await self.request(b"\x22" + did.to_bytes(2, "big"))
+        if int.from_bytes(response[1:3], "big") != did:
+            raise UDSClientError(f"Response is for DID 0x{response[1:3].hex()}, not 0x{did:04X}")
+        return response[3:]
+    
+    async def read_data_by_identifiers(self, lengths: dict) -> dict:
+        """Read several DIDs in one request (0x22)
+        
+        ``lengths`` maps each DID to its value length, which is needed to
+        split the response. DIDs the ECU does not support are left out.
+        """
+        request = b"\x22" + b"".join(did.to_bytes(2, "big") for did in lengths)
+        response = await self.request(request)
+        values = {}
+        offset = 1
+        while offset < len(response):
+            did = int.from_bytes(response[offset:offset + 2], "big")
+            if did not in lengths:
+                raise UDSClientError(f"Unexpected DID 0x{did:04X} in response")
+            values[did] = response[offset + 2:offset + 2 + lengths[did]]
+            offset += 2 + lengths[did]
+        return values
+    
+    async def write_data_by_identifier(self, did: int, value: bytes):
+        """Write one DID (0x2E)"""
+        await self.request(b"\x2E" + did.to_bytes(2, "big") + value)
+    
+    async def read_dtc_count(self, status_mask: int = 0xFF) -> int:
+        """reportNumberOfDTCByStatusMask (0x19 0x01)"""
+        response = await self.request(bytes([0x19, 0x01, status_mask]))
+        return int.from_bytes(response[4:6], "big")
+    
+    async def read_dtcs(self, status_mask: int = 0xFF) -> dict:
+        """reportDTCByStatusMask (0x19 0x02) as ``{dtc: status}``"""
+        response = await self.request(bytes([0x19, 0x02, status_mask]))
+        return {
+            int.from_bytes(response[offset:offset + 3], "big"): response[offset + 3]
+            for offset in range(3, len(response) - 3, 4)
+        }
+    
+    async def clear_diagnostic_information(self, group: int = 0xFFFFFF):
+        """ClearDiagnosticInformation (0x14)"""
+        await self.request(b"\x14" + group.to_bytes(3, "big"))
+    
+    async def download(self, address: int, data: bytes, address_length: int = 4,
+                       size_length: int = 4):
+        """Flash ``data`` with RequestDownload / TransferData / RequestTransferExit
+        
+        RequestTransferExit carries the CRC-32 of ``data`` so the ECU
+        rejects a corrupted image with NRC 0x72.
+        """
+        request = (bytes([0x34, 0x00, size_length << 4 | address_length])
+                   + address.to_bytes(address_length, "big")
+                   + len(data).to_bytes(size_length, "big"))
+        response = await self.request(request)
+        length_size = response[1] >> 4
+        block = int.from_bytes(response[2:2 + length_size], "big") - 2
+        
+        view = memoryview(data)
+        for index, offset in enumerate(range(0, len(data), block)):
+            sequence = (index + 1) & 0xFF
+            await self.request(bytes([0x36, sequence]) + view[offset:offset + block])
+        await self.request(b"\x37" + zlib.crc32(data).to_bytes(4, "big"))
+    
+    def close(self):
+        """Close the channel"""
+        self.channel.close()
+
+
+class ClientPool:
+    """UDS clients for many ECUs on one bus
+    
+    ``gather`` runs one coroutine per ECU concurrently, so querying a
+    network takes about as long as its slowest ECU rather than the sum.
+    """
+    
+    def __init__(self, bus, config: Optional[IsoTpConfig] = None, timeout: float = 1.0):
+        """Initialize empty pool"""
+        self.bus = bus
+        self.config = config or IsoTpConfig()
+        self.timeout = timeout
+        self.clients: dict = {}
+    
+    def connect(self, name: str, request_id: int, response_id: int) -> UDSClient:
+        """Open a client for the ECU on a request / response ID pair"""
+        if name in self.clients:
+            raise ValueError(f"Client {name} is already connected")
+        channel = IsoTpChannel(self.bus, response_id, request_id, self.config)
+        client = self.clients[name] = UDSClient(channel, self.timeout)
+        return client
+    
+    def __getitem__(self, name: str) -> UDSClient:
+        """Client for an ECU"""
+        return self.clients[name]
+    
+    def __len__(self) -> int:
+        """Number of connected ECUs"""
+        return len(self.clients)
+    
+    async def gather(self, operation, names=None) -> dict:
+        """Run ``operation(client)`` against many ECUs concurrently
+        
+        Returns ``{name: result}``; an ECU whose operation failed maps to
+        the exception instead.
+        """
+        names = list(self.clients) if names is None else list(names)
+        results = await asyncio.gather(
+            *(operation(self.clients[name]) for name in names), return_exceptions=True
+        )
+        return dict(zip(names, results))
+    
+    def close(self):
+        """Close every client"""
+        for client in self.clients.values():
+            client.close()
+        self.clients = {}
+    
+    async def __aenter__(self):
+        """Return the pool"""
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        """Close the pool"""
+        self.close()
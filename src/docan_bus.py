@@ -1,9 +1,93 @@
 """DoCAN (ISO 15765-2) Bus Implementation"""
 
 import struct
+from enum import IntEnum
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from .metrics import Metrics  # metrics imports this module
+
+
+class FrameType(IntEnum):
+    """DoCAN frame types (high nibble of the first N_PCI byte)"""
+    SINGLE_FRAME = 0x0
+    FIRST_FRAME = 0x1
+    CONSECUTIVE_FRAME = 0x2
+    FLOW_CONTROL = 0x3
+
+
+# Frame type names used by the dict API and metrics
+FRAME_TYPE_NAMES = ("SingleFrame", "FirstFrame", "ConsecutiveFrame", "FlowControl")
+_FRAME_TYPES = tuple(FrameType)
+
+# Precompiled N_PCI codecs
+SF_PCI = struct.Struct("B")
+FF_PCI = struct.Struct(">H")
+CF_PCI = struct.Struct("B")
+FC_FRAME = struct.Struct("BBB")
+
+# One-byte N_PCI values, prebuilt so frames are built with a single concatenation
+_PCI_BYTES = tuple(bytes([value]) for value in range(256))
+
+# Escape sequences (ISO 15765-2:2016): SF_DL in the second byte, 32-bit FF_DL
+SF_ESCAPE_PCI = struct.Struct("BB")
+FF_ESCAPE_PCI = struct.Struct(">HI")
+
+# CAN FD data lengths (DLC 8-15); classic CAN frames carry 8 bytes
+CAN_FD_FRAME_SIZES = (8, 12, 16, 20, 24, 32, 48, 64)
+
+
+class Frame:
+    """Decoded DoCAN frame
+    
+    ``DoCAN.decode`` can refill one instance for every frame, so parsing
+    does not allocate a result per frame. The payload is kept as offsets
+    into the raw frame and only sliced when ``data`` is read.
+    """
+    
+    __slots__ = ("frame_type", "length", "sequence_number", "flow_status", "block_size",
+                 "st_min", "raw", "data_start", "data_end")
+    
+    def __init__(self):
+        """Initialize empty frame"""
+        self.frame_type = FrameType.SINGLE_FRAME
+        self.length = 0
+        self.sequence_number = 0
+        self.flow_status = 0
+        self.block_size = 0
+        self.st_min = 0
+        self.raw = b""
+        self.data_start = 0
+        self.data_end = 0
+    
+    @property
+    def data(self) -> bytes:
+        """Payload bytes carried by the frame"""
+        return self.raw[self.data_start:self.data_end]
+    
+    def to_dict(self) -> dict:
+        """Dict form returned by ``DoCAN.parse_frame``"""
+        frame_type = self.frame_type
+        name = FRAME_TYPE_NAMES[frame_type]
+        if frame_type == FrameType.CONSECUTIVE_FRAME:
+            return {"type": name, "seq_num": self.sequence_number, "data": self.data}
+        if frame_type == FrameType.FLOW_CONTROL:
+            return {"type": name, "flow_status": self.flow_status,
+                    "block_size": self.block_size, "st_min": self.st_min}
+        return {"type": name, "length": self.length, "data": self.data}
+
 
 class DoCAN:
-    """DoCAN (ISO 15765-2) Protocol Implementation"""
+    """DoCAN (ISO 15765-2) Protocol Implementation
+    
+    ``frame_size`` is the CAN frame data length: 8 for classic CAN or a CAN
+    FD length up to 64. CAN FD single frames longer than 7 bytes carry
+    their length in the second byte (SF escape), and messages longer than
+    4095 bytes start with a First Frame carrying a 32-bit length (FF_DL
+    escape). ``max_data_length`` defaults to 4095 on classic CAN and to the
+    32-bit limit on CAN FD. Received frames are decoded by their own length
+    and PCI, whatever the local frame size.
+    """
     
     # Frame types
     SINGLE_FRAME = 0x0
@@ -11,59 +95,345 @@ class DoCAN:
     CONSECUTIVE_FRAME = 0x2
     FLOW_CONTROL_FRAME = 0x3
     
-    # DoCAN header format
+    # Flow control status
+    FC_CONTINUE_TO_SEND = 0x0
+    FC_WAIT = 0x1
+    FC_OVERFLOW = 0x2
+    
+    # Classic CAN framing (instances use frame_size and the lowercase limits)
     DOCAN_HEADER_SIZE = 8  # PCI bytes
     DOCAN_MAX_DATA_LENGTH = 4095  # 12-bit length field
+    SF_MAX_DATA_LENGTH = 7
+    FF_DATA_LENGTH = 6
+    CF_DATA_LENGTH = 7
     
-    def __init__(self):
+    def __init__(self, frame_size: int = 8, max_data_length: Optional[int] = None):
         """Initialize DoCAN handler"""
+        if frame_size not in CAN_FD_FRAME_SIZES:
+            raise ValueError(f"Frame size must be one of {CAN_FD_FRAME_SIZES}")
+        self.frame_size = frame_size
+        self.sf_max_data_length = 7 if frame_size == 8 else frame_size - 2
+        self.ff_data_length = frame_size - 2
+        self.cf_data_length = frame_size - 1
+        if max_data_length is None:
+            max_data_length = self.DOCAN_MAX_DATA_LENGTH if frame_size == 8 else 0xFFFFFFFF
+        self.max_data_length = max_data_length
         self.buffer = bytearray()
         self.expected_length = 0
         self.sequence_number = 0
+        self._received = 0
+        self._tx_view: Optional[memoryview] = None
+        self._tx_offset = 0
+        self._tx_sequence = 0
+        self.metrics: Optional["Metrics"] = None  # Metrics counting frames by type, if enabled
+        self._parsed = Frame()
         
     def create_single_frame(self, data: bytes) -> bytes:
-        """Create a DoCAN single frame"""
-        if len(data) > 7:
+        """Create a DoCAN single frame (escaped for CAN FD payloads over 7 bytes)"""
+        length = len(data)
+        if length <= 7:
+            return _PCI_BYTES[length] + data
+        if length > self.sf_max_data_length:
+            raise ValueError(f"Single frame data must be <= {self.sf_max_data_length} bytes")
+        return SF_ESCAPE_PCI.pack(0x00, length) + data
+    
+    def create_first_frame(self, data: Union[bytes, memoryview], length: int) -> bytes:
+        """Create a DoCAN first frame (32-bit FF_DL escape above 4095 bytes)"""
+        if length > self.DOCAN_MAX_DATA_LENGTH:
+            return FF_ESCAPE_PCI.pack(0x1000, length) + data[:self.frame_size - 6]
+        return FF_PCI.pack(0x1000 | length) + data[:self.ff_data_length]
+    
+    def create_consecutive_frame(self, data: Union[bytes, memoryview], seq_num: int) -> bytes:
+        """Create a DoCAN consecutive frame"""
+        return _PCI_BYTES[0x20 | (seq_num & 0x0F)] + data[:self.cf_data_length]
+    
+    def _first_frame_data_length(self, length: int) -> int:
+        """Payload bytes carried by the First Frame of a ``length``-byte message"""
+        if length > self.DOCAN_MAX_DATA_LENGTH:
+            return self.frame_size - 6
+        return self.ff_data_length
+    
+    def create_flow_control_frame(self, flow_status: int = FC_CONTINUE_TO_SEND,
+                                  block_size: int = 0, st_min: int = 0) -> bytes:
+        """Create a DoCAN flow control frame"""
+        if self.metrics is not None:
+            self.metrics.frames_sent[self.FLOW_CONTROL_FRAME] += 1
+        return FC_FRAME.pack(0x30 | (flow_status & 0x0F), block_size & 0xFF, st_min & 0xFF)
+    
+    @staticmethod
+    def pack_single_frame_into(buffer, offset: int, data) -> int:
+        """Write a classic CAN single frame into ``buffer`` at ``offset``; returns its size"""
+        length = len(data)
+        if length > 7:
             raise ValueError("Single frame data must be <= 7 bytes")
+        SF_PCI.pack_into(buffer, offset, length)
+        buffer[offset + 1:offset + 1 + length] = data
+        return 1 + length
+    
+    @staticmethod
+    def pack_first_frame_into(buffer, offset: int, data, length: int) -> int:
+        """Write a classic CAN first frame into ``buffer`` at ``offset``; returns its size
         
-        pci = self.SINGLE_FRAME << 4 | len(data)
-        return bytes([pci]) + data
+        Lengths above 4095 bytes use the 32-bit FF_DL escape, which leaves
+        room for two payload bytes in the 8-byte frame.
+        """
+        if not 7 < length <= 0xFFFFFFFF:
+            raise ValueError("First frame length must be 8..4294967295 bytes")
+        if length > DoCAN.DOCAN_MAX_DATA_LENGTH:
+            FF_ESCAPE_PCI.pack_into(buffer, offset, 0x1000, length)
+            header = FF_ESCAPE_PCI.size
+        else:
+            FF_PCI.pack_into(buffer, offset, 0x1000 | length)
+            header = FF_PCI.size
+        chunk = min(len(data), 8 - header)
+        buffer[offset + header:offset + header + chunk] = data[:chunk]
+        return header + chunk
     
-    def create_first_frame(self, data: bytes, length: int) -> bytes:
-        """Create a DoCAN first frame"""
-        pci_byte1 = (self.FIRST_FRAME << 4) | ((length >> 8) & 0x0F)
-        pci_byte2 = length & 0xFF
-        payload = data[:6]
-        return bytes([pci_byte1, pci_byte2]) + payload
+    @staticmethod
+    def pack_consecutive_frame_into(buffer, offset: int, data, seq_num: int) -> int:
+        """Write a classic CAN consecutive frame into ``buffer`` at ``offset``; returns its size"""
+        CF_PCI.pack_into(buffer, offset, 0x20 | (seq_num & 0x0F))
+        chunk = min(len(data), 7)
+        buffer[offset + 1:offset + 1 + chunk] = data[:chunk]
+        return 1 + chunk
     
-    def create_consecutive_frame(self, data: bytes, seq_num: int) -> bytes:
-        """Create a DoCAN consecutive frame"""
-        pci = (self.CONSECUTIVE_FRAME << 4) | (seq_num & 0x0F)
-        payload = data[:7]
-        return bytes([pci]) + payload
+    @staticmethod
+    def pack_flow_control_frame_into(buffer, offset: int, flow_status: int = FC_CONTINUE_TO_SEND,
+                                     block_size: int = 0, st_min: int = 0) -> int:
+        """Write a flow control frame into ``buffer`` at ``offset``; returns its size"""
+        FC_FRAME.pack_into(buffer, offset, 0x30 | (flow_status & 0x0F),
+                           block_size & 0xFF, st_min & 0xFF)
+        return FC_FRAME.size
     
-    def parse_frame(self, frame: bytes) -> dict:
-        """Parse a DoCAN frame"""
+    def segment(self, data: bytes) -> list:
+        """Split a payload into a single frame or first + consecutive frames"""
+        length = len(data)
+        if length <= self.sf_max_data_length:
+            return [self.create_single_frame(bytes(data))]
+        if length > self.max_data_length:
+            raise ValueError(f"Payload must be <= {self.max_data_length} bytes")
+        
+        view = memoryview(data)
+        first = self._first_frame_data_length(length)
+        step = self.cf_data_length
+        frames = [self.create_first_frame(view[:first], length)]
+        seq_num = 1
+        for offset in range(first, length, step):
+            frames.append(self.create_consecutive_frame(view[offset:offset + step], seq_num))
+            seq_num = (seq_num + 1) & 0x0F
+        return frames
+    
+    def start_transmission(self, data: bytes) -> bytes:
+        """Begin sending a message and return its first frame
+        
+        Short messages go out as a single frame. Longer ones return the
+        First Frame; the rest of ``data`` is kept as a ``memoryview`` and
+        sliced into Consecutive Frames as Flow Control frames arrive.
+        """
+        self._tx_view = None
+        length = len(data)
+        if length <= self.sf_max_data_length:
+            if self.metrics is not None:
+                self.metrics.frames_sent[self.SINGLE_FRAME] += 1
+            return self.create_single_frame(bytes(data))
+        if length > self.max_data_length:
+            raise ValueError(f"Payload must be <= {self.max_data_length} bytes")
+        
+        if self.metrics is not None:
+            self.metrics.frames_sent[self.FIRST_FRAME] += 1
+        view = memoryview(data)
+        first = self._first_frame_data_length(length)
+        self._tx_view = view
+        self._tx_offset = first
+        self._tx_sequence = 1
+        return self.create_first_frame(view[:first], length)
+    
+    def handle_flow_control(self, frame: bytes) -> list:
+        """Return the Consecutive Frames released by a Flow Control frame"""
+        if self.metrics is not None:
+            self.metrics.frames_received[self.FLOW_CONTROL_FRAME] += 1
+        if self._tx_view is None or len(frame) < 3:
+            return []
+        
+        flow_status = frame[0] & 0x0F
+        if flow_status == self.FC_WAIT:
+            return []
+        if flow_status != self.FC_CONTINUE_TO_SEND:
+            self._tx_view = None  # Overflow or invalid status aborts the transfer
+            return []
+        
+        view = self._tx_view
+        end = len(view)
+        step = self.cf_data_length
+        block_size = frame[1]
+        if block_size:
+            end = min(end, self._tx_offset + block_size * step)
+        
+        frames = []
+        seq_num = self._tx_sequence
+        for offset in range(self._tx_offset, end, step):
+            frames.append(self.create_consecutive_frame(view[offset:offset + step], seq_num))
+            seq_num = (seq_num + 1) & 0x0F
+        if self.metrics is not None:
+            self.metrics.frames_sent[self.CONSECUTIVE_FRAME] += len(frames)
+        
+        if end >= len(view):
+            self._tx_view = None
+        else:
+            self._tx_offset = end
+            self._tx_sequence = seq_num
+        return frames
+    
+    @property
+    def transmitting(self) -> bool:
+        """True while a multi-frame message is waiting for Flow Control"""
+        return self._tx_view is not None
+    
+    def reassemble(self, frame: bytes) -> dict:
+        """Feed a frame into the reassembly buffer
+        
+        The receive buffer is preallocated from the First Frame length and
+        consecutive frames are copied into it in place. Once the transfer is
+        complete the buffer is handed to the caller as ``data`` and a fresh
+        one is used for the next message. A First Frame announcing more than
+        ``max_data_length`` bytes is not buffered; the result carries
+        ``overflow`` so the receiver answers with FC OVFLW.
+        """
         if len(frame) < 1:
             return {"error": "Invalid frame"}
         
         pci_byte = frame[0]
-        frame_type = (pci_byte >> 4) & 0x0F
+        frame_type = pci_byte >> 4
+        if self.metrics is not None:
+            self.metrics.frames_received[frame_type] += 1
         
         if frame_type == self.SINGLE_FRAME:
+            self.reset()
             length = pci_byte & 0x0F
-            data = frame[1:1+length]
-            return {"type": "SingleFrame", "length": length, "data": data}
+            if not length and len(frame) > 1:
+                if self.frame_size == 8:
+                    return {"error": "SF escape on a classic CAN link"}
+                return {"type": "SingleFrame", "complete": True, "data": frame[2:2 + frame[1]]}
+            return {"type": "SingleFrame", "complete": True, "data": frame[1:1+length]}
         
-        elif frame_type == self.FIRST_FRAME:
+        if frame_type == self.FIRST_FRAME:
+            if len(frame) < 2:
+                return {"error": "Invalid frame"}
             length = ((pci_byte & 0x0F) << 8) | frame[1]
-            data = frame[2:8]
-            return {"type": "FirstFrame", "length": length, "data": data}
+            start = 2
+            if not length:
+                if len(frame) < 6:
+                    return {"error": "Invalid frame"}
+                length = int.from_bytes(frame[2:6], "big")  # FF_DL escape
+                start = 6
+                if length <= self.DOCAN_MAX_DATA_LENGTH:
+                    self.reset()
+                    return {"error": "Invalid first frame length"}  # Fits the 12-bit FF_DL
+            # The message must not fit a single frame of the received frame's size
+            if length <= (len(frame) - 2 if len(frame) > 8 else self.SF_MAX_DATA_LENGTH):
+                self.reset()
+                return {"error": "Invalid first frame length"}
+            if length > self.max_data_length:
+                self.reset()
+                return {"type": "FirstFrame", "complete": False, "length": length,
+                        "overflow": True}
+            
+            self.buffer = bytearray(length)
+            self.expected_length = length
+            chunk = memoryview(frame)[start:start + length]
+            self.buffer[:len(chunk)] = chunk
+            self._received = len(chunk)
+            self.sequence_number = 1
+            return {"type": "FirstFrame", "complete": False, "length": length}
         
-        elif frame_type == self.CONSECUTIVE_FRAME:
-            seq_num = pci_byte & 0x0F
-            data = frame[1:]
-            return {"type": "ConsecutiveFrame", "seq_num": seq_num, "data": data}
+        if frame_type == self.CONSECUTIVE_FRAME:
+            if not self.expected_length:
+                return {"error": "Unexpected consecutive frame"}
+            if (pci_byte & 0x0F) != self.sequence_number:
+                self.reset()
+                return {"error": "Wrong sequence number"}
+            
+            received = self._received
+            count = min(self.expected_length - received, len(frame) - 1)
+            self.buffer[received:received + count] = memoryview(frame)[1:1 + count]
+            received += count
+            self.sequence_number = (self.sequence_number + 1) & 0x0F
+            
+            if received < self.expected_length:
+                self._received = received
+                return {"type": "ConsecutiveFrame", "complete": False}
+            
+            data = self.buffer
+            self.buffer = bytearray()
+            self.reset()
+            return {"type": "ConsecutiveFrame", "complete": True, "data": data}
+        
+        return {"error": "Unknown frame type"}
+    
+    def reset(self):
+        """Drop any partially received message"""
+        self.expected_length = 0
+        self.sequence_number = 0
+        self._received = 0
+    
+    def decode(self, frame: bytes, out: Optional[Frame] = None) -> Frame:
+        """Decode a DoCAN frame into a ``Frame``
+        
+        Pass ``out`` to refill an existing ``Frame`` instead of allocating
+        one. Raises ``ValueError`` for invalid frames.
+        """
+        size = len(frame)
+        if size < 1:
+            raise ValueError("Invalid frame")
         
+        pci_byte = frame[0]
+        frame_type = pci_byte >> 4
+        if self.metrics is not None:
+            self.metrics.frames_received[frame_type] += 1
+        if frame_type > 3 or (frame_type == self.FLOW_CONTROL_FRAME and size < 3):
+            raise ValueError("Unknown frame type")
+        if frame_type == self.FIRST_FRAME and size < 2:
+            raise ValueError("Invalid frame")
+        
+        if out is None:
+            out = Frame()
+        out.frame_type = _FRAME_TYPES[frame_type]
+        out.raw = frame
+        
+        if frame_type == self.SINGLE_FRAME:
+            out.length = pci_byte & 0x0F
+            out.data_start = 1
+            if not out.length and size > 1:
+                if self.frame_size == 8:
+                    raise ValueError("SF escape on a classic CAN link")
+                out.length = frame[1]  # SF escape
+                out.data_start = 2
+            out.data_end = out.data_start + out.length
+        elif frame_type == self.FIRST_FRAME:
+            out.length = ((pci_byte & 0x0F) << 8) | frame[1]
+            out.data_start = 2
+            if not out.length:
+                if size < 6:
+                    raise ValueError("Invalid frame")
+                out.length = int.from_bytes(frame[2:6], "big")  # FF_DL escape
+                if out.length <= self.DOCAN_MAX_DATA_LENGTH:
+                    raise ValueError("Invalid first frame length")
+                out.data_start = 6
+            out.data_end = size
+        elif frame_type == self.CONSECUTIVE_FRAME:
+            out.sequence_number = pci_byte & 0x0F
+            out.data_start = 1
+            out.data_end = size
         else:
-            return {"error": "Unknown frame type"}
+            out.flow_status = pci_byte & 0x0F
+            out.block_size = frame[1]
+            out.st_min = frame[2]
+            out.data_start = out.data_end = 0
+        return out
+    
+    def parse_frame(self, frame: bytes) -> dict:
+        """Parse a DoCAN frame into a dict (compatibility wrapper around ``decode``)"""
+        try:
+            return self.decode(frame, self._parsed).to_dict()
+        except ValueError as exc:
+            return {"error": str(exc)}
@@ -0,0 +1,321 @@
+"""Compact DTC Storage with Status Mask Index"""
+
+import sys
+from array import array
+from collections import Counter
+from typing import Any, Optional
+
+# NumPy is optional and imported on first use by a store large enough to
+# benefit (see _numpy); pure-Python paths are used without it
+np: Any = None
+_numpy_imported = False
+NUMPY_MIN_DTCS = 64
+
+# UDS DTC status bits (ISO 14229-1 D.2)
+TEST_FAILED = 0x01
+TEST_FAILED_THIS_OPERATION_CYCLE = 0x02
+PENDING_DTC = 0x04
+CONFIRMED_DTC = 0x08
+TEST_NOT_COMPLETED_SINCE_LAST_CLEAR = 0x10
+TEST_FAILED_SINCE_LAST_CLEAR = 0x20
+TEST_NOT_COMPLETED_THIS_OPERATION_CYCLE = 0x40
+WARNING_INDICATOR_REQUESTED = 0x80
+
+ALL_DTC_GROUP = 0xFFFFFF
+DTC_FORMAT_ISO_14229_1 = 0x01
+
+
+def group_mask(group: int) -> int:
+    """Mask selecting the DTC number bits a DTC group fixes
+    
+    Trailing zero bytes of the group are wildcards, so 0x123400 covers
+    0x123400-0x1234FF and 0x120000 covers 0x120000-0x12FFFF; the high byte
+    is always significant.
+    """
+    if group & 0xFFFF == 0:
+        return 0xFF0000
+    if group & 0xFF == 0:
+        return 0xFFFF00
+    return 0xFFFFFF
+
+
+def _numpy():
+    """NumPy module, imported on the first call; None if not installed"""
+    global np, _numpy_imported
+    if not _numpy_imported:
+        _numpy_imported = True
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+    return np
+
+
+class DTCStore:
+    """Column store of DTC numbers and status bytes
+    
+    DTC numbers and status bytes live in two parallel columns. A count of
+    DTCs per status byte value that occurs acts as the bitmask index:
+    counting DTCs that match a status mask costs one step per distinct
+    status whatever the number of stored DTCs.
+    Records are serialized as ``DTC (3 bytes) + status`` in a single pass,
+    vectorized with NumPy when it is installed. Copies share the columns
+    until either side changes.
+    """
+    
+    def __init__(self, availability_mask: int = 0xFF):
+        """Initialize empty store"""
+        self.availability_mask = availability_mask
+        self._numbers = array("I")
+        self._status = bytearray()
+        self._rows: dict = {}
+        self._status_counts: Counter = Counter()
+        self._shared = False
+    
+    def __len__(self) -> int:
+        """Number of stored DTCs"""
+        return len(self._numbers)
+    
+    def __contains__(self, dtc: int) -> bool:
+        """Check whether a DTC is stored"""
+        return dtc in self._rows
+    
+    def __iter__(self):
+        """Iterate over stored DTC numbers"""
+        return iter(self._numbers)
+    
+    def copy(self) -> "DTCStore":
+        """Return an independent copy of the columns and index (copied on write)"""
+        store = DTCStore.__new__(DTCStore)
+        store.availability_mask = self.availability_mask
+        store._numbers = self._numbers
+        store._status = self._status
+        store._rows = self._rows
+        store._status_counts = self._status_counts
+        store._shared = self._shared = True
+        return store
+    
+    def overlay(self) -> "DTCOverlay":
+        """Overlay for a clone, over a copy-on-write copy of this store"""
+        return DTCOverlay(self.copy())
+    
+    def _unshare(self):
+        """Take private copies of columns shared with a copy"""
+        self._numbers = array("I", self._numbers)
+        self._status = bytearray(self._status)
+        self._rows = dict(self._rows)
+        self._status_counts = Counter(self._status_counts)
+        self._shared = False
+    
+    def add(self, dtc: int, status: int = TEST_FAILED | CONFIRMED_DTC):
+        """Store a DTC or update the status of a stored one"""
+        if not 0 <= dtc <= 0xFFFFFF:
+            raise ValueError("DTC must be a 24-bit value")
+        if self._shared:
+            self._unshare()
+        status &= self.availability_mask
+        row = self._rows.get(dtc)
+        if row is None:
+            self._rows[dtc] = len(self._numbers)
+            self._numbers.append(dtc)
+            self._status.append(status)
+        else:
+            counts = self._status_counts
+            old = self._status[row]
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+            self._status[row] = status
+        self._status_counts[status] += 1
+    
+    def status_of(self, dtc: int) -> int:
+        """Return the status byte of a stored DTC"""
+        return self._status[self._rows[dtc]]
+    
+    def count_by_status_mask(self, mask: int) -> int:
+        """Number of DTCs whose status matches any bit of ``mask``"""
+        return sum(count for status, count in self._status_counts.items() if status & mask)
+    
+    def report_by_status_mask(self, mask: int) -> bytes:
+        """Serialized ``DTC + status`` records for DTCs matching ``mask``"""
+        if not self._numbers:
+            return b""
+        if len(self._numbers) >= NUMPY_MIN_DTCS and _numpy() is not None:
+            numbers = np.frombuffer(self._numbers, dtype=np.uint32)
+            status = np.frombuffer(self._status, dtype=np.uint8)
+            selected = (status & mask) != 0
+            records = (numbers[selected] << 8) | status[selected]
+            return records.astype(">u4").tobytes()
+        
+        records = array("I", [
+            (dtc << 8) | status
+            for dtc, status in zip(self._numbers, self._status) if status & mask
+        ])
+        if sys.byteorder == "little":
+            records.byteswap()
+        return records.tobytes()
+    
+    def clear(self, group: int = ALL_DTC_GROUP) -> bool:
+        """Clear a DTC group; returns False if no stored DTC is in it
+        
+        Besides the all-DTC group (0xFFFFFF), a group is a DTC number whose
+        trailing zero bytes are wildcards (see ``group_mask``).
+        """
+        if group == ALL_DTC_GROUP:
+            self._numbers = array("I")
+            self._status = bytearray()
+            self._rows = {}
+            self._status_counts = Counter()
+            self._shared = False
+            return True
+        
+        mask = group_mask(group)
+        if mask == 0xFFFFFF and group not in self._rows:
+            return False
+        numbers = self._numbers
+        if len(numbers) >= NUMPY_MIN_DTCS and _numpy() is not None:
+            column = np.frombuffer(numbers, dtype=np.uint32)
+            keep = (column & mask) != group
+            if keep.all():
+                return False
+            status = np.frombuffer(self._status, dtype=np.uint8)[keep]
+            self._numbers = array("I", column[keep].tobytes())
+            self._status = bytearray(status.tobytes())
+            counts = np.bincount(status, minlength=256)
+            self._status_counts = Counter(
+                {int(value): int(counts[value]) for value in np.flatnonzero(counts)}
+            )
+        else:
+            keep = [row for row, dtc in enumerate(numbers) if dtc & mask != group]
+            if len(keep) == len(numbers):
+                return False
+            status = self._status
+            self._numbers = array("I", [numbers[row] for row in keep])
+            self._status = bytearray([status[row] for row in keep])
+            self._status_counts = Counter(self._status)
+        self._rows = dict(zip(self._numbers, range(len(self._numbers))))
+        self._shared = False
+        return True
+
+
+class DTCOverlay:
+    """DTC store layered over a shared, read-only ``DTCStore``
+    
+    DTCs added or given a new status on this instance go to a small store
+    of its own, created on first write; base DTCs that were cleared or
+    re-added are hidden. An unchanged overlay reports the base records as
+    they are, so cloned ECUs share one serialized DTC table.
+    """
+    
+    __slots__ = ("base", "own", "hidden")
+    
+    def __init__(self, base: DTCStore):
+        """Initialize overlay over ``base``"""
+        self.base = base
+        self.own: Optional[DTCStore] = None
+        self.hidden: Optional[set] = None
+    
+    @property
+    def availability_mask(self) -> int:
+        """DTC status availability mask of the base store"""
+        return self.base.availability_mask
+    
+    def __len__(self) -> int:
+        """Number of stored DTCs"""
+        hidden = len(self.hidden) if self.hidden else 0
+        return len(self.base) - hidden + (len(self.own) if self.own is not None else 0)
+    
+    def __contains__(self, dtc: int) -> bool:
+        """Check whether a DTC is stored"""
+        if self.own is not None and dtc in self.own:
+            return True
+        return dtc in self.base and not (self.hidden and dtc in self.hidden)
+    
+    def __iter__(self):
+        """Iterate over stored DTC numbers, base DTCs first"""
+        hidden = self.hidden
+        for dtc in self.base:
+            if not hidden or dtc not in hidden:
+                yield dtc
+        if self.own is not None:
+            yield from self.own
+    
+    def copy(self) -> "DTCOverlay":
+        """Return an independent overlay over the same base"""
+        overlay = DTCOverlay(self.base)
+        if self.own is not None:
+            overlay.own = self.own.copy()
+        if self.hidden:
+            overlay.hidden = set(self.hidden)
+        return overlay
+    
+    def overlay(self) -> "DTCOverlay":
+        """Overlay for a clone (an independent copy of this one)"""
+        return self.copy()
+    
+    def _hide(self, dtc: int):
+        """Hide a base DTC"""
+        if self.hidden is None:
+            self.hidden = set()
+        self.hidden.add(dtc)
+    
+    def add(self, dtc: int, status: int = TEST_FAILED | CONFIRMED_DTC):
+        """Store a DTC or update the status of a stored one"""
+        if self.own is None:
+            self.own = DTCStore(self.base.availability_mask)
+        if dtc in self.base and dtc not in self.own:
+            self._hide(dtc)
+        self.own.add(dtc, status)
+    
+    def status_of(self, dtc: int) -> int:
+        """Return the status byte of a stored DTC"""
+        if self.own is not None and dtc in self.own:
+            return self.own.status_of(dtc)
+        if self.hidden and dtc in self.hidden:
+            raise KeyError(dtc)
+        return self.base.status_of(dtc)
+    
+    def count_by_status_mask(self, mask: int) -> int:
+        """Number of DTCs whose status matches any bit of ``mask``"""
+        count = self.base.count_by_status_mask(mask)
+        if self.hidden:
+            status_of = self.base.status_of
+            count -= sum(1 for dtc in self.hidden if status_of(dtc) & mask)
+        if self.own is not None:
+            count += self.own.count_by_status_mask(mask)
+        return count
+    
+    def report_by_status_mask(self, mask: int) -> bytes:
+        """Serialized ``DTC + status`` records for DTCs matching ``mask``"""
+        if self.hidden:
+            records = self.base.report_by_status_mask(mask)
+            hidden = self.hidden
+            report = b"".join(
+                records[i:i + 4] for i in range(0, len(records), 4)
+                if int.from_bytes(records[i:i + 3], "big") not in hidden
+            )
+        else:
+            report = self.base.report_by_status_mask(mask)
+        if self.own is not None:
+            report += self.own.report_by_status_mask(mask)
+        return report
+    
+    def clear(self, group: int = ALL_DTC_GROUP) -> bool:
+        """Clear a DTC group; returns False if no stored DTC is in it"""
+        if group == ALL_DTC_GROUP:
+            self.base = DTCStore(self.base.availability_mask)
+            self.own = None
+            self.hidden = None
+            return True
+        # Re-added base DTCs cleared from ``own`` are already hidden
+        cleared = self.own is not None and self.own.clear(group)
+        mask = group_mask(group)
+        if mask == 0xFFFFFF:
+            matches = [group] if group in self.base else []
+        else:
+            matches = [dtc for dtc in self.base if dtc & mask == group]
+        for dtc in matches:
+            if not (self.hidden and dtc in self.hidden):
+                self._hide(dtc)
+                cleared = True
+        return cleared
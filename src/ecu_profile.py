@@ -0,0 +1,218 @@
+"""Declarative ECU Profiles with a Compiled, Content-addressed Cache"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Optional
+
+from .dtc_store import DTCStore
+from .session import DEFAULT_SESSION, DiagnosticSession
+from .virtual_ecu import DataIdentifierOverlay, VirtualECU
+
+# Bumped whenever the compiled layout changes, invalidating cached profiles
+PROFILE_FORMAT = 1
+
+# Integer DID encodings: (size in bytes, signed)
+INTEGER_TYPES = {
+    "uint8": (1, False),
+    "uint16": (2, False),
+    "uint24": (3, False),
+    "uint32": (4, False),
+    "int8": (1, True),
+    "int16": (2, True),
+    "int32": (4, True),
+}
+
+TIMING_KEYS = ("p2_server", "p2_star_server", "s3_server")
+SECURITY_KEYS = {
+    "max_attempts": "max_attempts",
+    "delay": "security_delay",
+    "seed_length": "seed_length",
+}
+
+# Profiles compiled in this process, by content digest
+_compiled: dict = {}
+
+
+def _int(value) -> int:
+    """Integer from a number or a ``"0x..."`` / decimal string"""
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+
+def encode_value(spec) -> bytes:
+    """Raw DID bytes for a value spec
+    
+    A plain string is ASCII. A mapping has a ``type`` of ``ascii``,
+    ``hex``, ``bytes`` or one of ``INTEGER_TYPES``; integers may carry a
+    linear ``scale`` / ``offset`` (raw = (value - offset) / scale) and
+    ASCII values a ``length`` to pad to with spaces.
+    """
+    if isinstance(spec, str):
+        return spec.encode("ascii")
+    if not isinstance(spec, dict) or "value" not in spec:
+        raise ValueError(f"Invalid DID value: {spec!r}")
+    
+    kind = spec.get("type", "ascii")
+    value = spec["value"]
+    if kind == "ascii":
+        raw = value.encode("ascii")
+        length = spec.get("length")
+        if length is not None:
+            if len(raw) > length:
+                raise ValueError(f"ASCII value {value!r} is longer than {length} bytes")
+            raw = raw.ljust(length, b" ")
+        return raw
+    if kind == "hex":
+        return bytes.fromhex(value)
+    if kind == "bytes":
+        return bytes(_int(b) for b in value)
+    if kind in INTEGER_TYPES:
+        size, signed = INTEGER_TYPES[kind]
+        raw = round((value - spec.get("offset", 0)) / spec.get("scale", 1))
+        try:
+            return raw.to_bytes(size, "big", signed=signed)
+        except OverflowError:
+            raise ValueError(f"Value {value!r} does not fit {kind}") from None
+    raise ValueError(f"Unknown DID encoding: {kind}")
+
+
+class ECUProfile:
+    """Compiled ECU description shared by every ECU spawned from it
+    
+    Compiling turns the declarative document into the tables a
+    ``VirtualECU`` uses directly: DID values as ``bytes``, DTCs as a
+    prebuilt ``DTCStore`` and services as a set of SIDs. ``spawn`` layers
+    each ECU over the compiled tables (see ``VirtualECU.clone``), so a
+    thousand ECUs from one profile hold one copy of the data.
+    """
+    
+    def __init__(self, name: str, digest: str, services: Optional[frozenset], sessions: tuple,
+                 timing: dict, security: dict, data_identifiers: dict, dtcs: DTCStore):
+        """Initialize compiled profile"""
+        self.name = name
+        self.digest = digest
+        self.services = services
+        self.sessions = sessions
+        self.timing = timing
+        self.security = security
+        self.data_identifiers = data_identifiers
+        self.dtcs = dtcs
+    
+    @classmethod
+    def compile(cls, document: dict, digest: str = "") -> "ECUProfile":
+        """Validate a parsed profile document and build the tables"""
+        if not isinstance(document, dict):
+            raise ValueError("Profile must be a mapping")
+        
+        services = document.get("services")
+        if services is not None:
+            services = frozenset(_int(sid) for sid in services)
+        
+        sessions = tuple(_int(s) for s in document.get("sessions", DiagnosticSession.SESSIONS))
+        if DEFAULT_SESSION not in sessions:
+            sessions = (DEFAULT_SESSION,) + sessions
+        
+        timing = {}
+        for key, value in document.get("timing", {}).items():
+            if key not in TIMING_KEYS:
+                raise ValueError(f"Unknown timing parameter: {key}")
+            timing[key] = float(value)
+        
+        security = {}
+        for key, value in document.get("security", {}).items():
+            if key == "levels":
+                security["security_levels"] = tuple(_int(level) for level in value)
+            elif key in SECURITY_KEYS:
+                security[SECURITY_KEYS[key]] = value
+            else:
+                raise ValueError(f"Unknown security parameter: {key}")
+        
+        data_identifiers = {}
+        for did, spec in document.get("dids", {}).items():
+            did = _int(did)
+            if not 0 <= did <= 0xFFFF:
+                raise ValueError(f"DID 0x{did:X} is not a 16-bit value")
+            data_identifiers[did] = encode_value(spec)
+        
+        dtcs = DTCStore(_int(document.get("dtc_availability_mask", 0xFF)))
+        for dtc, status in document.get("dtcs", {}).items():
+            dtcs.add(_int(dtc), _int(status))
+        
+        return cls(document.get("name", "ECU"), digest, services, sessions, timing,
+                   security, data_identifiers, dtcs)
+    
+    def __getstate__(self) -> dict:
+        """Pickle the compiled tables but not the template ECU"""
+        state = dict(self.__dict__)
+        state.pop("_template", None)
+        return state
+    
+    def template(self) -> VirtualECU:
+        """ECU configured by this profile that ``spawn`` clones (built once)"""
+        template = self.__dict__.get("_template")
+        if template is None:
+            template = VirtualECU(self.name)
+            template.session = DiagnosticSession(template.uds, sessions=self.sessions,
+                                                 **self.timing, **self.security)
+            template.data_identifiers = DataIdentifierOverlay(self.data_identifiers)
+            template.dtc_codes = self.dtcs.copy()
+            if self.services is not None:
+                for sid in range(256):
+                    if sid not in self.services:
+                        template.services.unregister(sid)
+            self._template = template
+        return template
+    
+    def spawn(self, ecu_id: Optional[str] = None, timers=None) -> VirtualECU:
+        """Create a Virtual ECU configured by this profile"""
+        return self.template().clone(ecu_id, timers)
+
+
+def parse_profile(data: bytes, extension: str) -> dict:
+    """Parse a JSON or YAML profile document"""
+    if extension == ".json":
+        return json.loads(data)
+    if extension in (".yaml", ".yml"):
+        # Optional dependency, only needed for YAML profiles
+        import yaml  # type: ignore[import-untyped]
+        
+        return yaml.safe_load(data)
+    raise ValueError(f"Unsupported profile format: {extension}")
+
+
+def load_profile(path: str, cache_dir: Optional[str] = None) -> ECUProfile:
+    """Load a profile, compiling it at most once per content
+    
+    Profiles are keyed by the SHA-256 of their bytes. A profile already
+    compiled in this process is returned as is; otherwise, with
+    ``cache_dir``, the compiled profile is read from (or written to)
+    ``<cache_dir>/<digest>.pickle`` so later processes skip parsing. The
+    cache directory must be trusted, as it holds pickles.
+    """
+    with open(path, "rb") as fh:
+        data = fh.read()
+    extension = os.path.splitext(path)[1].lower()
+    digest = hashlib.sha256(b"%d:%s:" % (PROFILE_FORMAT, extension.encode()) + data).hexdigest()
+    
+    profile = _compiled.get(digest)
+    if profile is not None:
+        return profile
+    
+    cache_path = os.path.join(cache_dir, digest + ".pickle") if cache_dir else None
+    if cache_path is not None and os.path.exists(cache_path):
+        with open(cache_path, "rb") as fh:
+            profile = pickle.load(fh)
+    else:
+        profile = ECUProfile.compile(parse_profile(data, extension), digest)
+        if cache_path is not None:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(profile, fh, pickle.HIGHEST_PROTOCOL)
+            # Atomic, so concurrent loaders never see a partial file
+            os.replace(tmp_path, cache_path)
+    
+    _compiled[digest] = profile
+    return profile
@@ -0,0 +1,211 @@
+"""Seeded Fault Injection on the DoCAN Frame Path"""
+
+import math
+import random
+import time
+from collections import Counter
+from itertools import accumulate
+
+from .docan_bus import DoCAN
+
+# Consecutive Frame faults (frames the ECU sends after the tester's Flow Control)
+DROP_FRAME = "drop"
+DUPLICATE_FRAME = "duplicate"
+REORDER_FRAMES = "reorder"
+WRONG_SEQUENCE = "wrong_sequence"
+
+# Flow Control faults (the ECU's answer to a tester's First Frame)
+FC_WAIT = "fc_wait"
+FC_OVERFLOW = "fc_overflow"
+
+# Response faults (first frame of a response)
+DELAY_RESPONSE = "delay"
+INJECT_NRC = "nrc"
+
+# NRCs injected by default: busyRepeatRequest, conditionsNotCorrect
+DEFAULT_NRCS = (0x21, 0x22)
+
+
+class FaultSchedule:
+    """Seeded schedule of faults over a stream of frames
+    
+    ``rates`` maps fault kinds to per-frame probabilities. Faults are drawn
+    a block at a time: the gaps between faulty frames are geometric and the
+    kinds a weighted choice, so checking a clean frame is one comparison
+    against the position of the next fault. The same seed always yields the
+    same schedule.
+    """
+    
+    def __init__(self, rates: dict, seed=0, block: int = 4096):
+        """Initialize schedule"""
+        self.kinds = [kind for kind, rate in rates.items() if rate > 0]
+        total = sum(rates[kind] for kind in self.kinds)
+        if total > 1:
+            raise ValueError("Fault rates of one schedule must add up to at most 1")
+        self.rng = random.Random(seed)
+        self.block = block
+        self._cum_weights = list(accumulate(rates[kind] for kind in self.kinds))
+        self._log_clean = math.log1p(-total) if 0 < total < 1 else 0.0
+        self.position = 0
+        self._positions: list = []
+        self._faults: list = []
+        self._index = 0
+        self._next = -1  # Position of the next fault; -1 never matches
+        if self.kinds:
+            self._refill(-1)
+    
+    def _refill(self, last: int):
+        """Draw the next block of fault positions after position ``last``"""
+        rng = self.rng
+        log_clean = self._log_clean
+        if log_clean:
+            uniform = rng.random
+            gaps = [int(math.log(1.0 - uniform()) / log_clean) + 1 for _ in range(self.block)]
+        else:
+            gaps = [1] * self.block  # Every frame is faulty
+        self._positions = list(accumulate(gaps, initial=last))[1:]
+        self._faults = rng.choices(self.kinds, cum_weights=self._cum_weights, k=self.block)
+        self._index = 0
+        self._next = self._positions[0]
+    
+    def draw(self):
+        """Fault for the next frame, or None"""
+        position = self.position
+        self.position = position + 1
+        if position != self._next:
+            return None
+        
+        index = self._index
+        fault = self._faults[index]
+        index += 1
+        if index == self.block:
+            self._refill(position)
+        else:
+            self._index = index
+            self._next = self._positions[index]
+        return fault
+    
+    def skip_clean(self, count: int) -> bool:
+        """Advance over the next ``count`` frames if none of them is faulty"""
+        end = self.position + count
+        if self._next != -1 and self._next < end:
+            return False
+        self.position = end
+        return True
+
+
+class FaultInjector:
+    """Fault layer around an ECU's DoCAN frame path
+    
+    Once installed, every frame the ECU sends from ``process_frame`` (and
+    so ``process_request`` and ``process_many``) passes through three
+    seeded schedules:
+    
+    - Consecutive Frames may be dropped, duplicated, swapped with the next
+      frame or sent with a wrong sequence number;
+    - the Flow Control answering a tester's First Frame may be preceded by
+      ``wait_frames`` FC WAIT frames, or replaced by FC OVFLW, which also
+      drops the partly received request;
+    - a response may be delayed by ``response_delay`` seconds, or replaced
+      by a negative response with one of ``nrcs``.
+    
+    Rates are probabilities per eligible frame. ``injected`` counts the
+    faults by kind.
+    """
+    
+    def __init__(self, seed=0, drop: float = 0.0, duplicate: float = 0.0, reorder: float = 0.0,
+                 wrong_sequence: float = 0.0, fc_wait: float = 0.0, fc_overflow: float = 0.0,
+                 delay: float = 0.0, nrc: float = 0.0, nrcs: tuple = DEFAULT_NRCS,
+                 wait_frames: int = 1, response_delay: float = 0.1, sleep=time.sleep,
+                 block: int = 4096):
+        """Initialize injector with a seed and the rate of each fault"""
+        self.consecutive = FaultSchedule({DROP_FRAME: drop, DUPLICATE_FRAME: duplicate,
+                                          REORDER_FRAMES: reorder, WRONG_SEQUENCE: wrong_sequence},
+                                         f"{seed}:consecutive", block)
+        self.flow_control = FaultSchedule({FC_WAIT: fc_wait, FC_OVERFLOW: fc_overflow},
+                                          f"{seed}:flow_control", block)
+        self.response = FaultSchedule({DELAY_RESPONSE: delay, INJECT_NRC: nrc},
+                                      f"{seed}:response", block)
+        self.nrcs = tuple(nrcs)
+        self.wait_frames = wait_frames
+        self.response_delay = response_delay
+        self.sleep = sleep
+        self.injected: Counter = Counter()
+    
+    def install(self, ecu) -> "FaultInjector":
+        """Put the fault layer on an ECU's frame path (``ecu.faults = None`` removes it)"""
+        ecu.faults = self
+        return self
+    
+    def process_frame(self, ecu, request_data: bytes) -> list:
+        """Process one frame on ``ecu`` and apply the scheduled faults to its output"""
+        frames = ecu._process_frame(request_data)
+        if not frames:
+            return frames
+        
+        frame_type = frames[0][0] >> 4
+        if frame_type == DoCAN.CONSECUTIVE_FRAME:
+            return self._consecutive_frames(frames)
+        if frame_type == DoCAN.FLOW_CONTROL_FRAME:
+            return self._flow_control(ecu, frames)
+        return self._response(ecu, frames)
+    
+    def _consecutive_frames(self, frames: list) -> list:
+        """Drop, duplicate, reorder or renumber Consecutive Frames"""
+        if self.consecutive.skip_clean(len(frames)):
+            return frames
+        draw = self.consecutive.draw
+        injected = self.injected
+        out = []
+        held = None  # Frame swapped with the next one
+        for frame in frames:
+            fault = draw()
+            if fault == REORDER_FRAMES and held is None:
+                injected[fault] += 1
+                held = frame
+                continue
+            if fault is None or fault == REORDER_FRAMES:
+                out.append(frame)
+            elif fault == DROP_FRAME:
+                injected[fault] += 1
+            elif fault == DUPLICATE_FRAME:
+                injected[fault] += 1
+                out += (frame, frame)
+            else:
+                injected[fault] += 1
+                out.append(bytes([0x20 | ((frame[0] + 1) & 0x0F)]) + frame[1:])
+            if held is not None:
+                out.append(held)
+                held = None
+        if held is not None:
+            out.append(held)
+        return out
+    
+    def _flow_control(self, ecu, frames: list) -> list:
+        """Delay the Flow Control with FC WAIT, or answer FC OVFLW"""
+        fault = self.flow_control.draw()
+        if fault is None:
+            return frames
+        self.injected[fault] += 1
+        if fault == FC_WAIT:
+            wait = ecu.docan.create_flow_control_frame(DoCAN.FC_WAIT)
+            return [wait] * self.wait_frames + frames
+        ecu.docan.reset()  # The tester aborts, so drop the partial request
+        return [ecu.docan.create_flow_control_frame(DoCAN.FC_OVERFLOW)]
+    
+    def _response(self, ecu, frames: list) -> list:
+        """Delay a response, or replace it with a negative response"""
+        fault = self.response.draw()
+        if fault is None:
+            return frames
+        self.injected[fault] += 1
+        if fault == DELAY_RESPONSE:
+            self.sleep(self.response_delay)
+            return frames
+        
+        # Take the service from the final response: SID + 0x40, or 0x7F SID NRC
+        # A separate decoder keeps the ECU's receive metrics out of it
+        data = DoCAN(ecu.docan.frame_size).decode(frames[-1]).data
+        service_id = data[1] if data[0] == 0x7F else (data[0] - 0x40) & 0xFF
+        nrc = self.response.rng.choice(self.nrcs)
+        return [ecu.docan.start_transmission(bytes([0x7F, service_id, nrc]))]
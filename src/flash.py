@@ -0,0 +1,204 @@
+"""Streaming Flash Transfer Services (0x34 / 0x35 / 0x36 / 0x37)"""
+
+import hashlib
+import os
+import zlib
+from typing import Optional
+
+from .docan_bus import DoCAN
+
+# Negative response codes used by the transfer services
+NRC_INCORRECT_LENGTH = 0x13
+NRC_REQUEST_SEQUENCE_ERROR = 0x24
+NRC_REQUEST_OUT_OF_RANGE = 0x31
+NRC_UPLOAD_DOWNLOAD_NOT_ACCEPTED = 0x70
+NRC_TRANSFER_DATA_SUSPENDED = 0x71
+NRC_GENERAL_PROGRAMMING_FAILURE = 0x72
+NRC_WRONG_BLOCK_SEQUENCE_COUNTER = 0x73
+
+
+class FlashMemory:
+    """File-backed ECU memory region
+    
+    Blocks are written to and read from the file at their address, so
+    images of any size are streamed without being held in memory. A new
+    file is created sparse at the requested size.
+    """
+    
+    def __init__(self, path: str, size: int, base_address: int = 0):
+        """Open (or create) the backing file"""
+        self.path = path
+        self.size = size
+        self.base_address = base_address
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self._file = open(path, mode)
+        if os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+    
+    def contains(self, address: int, length: int) -> bool:
+        """Check whether a range lies inside this memory"""
+        offset = address - self.base_address
+        return 0 <= offset and offset + length <= self.size
+    
+    def write(self, address: int, data):
+        """Write a block at an address"""
+        self._file.seek(address - self.base_address)
+        self._file.write(data)
+    
+    def read(self, address: int, length: int) -> bytes:
+        """Read a block from an address"""
+        self._file.seek(address - self.base_address)
+        return self._file.read(length)
+    
+    def flush(self):
+        """Flush written blocks to disk"""
+        self._file.flush()
+    
+    def close(self):
+        """Close the backing file"""
+        self._file.close()
+
+
+class FlashTransfer:
+    """RequestDownload / RequestUpload / TransferData / RequestTransferExit server
+    
+    Each TransferData block goes straight to the ``FlashMemory`` and is fed
+    into a running CRC-32 (and optionally a ``hashlib`` digest), so the image
+    is verified without being buffered. RequestTransferExit returns the
+    CRC-32 of the transferred data; a tester may send the CRC-32 it expects
+    and gets NRC 0x72 on a mismatch.
+    """
+    
+    def __init__(self, memory: FlashMemory, max_block_length: int = DoCAN.DOCAN_MAX_DATA_LENGTH,
+                 hash_algorithm: Optional[str] = None):
+        """Initialize transfer server
+        
+        ``max_block_length`` is the maxNumberOfBlockLength reported to the
+        tester: the longest TransferData request including SID and block
+        sequence counter.
+        """
+        if max_block_length < 3:
+            raise ValueError("maxNumberOfBlockLength must be at least 3")
+        self.memory = memory
+        self.max_block_length = max_block_length
+        self.hash_algorithm = hash_algorithm
+        self._reset()
+    
+    def _reset(self):
+        """Return to idle"""
+        self.direction = None  # "download" or "upload" while a transfer is active
+        self.address = 0
+        self.size = 0
+        self.transferred = 0
+        self.crc = 0
+        self.digest = None
+        self._hash = None
+        self._sequence = 0
+    
+    def install(self, ecu) -> "FlashTransfer":
+        """Register the transfer services on an ECU"""
+        ecu.flash = self
+        ecu.services.register(0x34)(self.request_download)
+        ecu.services.register(0x35)(self.request_upload)
+        ecu.services.register(0x36)(self.transfer_data)
+        ecu.services.register(0x37)(self.request_transfer_exit)
+        return self
+    
+    def request_download(self, ecu, payload: bytes) -> bytes:
+        """Handle RequestDownload (0x34)"""
+        return self._request_transfer(ecu, payload, "download", 0x74)
+    
+    def request_upload(self, ecu, payload: bytes) -> bytes:
+        """Handle RequestUpload (0x35)"""
+        return self._request_transfer(ecu, payload, "upload", 0x75)
+    
+    def _request_transfer(self, ecu, payload: bytes, direction: str, response_sid: int) -> bytes:
+        """Parse address / size and open a transfer"""
+        if len(payload) < 2:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        data_format, address_and_length_format = payload[0], payload[1]
+        size_length = address_and_length_format >> 4
+        address_length = address_and_length_format & 0x0F
+        if len(payload) != 2 + address_length + size_length:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        if data_format != 0x00 or not size_length or not address_length:
+            return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)  # No compression/encryption
+        if self.direction is not None:
+            return ecu._create_error_response(NRC_UPLOAD_DOWNLOAD_NOT_ACCEPTED)
+        
+        address = int.from_bytes(payload[2:2 + address_length], "big")
+        size = int.from_bytes(payload[2 + address_length:], "big")
+        if not size or not self.memory.contains(address, size):
+            return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)
+        
+        self._reset()
+        self.direction = direction
+        self.address = address
+        self.size = size
+        if self.hash_algorithm:
+            self._hash = hashlib.new(self.hash_algorithm)
+        
+        length_size = 2 if self.max_block_length <= 0xFFFF else 4
+        block_length = self.max_block_length.to_bytes(length_size, "big")
+        return bytes([response_sid, len(block_length) << 4]) + block_length
+    
+    def transfer_data(self, ecu, payload: bytes) -> bytes:
+        """Handle TransferData (0x36)"""
+        if not payload:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        if self.direction is None:
+            return ecu._create_error_response(NRC_REQUEST_SEQUENCE_ERROR)
+        
+        sequence = payload[0]
+        expected = (self._sequence + 1) & 0xFF
+        if sequence != expected:
+            if self.transferred and sequence == self._sequence and self.direction == "download":
+                return bytes([0x76, sequence])  # Repeated block, already written
+            return ecu._create_error_response(NRC_WRONG_BLOCK_SEQUENCE_COUNTER)
+        
+        if self.direction == "upload":
+            if len(payload) != 1:
+                return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+            if self.transferred >= self.size:
+                return ecu._create_error_response(NRC_REQUEST_SEQUENCE_ERROR)
+            length = min(self.max_block_length - 2, self.size - self.transferred)
+            data = self.memory.read(self.address + self.transferred, length)
+            self._update(data)
+            self._sequence = sequence
+            return bytes([0x76, sequence]) + data
+        
+        block = memoryview(payload)[1:]
+        if len(payload) + 1 > self.max_block_length:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        if self.transferred + len(block) > self.size:
+            return ecu._create_error_response(NRC_TRANSFER_DATA_SUSPENDED)
+        self.memory.write(self.address + self.transferred, block)
+        self._update(block)
+        self._sequence = sequence
+        return bytes([0x76, sequence])
+    
+    def _update(self, data):
+        """Advance the position and running checksums"""
+        self.transferred += len(data)
+        self.crc = zlib.crc32(data, self.crc)
+        if self._hash is not None:
+            self._hash.update(data)
+    
+    def request_transfer_exit(self, ecu, payload: bytes) -> bytes:
+        """Handle RequestTransferExit (0x37)"""
+        if self.direction is None or self.transferred != self.size:
+            return ecu._create_error_response(NRC_REQUEST_SEQUENCE_ERROR)
+        if payload and len(payload) != 4:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        
+        crc = self.crc
+        digest = self._hash.hexdigest() if self._hash is not None else None
+        if payload and int.from_bytes(payload, "big") != crc:
+            self._reset()
+            return ecu._create_error_response(NRC_GENERAL_PROGRAMMING_FAILURE)
+        
+        self.memory.flush()
+        self._reset()
+        self.crc = crc
+        self.digest = digest
+        return bytes([0x77]) + crc.to_bytes(4, "big")
@@ -0,0 +1,79 @@
+"""Vehicle Gateway routing CAN frames to many Virtual ECUs"""
+
+from .docan_bus import DoCAN
+
+# Negative responses an ECU must not send to functionally addressed requests
+# (ISO 14229-1 7.5): service/sub-function not supported, request out of range
+FUNCTIONAL_SUPPRESSED_NRCS = frozenset([0x11, 0x12, 0x31, 0x7E, 0x7F])
+
+
+class Gateway:
+    """Gateway simulating a vehicle network of Virtual ECUs in one process
+    
+    Physical requests are routed through an arbitration ID index, so the
+    cost per frame does not depend on the number of ECUs. Functional
+    requests (e.g. 0x7DF) are fanned out to every ECU and their responses
+    collected.
+    """
+    
+    OBD_FUNCTIONAL_ID = 0x7DF
+    
+    def __init__(self, functional_ids=(OBD_FUNCTIONAL_ID,)):
+        """Initialize gateway"""
+        self.functional_ids = set(functional_ids)
+        self.ecus = {}
+        self._routes = {}
+        self._members = []
+        self._docan = DoCAN()
+    
+    def add_ecu(self, ecu, request_id: int, response_id: int):
+        """Attach an ECU on its physical request / response IDs"""
+        if request_id in self._routes or request_id in self.functional_ids:
+            raise ValueError(f"Arbitration ID 0x{request_id:X} is already in use")
+        if ecu.ecu_id in self.ecus:
+            raise ValueError(f"ECU {ecu.ecu_id} is already attached")
+        
+        self.ecus[ecu.ecu_id] = ecu
+        self._routes[request_id] = (ecu, response_id)
+        self._members.append((ecu, response_id))
+    
+    def remove_ecu(self, ecu_id: str):
+        """Detach an ECU"""
+        ecu = self.ecus.pop(ecu_id)
+        self._routes = {
+            request_id: route for request_id, route in self._routes.items() if route[0] is not ecu
+        }
+        self._members = [member for member in self._members if member[0] is not ecu]
+    
+    def route(self, arbitration_id: int, frame: bytes) -> list:
+        """Deliver a frame and return the ``(response_id, frame)`` replies"""
+        route = self._routes.get(arbitration_id)
+        if route is not None:
+            ecu, response_id = route
+            if not ecu.is_running:
+                return []
+            return [(response_id, response) for response in ecu.process_frame(frame)]
+        
+        if arbitration_id in self.functional_ids:
+            return self._route_functional(frame)
+        return []
+    
+    def _route_functional(self, frame: bytes) -> list:
+        """Fan a functionally addressed single frame out to every ECU"""
+        parsed = self._docan.parse_frame(frame)
+        if parsed.get("type") != "SingleFrame" or not parsed["length"]:
+            return []  # Functional requests are single frame only
+        
+        request = parsed["data"]
+        responses = []
+        for ecu, response_id in self._members:
+            if not ecu.is_running:
+                continue
+            response = ecu.process_uds_request(request)
+            if not response:
+                continue
+            if response[0] == 0x7F and response[-1] in FUNCTIONAL_SUPPRESSED_NRCS:
+                continue
+            # Long responses continue physically after the tester's Flow Control
+            responses.append((response_id, ecu.docan.start_transmission(response)))
+        return responses
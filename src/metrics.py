@@ -0,0 +1,169 @@
+"""Request, NRC, Latency and Frame Metrics"""
+
+from .docan_bus import FRAME_TYPE_NAMES
+from .uds_protocol import UDSProtocol
+
+# Log-linear latency buckets: 4 sub-buckets per power of two of nanoseconds
+# (at most 25 % relative error), up to ~137 s; slower requests land in the last.
+LATENCY_BUCKETS = 144
+
+# Buckets exported as Prometheus ``le`` boundaries: every fourth bucket ends
+# on a power of two (2**(i // 4 + 2) ns); 2**10 ns (~1 us) up to 2**34 ns (~17 s)
+PROMETHEUS_BUCKETS = range(35, 132, 4)
+
+
+def latency_bucket(ns: int) -> int:
+    """Bucket index for a latency in nanoseconds"""
+    if ns < 4:
+        return ns
+    shift = ns.bit_length() - 3
+    index = (shift << 2) + (ns >> shift)
+    return index if index < LATENCY_BUCKETS else LATENCY_BUCKETS - 1
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Exclusive upper bound of a latency bucket in nanoseconds"""
+    if index < 4:
+        return index + 1
+    return (index % 4 + 5) << (index // 4 - 1)
+
+
+class Metrics:
+    """Counters and histograms for one ECU or a whole fleet
+    
+    Attach with ``VirtualECU.enable_metrics``; several ECUs may share one
+    instance to aggregate a fleet. While no ``Metrics`` is attached the hot
+    paths only test ``ecu.metrics is None``. Counters are plain lists
+    indexed by SID, NRC and DoCAN frame type.
+    """
+    
+    def __init__(self):
+        """Initialize empty counters"""
+        self.reset()
+    
+    def reset(self):
+        """Zero every counter"""
+        self.requests = [0] * 256
+        self.nrcs = [0] * 256
+        self.latency = {}
+        self.latency_sum = [0] * 256
+        self.frames_received = [0] * 16
+        self.frames_sent = [0] * 16
+        self.cache_hits = [0] * 256
+        self.cache_misses = [0] * 256
+    
+    def observe(self, service_id: int, response: bytes, elapsed_ns: int):
+        """Record one handled request"""
+        self.requests[service_id] += 1
+        if response and response[0] == 0x7F and len(response) > 2:
+            self.nrcs[response[2]] += 1
+        histogram = self.latency.get(service_id)
+        if histogram is None:
+            histogram = self.latency[service_id] = [0] * LATENCY_BUCKETS
+        histogram[latency_bucket(elapsed_ns)] += 1
+        self.latency_sum[service_id] += elapsed_ns
+    
+    def quantile(self, service_id: int, q: float) -> float:
+        """Latency quantile for a service in seconds (bucket upper bound)"""
+        histogram = self.latency.get(service_id)
+        if not histogram:
+            return 0.0
+        target = q * sum(histogram)
+        seen = 0
+        for index, count in enumerate(histogram):
+            seen += count
+            if count and seen >= target:
+                return bucket_upper_bound(index) / 1e9
+        return bucket_upper_bound(LATENCY_BUCKETS - 1) / 1e9
+    
+    def snapshot(self) -> dict:
+        """JSON-serializable view of the non-zero counters"""
+        services = {}
+        for sid, count in enumerate(self.requests):
+            if not count:
+                continue
+            services[f"0x{sid:02X}"] = {
+                "name": UDSProtocol.SERVICE_NAMES.get(sid, "Unknown"),
+                "requests": count,
+                "latency_seconds": {
+                    "mean": self.latency_sum[sid] / count / 1e9,
+                    "p50": self.quantile(sid, 0.5),
+                    "p90": self.quantile(sid, 0.9),
+                    "p99": self.quantile(sid, 0.99),
+                },
+            }
+            lookups = self.cache_hits[sid] + self.cache_misses[sid]
+            if lookups:
+                services[f"0x{sid:02X}"]["response_cache"] = {
+                    "hits": self.cache_hits[sid],
+                    "misses": self.cache_misses[sid],
+                    "hit_ratio": self.cache_hits[sid] / lookups,
+                }
+        return {
+            "services": services,
+            "nrcs": {f"0x{nrc:02X}": count for nrc, count in enumerate(self.nrcs) if count},
+            "frames": {
+                "received": dict(zip(FRAME_TYPE_NAMES, self.frames_received)),
+                "sent": dict(zip(FRAME_TYPE_NAMES, self.frames_sent)),
+            },
+        }
+    
+    def to_json(self) -> str:
+        """Snapshot as a JSON document"""
+        import json  # Deferred: only exporting needs it
+        
+        return json.dumps(self.snapshot())
+    
+    def to_prometheus(self) -> str:
+        """Snapshot in the Prometheus text exposition format"""
+        lines = [
+            "# HELP uds_requests_total UDS requests handled by service",
+            "# TYPE uds_requests_total counter",
+        ]
+        for sid, count in enumerate(self.requests):
+            if count:
+                name = UDSProtocol.SERVICE_NAMES.get(sid, "Unknown")
+                lines.append(f'uds_requests_total{{sid="0x{sid:02X}",service="{name}"}} {count}')
+        
+        lines.append("# HELP uds_negative_responses_total Negative responses by NRC")
+        lines.append("# TYPE uds_negative_responses_total counter")
+        for nrc, count in enumerate(self.nrcs):
+            if count:
+                lines.append(f'uds_negative_responses_total{{nrc="0x{nrc:02X}"}} {count}')
+        
+        lines.append("# HELP uds_request_duration_seconds Request handling time by service")
+        lines.append("# TYPE uds_request_duration_seconds histogram")
+        for sid in sorted(self.latency):
+            histogram = self.latency[sid]
+            label = f'sid="0x{sid:02X}"'
+            cumulative = 0
+            previous = 0
+            for index in PROMETHEUS_BUCKETS:
+                cumulative += sum(histogram[previous:index + 1])
+                previous = index + 1
+                le = bucket_upper_bound(index) / 1e9
+                lines.append(f'uds_request_duration_seconds_bucket{{{label},le="{le:g}"}} '
+                             f'{cumulative}')
+            lines.append(f'uds_request_duration_seconds_bucket{{{label},le="+Inf"}} '
+                         f'{self.requests[sid]}')
+            lines.append(f"uds_request_duration_seconds_sum{{{label}}} "
+                         f"{self.latency_sum[sid] / 1e9:g}")
+            lines.append(f"uds_request_duration_seconds_count{{{label}}} {self.requests[sid]}")
+        
+        if any(self.cache_hits) or any(self.cache_misses):
+            lines.append("# HELP uds_response_cache_lookups_total "
+                         "Response cache lookups by service and result")
+            lines.append("# TYPE uds_response_cache_lookups_total counter")
+            for sid in range(256):
+                for result, counts in (("hit", self.cache_hits), ("miss", self.cache_misses)):
+                    if self.cache_hits[sid] or self.cache_misses[sid]:
+                        lines.append(f'uds_response_cache_lookups_total{{sid="0x{sid:02X}",'
+                                     f'result="{result}"}} {counts[sid]}')
+        
+        lines.append("# HELP docan_frames_total DoCAN frames by direction and type")
+        lines.append("# TYPE docan_frames_total counter")
+        for direction, counts in (("rx", self.frames_received), ("tx", self.frames_sent)):
+            for frame_type, count in zip(FRAME_TYPE_NAMES, counts):
+                lines.append(f'docan_frames_total{{direction="{direction}",'
+                             f'type="{frame_type}"}} {count}')
+        return "\n".join(lines) + "\n"
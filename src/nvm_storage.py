@@ -0,0 +1,293 @@
+"""Memory-mapped Persistent DID / DTC Storage (NVM image)"""
+
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Optional
+
+from .dtc_store import ALL_DTC_GROUP, DTCOverlay, DTCStore
+
+# Image layout (little-endian):
+#   header | DID column (u16) | offset column (u32) | length column (u16) |
+#   capacity column (u16) | DTC records (DTC + status, as on the wire) | DID values
+HEADER = struct.Struct("<8sHHIIIII")
+MAGIC = b"VECU-NVM"
+VERSION = 1
+DTC_RECORD_SIZE = 4
+DTC_COUNT_OFFSET = 16  # Byte offset of the DTC count in the header
+
+
+def _align(offset: int) -> int:
+    """Round up to a 4-byte boundary"""
+    return (offset + 3) & ~3
+
+
+class NVMImage:
+    """Prebuilt ECU image holding DIDs and DTCs in a memory-mapped file
+    
+    Opening an image only maps the file; DIDs are looked up by binary search
+    over the mapped DID column, so start-up cost does not grow with the
+    number of DIDs. Writes change the mapped bytes in place. Each DID has a
+    fixed capacity reserved when the image is built, and the DTC area has a
+    fixed number of record slots.
+    """
+    
+    def __init__(self, path: str):
+        """Open and map an existing image"""
+        if sys.byteorder != "little":
+            raise ValueError("NVM images require a little-endian host")
+        self.path = path
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        
+        magic, version, _, did_count, dtc_count, dtc_capacity, dtc_offset, data_offset = (
+            HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} NVM image")
+        
+        self.dtc_capacity = dtc_capacity
+        self._dtc_offset = dtc_offset
+        self._data_offset = data_offset
+        dids_offset, offsets_offset, lengths_offset, capacities_offset = (
+            self._column_offsets(did_count)
+        )
+        view = self._view = memoryview(self._mm)
+        self._dids = view[dids_offset:dids_offset + 2 * did_count].cast("H")
+        self._offsets = view[offsets_offset:offsets_offset + 4 * did_count].cast("I")
+        self._lengths = view[lengths_offset:lengths_offset + 2 * did_count].cast("H")
+        self._capacities = view[capacities_offset:capacities_offset + 2 * did_count].cast("H")
+        self.dids = NVMDataIdentifiers(self)
+        self._dtcs: Optional[NVMDTCStore] = None
+    
+    @staticmethod
+    def _column_offsets(did_count: int) -> tuple:
+        """Offsets of the DID, offset, length and capacity columns"""
+        dids = HEADER.size
+        offsets = _align(dids + 2 * did_count)
+        lengths = offsets + 4 * did_count
+        capacities = lengths + 2 * did_count
+        return dids, offsets, lengths, capacities
+    
+    @classmethod
+    def build(cls, path: str, data_identifiers: dict, dtcs=(),
+              did_capacities: Optional[dict] = None,
+              dtc_capacity: Optional[int] = None) -> "NVMImage":
+        """Write a new image and open it
+        
+        ``dtcs`` is an iterable of DTC numbers or ``(dtc, status)`` pairs, or
+        a ``DTCStore`` / ``DTCOverlay``. ``did_capacities`` reserves extra
+        room per DID for longer values written later; by default a DID's
+        capacity is its current length.
+        """
+        did_capacities = did_capacities or {}
+        if isinstance(dtcs, (DTCStore, DTCOverlay)):
+            dtc_records = [(dtc, dtcs.status_of(dtc)) for dtc in dtcs]
+        else:
+            dtc_records = [item if isinstance(item, tuple) else (item, 0x09) for item in dtcs]
+        dtc_capacity = max(dtc_capacity or 0, len(dtc_records))
+        
+        dids = sorted(data_identifiers)
+        count = len(dids)
+        _, _, _, capacities_offset = cls._column_offsets(count)
+        dtc_offset = _align(capacities_offset + 2 * count)
+        data_offset = dtc_offset + DTC_RECORD_SIZE * dtc_capacity
+        
+        offsets = array("I")
+        lengths = array("H")
+        capacities = array("H")
+        data = bytearray()
+        for did in dids:
+            value = bytes(data_identifiers[did])
+            capacity = max(did_capacities.get(did, 0), len(value))
+            if capacity > 0xFFFF:
+                raise ValueError(f"DID 0x{did:04X} is too long for an NVM image")
+            offsets.append(data_offset + len(data))
+            lengths.append(len(value))
+            capacities.append(capacity)
+            data += value + bytes(capacity - len(value))
+        
+        records = bytearray(DTC_RECORD_SIZE * dtc_capacity)
+        for row, (dtc, status) in enumerate(dtc_records):
+            struct.pack_into(">I", records, row * DTC_RECORD_SIZE, (dtc << 8) | status)
+        
+        with open(path, "wb") as fh:
+            fh.write(HEADER.pack(MAGIC, VERSION, 0, count, len(dtc_records), dtc_capacity,
+                                 dtc_offset, data_offset))
+            fh.write(array("H", dids).tobytes())
+            fh.write(bytes(_align(fh.tell()) - fh.tell()))
+            fh.write(offsets.tobytes())
+            fh.write(lengths.tobytes())
+            fh.write(capacities.tobytes())
+            fh.write(bytes(dtc_offset - fh.tell()))
+            fh.write(records)
+            fh.write(data)
+        return cls(path)
+    
+    @classmethod
+    def from_ecu(cls, path: str, ecu, did_capacities: Optional[dict] = None,
+                 dtc_capacity: Optional[int] = None) -> "NVMImage":
+        """Write an image from a configured ECU's DIDs and DTCs"""
+        return cls.build(path, ecu.data_identifiers, ecu.dtc_codes, did_capacities, dtc_capacity)
+    
+    @property
+    def dtcs(self) -> "NVMDTCStore":
+        """DTC store backed by the image (loaded on first use)"""
+        if self._dtcs is None:
+            self._dtcs = NVMDTCStore(self)
+        return self._dtcs
+    
+    def attach(self, ecu):
+        """Make an ECU read and write its DIDs and DTCs through the image"""
+        ecu.data_identifiers = self.dids
+        ecu.dtc_codes = self.dtcs
+        return ecu
+    
+    def flush(self):
+        """Flush pending writes to disk"""
+        self._mm.flush()
+    
+    def close(self):
+        """Unmap and close the image file"""
+        if self._mm.closed:
+            return
+        for name in ("_dids", "_offsets", "_lengths", "_capacities", "_view"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
+        self._file.close()
+    
+    def __enter__(self):
+        """Return the open image"""
+        return self
+    
+    def __exit__(self, *exc_info):
+        """Close the image"""
+        self.close()
+    
+    def _find(self, did: int) -> int:
+        """Row of a DID, or -1"""
+        dids = self._dids
+        row = bisect_left(dids, did)
+        if row < len(dids) and dids[row] == did:
+            return row
+        return -1
+
+
+class NVMDataIdentifiers:
+    """Dict-like view of the DIDs stored in an NVM image"""
+    
+    def __init__(self, image: NVMImage):
+        """Wrap an open image"""
+        self._image = image
+    
+    def __len__(self) -> int:
+        """Number of DIDs in the image"""
+        return len(self._image._dids)
+    
+    def __iter__(self):
+        """Iterate over DIDs in ascending order"""
+        return iter(self._image._dids.tolist())
+    
+    def __contains__(self, did: int) -> bool:
+        """Check whether the image holds a DID"""
+        return self._image._find(did) >= 0
+    
+    def __getitem__(self, did: int) -> bytes:
+        """Read a DID value"""
+        image = self._image
+        row = image._find(did)
+        if row < 0:
+            raise KeyError(did)
+        offset = image._offsets[row]
+        return image._mm[offset:offset + image._lengths[row]]
+    
+    def get(self, did: int, default=None):
+        """Read a DID value, or ``default`` if the image does not hold it"""
+        try:
+            return self[did]
+        except KeyError:
+            return default
+    
+    def __setitem__(self, did: int, value: bytes):
+        """Write a DID value in place
+        
+        Raises ``KeyError`` for DIDs not in the image and ``ValueError`` for
+        values longer than the DID's reserved capacity.
+        """
+        image = self._image
+        row = image._find(did)
+        if row < 0:
+            raise KeyError(did)
+        if len(value) > image._capacities[row]:
+            raise ValueError(f"Value exceeds capacity of DID 0x{did:04X}")
+        offset = image._offsets[row]
+        image._mm[offset:offset + len(value)] = value
+        image._lengths[row] = len(value)
+    
+    def keys(self):
+        """DIDs in ascending order"""
+        return list(self)
+    
+    def items(self):
+        """``(did, value)`` pairs"""
+        return [(did, self[did]) for did in self]
+
+
+class NVMDTCStore(DTCStore):
+    """DTC store whose changes are written through to an NVM image"""
+    
+    def __init__(self, image: NVMImage):
+        """Load the DTC records from the image"""
+        super().__init__()
+        self._image = image
+        count = struct.unpack_from("<I", image._mm, DTC_COUNT_OFFSET)[0]
+        start = image._dtc_offset
+        records = image._mm[start:start + DTC_RECORD_SIZE * count]
+        # Records are big-endian DTC + status; widen the DTC bytes to 32 bits
+        numbers = bytearray(len(records))
+        for byte in range(1, DTC_RECORD_SIZE):
+            numbers[byte::DTC_RECORD_SIZE] = records[byte - 1::DTC_RECORD_SIZE]
+        self._numbers = array("I", numbers)
+        self._numbers.byteswap()
+        self._status = bytearray(records[DTC_RECORD_SIZE - 1::DTC_RECORD_SIZE])
+        self._rows = dict(zip(self._numbers, range(count)))
+        self._status_counts = Counter(self._status)
+    
+    def add(self, dtc: int, status: int = 0x09):
+        """Store a DTC and write its record to the image"""
+        row = self._rows.get(dtc, len(self))
+        if row >= self._image.dtc_capacity:
+            raise ValueError("NVM image DTC area is full")
+        super().add(dtc, status)
+        self._write_record(row)
+        self._write_count()
+    
+    def clear(self, group: int = ALL_DTC_GROUP) -> bool:
+        """Clear a DTC group and update the image"""
+        if not super().clear(group):
+            return False
+        if group != ALL_DTC_GROUP:
+            # Rewrite the remaining records, packed from the start of the area
+            records = array("I", [(dtc << 8) | status
+                                  for dtc, status in zip(self._numbers, self._status)])
+            records.byteswap()  # Big-endian, as loaded
+            offset = self._image._dtc_offset
+            self._image._mm[offset:offset + DTC_RECORD_SIZE * len(records)] = records.tobytes()
+        self._write_count()
+        return True
+    
+    def _write_record(self, row: int):
+        """Write one DTC record in place"""
+        record = (self._numbers[row] << 8) | self._status[row]
+        offset = self._image._dtc_offset + row * DTC_RECORD_SIZE
+        struct.pack_into(">I", self._image._mm, offset, record)
+    
+    def _write_count(self):
+        """Update the DTC count in the image header"""
+        struct.pack_into("<I", self._image._mm, DTC_COUNT_OFFSET, len(self))
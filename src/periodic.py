@@ -0,0 +1,310 @@
+"""Dynamically Defined DIDs (0x2C) and Periodic Reads (0x2A)"""
+
+from typing import Optional
+
+from .timer_wheel import TimerWheel, shared_wheel
+
+# DynamicallyDefineDataIdentifier sub-functions (ISO 14229-1 10.6)
+DEFINE_BY_IDENTIFIER = 0x01
+DEFINE_BY_MEMORY_ADDRESS = 0x02
+CLEAR_DYNAMIC_IDENTIFIER = 0x03
+
+# DIDs that can be defined dynamically / read periodically (0xF2xx = periodic ID xx)
+DYNAMIC_DID_RANGE = range(0xF200, 0xF400)
+PERIODIC_DID_BASE = 0xF200
+
+# ReadDataByPeriodicIdentifier transmission modes (ISO 14229-1 10.5)
+SEND_AT_SLOW_RATE = 0x01
+SEND_AT_MEDIUM_RATE = 0x02
+SEND_AT_FAST_RATE = 0x03
+STOP_SENDING = 0x04
+
+NRC_SUBFUNCTION_NOT_SUPPORTED = 0x12
+NRC_INCORRECT_LENGTH = 0x13
+NRC_REQUEST_OUT_OF_RANGE = 0x31
+
+
+class SlicePlan:
+    """Compiled layout of a dynamically defined DID
+    
+    ``copies`` holds ``(source DID, source slice, record slice)`` tuples.
+    Sources that are themselves dynamic are flattened and adjacent slices
+    of one source merged when the plan is built, so filling a record is one
+    buffer copy per slice with no decoding.
+    """
+    
+    __slots__ = ("copies", "length")
+    
+    def __init__(self, copies: tuple, length: int):
+        """Initialize plan"""
+        self.copies = copies
+        self.length = length
+    
+    @classmethod
+    def compile(cls, slices) -> "SlicePlan":
+        """Build a plan from ``(source DID, start, size)`` slices in record order"""
+        merged: list = []
+        for did, start, size in slices:
+            if merged and merged[-1][0] == did and merged[-1][1] + merged[-1][2] == start:
+                merged[-1][2] += size  # Contiguous with the previous slice: extend it
+            else:
+                merged.append([did, start, size])
+        copies = []
+        offset = 0
+        for did, start, size in merged:
+            copies.append((did, slice(start, start + size), slice(offset, offset + size)))
+            offset += size
+        return cls(tuple(copies), offset)
+    
+    def slices(self):
+        """``(source DID, start, size)`` slices, for building on this plan"""
+        for did, source, _ in self.copies:
+            yield did, source.start, source.stop - source.start
+    
+    def fill(self, get, view: memoryview):
+        """Copy the record into ``view``, a memoryview of exactly ``length`` bytes"""
+        try:
+            for did, source, target in self.copies:
+                view[target] = get(did)[source]
+        except (TypeError, ValueError):
+            # A source is missing or shorter than when defined: pad with zeros
+            for did, source, target in self.copies:
+                value = (get(did) or b"")[source]
+                view[target] = value + bytes(target.stop - target.start - len(value))
+    
+    def read(self, get) -> bytes:
+        """Assemble the record"""
+        buffer = bytearray(self.length)
+        self.fill(get, memoryview(buffer))
+        return bytes(buffer)
+
+
+class DynamicDataIdentifiers:
+    """Dynamically defined DIDs of one ECU, as compiled slice plans"""
+    
+    def __init__(self):
+        """Initialize without definitions"""
+        self.plans = {}
+    
+    def __contains__(self, did: int) -> bool:
+        """Check whether a DID is dynamically defined"""
+        return did in self.plans
+    
+    def read(self, ecu, did: int):
+        """Value of a dynamic DID, or None if it is not defined"""
+        plan = self.plans.get(did)
+        if plan is None:
+            return None
+        return plan.read(ecu._data_identifier_get())
+    
+    def handle(self, ecu, payload: bytes) -> bytes:
+        """Handle DynamicallyDefineDataIdentifier (0x2C)"""
+        if not payload:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        subfunction = payload[0] & 0x7F
+        if subfunction == DEFINE_BY_IDENTIFIER:
+            response = self._define_by_identifier(ecu, payload)
+        elif subfunction == CLEAR_DYNAMIC_IDENTIFIER:
+            response = self._clear(ecu, payload)
+        else:
+            return ecu._create_error_response(NRC_SUBFUNCTION_NOT_SUPPORTED)
+        if payload[0] & 0x80 and response[0] == 0x6C:
+            return b""  # Positive response suppressed
+        return response
+    
+    def _define_by_identifier(self, ecu, payload: bytes) -> bytes:
+        """Append source DID slices to a dynamic DID"""
+        if len(payload) < 7 or (len(payload) - 3) % 4:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        dddi = int.from_bytes(payload[1:3], "big")
+        if dddi not in DYNAMIC_DID_RANGE:
+            return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)
+        
+        previous = self.plans.get(dddi)
+        slices = list(previous.slices()) if previous is not None else []
+        get = ecu._data_identifier_get()
+        for offset in range(3, len(payload), 4):
+            source = int.from_bytes(payload[offset:offset + 2], "big")
+            position, size = payload[offset + 2], payload[offset + 3]
+            plan = self.plans.get(source)
+            if plan is not None:
+                length = plan.length
+            else:
+                value = get(source)
+                if value is None:
+                    return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)
+                length = len(value)
+            if not position or not size or position - 1 + size > length:
+                return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)
+            
+            start = position - 1
+            if plan is None:
+                slices.append((source, start, size))
+                continue
+            # Dynamic source: take the matching part of its slices
+            skip, remaining = start, size
+            for did, begin, count in plan.slices():
+                if skip >= count:
+                    skip -= count
+                    continue
+                take = min(count - skip, remaining)
+                slices.append((did, begin + skip, take))
+                remaining -= take
+                skip = 0
+                if not remaining:
+                    break
+        
+        self.plans[dddi] = SlicePlan.compile(slices)
+        return bytes([0x6C, DEFINE_BY_IDENTIFIER]) + payload[1:3]
+    
+    def _clear(self, ecu, payload: bytes) -> bytes:
+        """Clear one dynamic DID, or all of them"""
+        if len(payload) == 1:
+            self.plans.clear()
+        elif len(payload) == 3:
+            dddi = int.from_bytes(payload[1:3], "big")
+            if dddi not in DYNAMIC_DID_RANGE:
+                return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)
+            self.plans.pop(dddi, None)
+        else:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        return bytes([0x6C, CLEAR_DYNAMIC_IDENTIFIER]) + payload[1:3]
+
+
+class PeriodicEntry:
+    """One periodic identifier scheduled on one ECU"""
+    
+    __slots__ = ("ecu", "did", "plan", "buffer", "view")
+    
+    def __init__(self, ecu, did: int):
+        """Initialize entry; the record buffer is allocated on first use"""
+        self.ecu = ecu
+        self.did = did
+        self.plan = None
+        self.buffer = None
+        self.view = None
+    
+    def message(self):
+        """Periodic message ``PDID + record``, or None once the DID is gone"""
+        ecu = self.ecu
+        get = ecu._data_identifier_get()
+        dynamic = ecu.dynamic_dids
+        plan = dynamic.plans.get(self.did) if dynamic is not None else None
+        if plan is None:
+            value = get(self.did)
+            if value is None:
+                return None
+            return bytes([self.did & 0xFF]) + value
+        
+        if plan is not self.plan:
+            # New or redefined DID: allocate the message buffer once
+            self.plan = plan
+            self.buffer = bytearray(plan.length + 1)
+            self.buffer[0] = self.did & 0xFF
+            self.view = memoryview(self.buffer)[1:]
+        plan.fill(get, self.view)
+        return bytes(self.buffer)
+
+
+class PeriodicScheduler:
+    """ReadDataByPeriodicIdentifier (0x2A) server shared by many ECUs
+    
+    Every periodic identifier scheduled on any installed ECU sits in one
+    table per rate, and each rate is driven by a single timer on the
+    ``TimerWheel``, so a fleet streaming thousands of identifiers costs
+    three timers. On each tick the scheduler fills the records from their
+    slice plans and passes ``(ecu, message)`` to ``sink``; a message is the
+    periodic identifier (the low byte of DID 0xF2xx) followed by the record.
+    ``ECUServer.send_periodic`` is a sink that sends it on the ECU's channel.
+    An exception from one entry (its sink or its DID value) does not stop
+    the others or the schedule; it is counted in ``errors`` and kept as
+    ``last_error``.
+    """
+    
+    def __init__(self, sink, timers: Optional[TimerWheel] = None, slow: float = 1.0,
+                 medium: float = 0.1, fast: float = 0.02):
+        """Initialize scheduler with the period of each rate in seconds"""
+        self.sink = sink
+        self.timers = timers if timers is not None else shared_wheel()
+        self.periods = {SEND_AT_SLOW_RATE: slow, SEND_AT_MEDIUM_RATE: medium,
+                        SEND_AT_FAST_RATE: fast}
+        self.schedules: dict = {mode: {} for mode in self.periods}
+        self._timers: dict = {mode: None for mode in self.periods}
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+    
+    def install(self, ecu) -> "PeriodicScheduler":
+        """Register ReadDataByPeriodicIdentifier on an ECU"""
+        ecu.services.register(0x2A)(self.read_periodic)
+        return self
+    
+    def __len__(self) -> int:
+        """Number of scheduled periodic identifiers"""
+        return sum(len(entries) for entries in self.schedules.values())
+    
+    def read_periodic(self, ecu, payload: bytes) -> bytes:
+        """Handle ReadDataByPeriodicIdentifier (0x2A)"""
+        if not payload:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        mode = payload[0]
+        if mode == STOP_SENDING:
+            self.stop(ecu, [PERIODIC_DID_BASE | pdid for pdid in payload[1:]] or None)
+            return b"\x6A"
+        if mode not in self.periods:
+            return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)
+        if len(payload) < 2:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        
+        dids = [PERIODIC_DID_BASE | pdid for pdid in payload[1:]]
+        dynamic = ecu.dynamic_dids
+        signals = ecu.signals
+        for did in dids:
+            if (did not in ecu.data_identifiers and (dynamic is None or did not in dynamic)
+                    and (signals is None or did not in signals)):
+                return ecu._create_error_response(NRC_REQUEST_OUT_OF_RANGE)
+        
+        self.stop(ecu, dids)
+        entries = self.schedules[mode]
+        for did in dids:
+            entries[id(ecu), did] = PeriodicEntry(ecu, did)
+        if self._timers[mode] is None:
+            self._timers[mode] = self.timers.schedule(self.periods[mode], self._tick, mode)
+        return b"\x6A"
+    
+    def stop(self, ecu, dids=None):
+        """Stop periodic identifiers of an ECU (default: all of them)"""
+        key = id(ecu)
+        for entries in self.schedules.values():
+            if dids is None:
+                for entry_key in [k for k in entries if k[0] == key]:
+                    del entries[entry_key]
+            else:
+                for did in dids:
+                    entries.pop((key, did), None)
+    
+    def _tick(self, mode: int):
+        """Send every identifier scheduled at a rate and re-arm its timer"""
+        self._timers[mode] = None
+        entries = self.schedules[mode]
+        sink = self.sink
+        stale = []
+        try:
+            # Iterate over a copy: a sink may stop identifiers
+            for key, entry in list(entries.items()):
+                if not entry.ecu.is_running:
+                    continue
+                try:
+                    message = entry.message()
+                    if message is None:
+                        stale.append(key)  # Dynamic DID cleared: stop sending it
+                    else:
+                        sink(entry.ecu, message)
+                except Exception as exc:
+                    # Never let it escape into the request that advanced the wheel
+                    self.errors += 1
+                    self.last_error = exc
+            for key in stale:
+                entries.pop(key, None)
+        finally:
+            if entries and self._timers[mode] is None:
+                self._timers[mode] = self.timers.schedule(self.periods[mode], self._tick, mode)
@@ -0,0 +1,81 @@
+"""LRU Response Cache for Read-only UDS Services"""
+
+from collections import OrderedDict
+
+# Services whose responses depend only on the request, the session and the
+# DID / DTC tables: ReadDTCInformation and ReadDataByIdentifier
+CACHEABLE_SERVICES = frozenset((0x19, 0x22))
+
+
+class ResponseCache:
+    """LRU cache of responses to read-only requests
+    
+    Entries are keyed by the raw request and the session state (session
+    type and security level), and store the ECU's ``state_version`` at the
+    time the response was built. ``set_data_identifier``, ``add_dtc``,
+    ``clear_dtcs``, ClearDiagnosticInformation and DynamicallyDefineDataIdentifier
+    bump the version, so an entry built before a write is rebuilt rather
+    than served. Responses that read a provided DID (see ``DataProviders``)
+    are not cached. Tables changed behind the ECU's back (e.g. assigning to
+    ``data_identifiers`` directly) need ``clear``. Least recently used
+    entries are evicted beyond ``capacity``.
+    """
+    
+    def __init__(self, capacity: int = 1024, services=CACHEABLE_SERVICES):
+        """Initialize empty cache"""
+        if capacity < 1:
+            raise ValueError("Cache capacity must be at least 1")
+        self.capacity = capacity
+        self.services = frozenset(services)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+    
+    def __len__(self) -> int:
+        """Number of cached responses"""
+        return len(self._entries)
+    
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def respond(self, ecu, service_id: int, payload: bytes, handler) -> bytes:
+        """Cached response to a request, calling ``handler`` on a miss"""
+        session = ecu.session
+        key = (service_id, payload if type(payload) is bytes else bytes(payload),
+               session.session, session.security_level)
+        entries = self._entries
+        version = ecu.state_version
+        entry = entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            if ecu.metrics is not None:
+                ecu.metrics.cache_hits[service_id] += 1
+            try:
+                entries.move_to_end(key)
+            except KeyError:
+                pass  # Evicted by another channel meanwhile
+            return entry[1]
+        
+        self.misses += 1
+        if ecu.metrics is not None:
+            ecu.metrics.cache_misses[service_id] += 1
+        signals = ecu.signals
+        reads = signals.reads if signals is not None else 0
+        response = handler(ecu, payload)
+        if signals is not None and signals.reads != reads:
+            return response  # Read a provided, time-varying DID: never cached
+        entries[key] = (version, response)
+        entries.move_to_end(key)
+        while len(entries) > self.capacity:
+            try:
+                entries.popitem(last=False)
+            except KeyError:
+                break
+        return response
+    
+    def clear(self):
+        """Drop every cached response"""
+        self._entries.clear()
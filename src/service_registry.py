@@ -0,0 +1,80 @@
+"""UDS Service Dispatch Table"""
+
+from typing import Optional
+
+
+class ServiceRegistry:
+    """SID-indexed table of UDS service handlers
+    
+    Handlers are plain callables taking ``(ecu, payload)`` and returning the
+    UDS response bytes. Services with sub-functions can register handlers
+    per sub-function; those take precedence over the service-level handler.
+    Copies share the tables until either side registers a handler.
+    """
+    
+    def __init__(self):
+        """Initialize empty handler tables"""
+        self.handlers = [None] * 256
+        self.subfunctions = [None] * 256
+        self._shared = False
+    
+    def _unshare(self):
+        """Take private copies of tables shared with a copy"""
+        self.handlers = list(self.handlers)
+        self.subfunctions = [
+            list(table) if table is not None else None for table in self.subfunctions
+        ]
+        self._shared = False
+    
+    def register(self, service_id: int, subfunction: Optional[int] = None):
+        """Decorator registering a handler for a service or sub-function"""
+        if not 0 <= service_id <= 0xFF:
+            raise ValueError("Service ID must be in range 0x00-0xFF")
+        if subfunction is not None and not 0 <= subfunction <= 0x7F:
+            raise ValueError("Sub-function must be in range 0x00-0x7F")
+        
+        def decorator(handler):
+            if self._shared:
+                self._unshare()
+            if subfunction is None:
+                self.handlers[service_id] = handler
+            else:
+                table = self.subfunctions[service_id]
+                if table is None:
+                    table = self.subfunctions[service_id] = [None] * 128
+                table[subfunction] = handler
+            return handler
+        return decorator
+    
+    def unregister(self, service_id: int):
+        """Remove the service-level and sub-function handlers of a service"""
+        if self.handlers[service_id] is None and self.subfunctions[service_id] is None:
+            return
+        if self._shared:
+            self._unshare()
+        self.handlers[service_id] = None
+        self.subfunctions[service_id] = None
+    
+    def lookup(self, service_id: int, payload: bytes):
+        """Return the handler for a request, or None if unsupported"""
+        table = self.subfunctions[service_id]
+        if table is not None and payload:
+            handler = table[payload[0] & 0x7F]  # Ignore suppressPosRspMsgIndicationBit
+            if handler is not None:
+                return handler
+        return self.handlers[service_id]
+    
+    def copy(self) -> "ServiceRegistry":
+        """Return an independent copy of the handler tables (copied on write)"""
+        registry = ServiceRegistry.__new__(ServiceRegistry)
+        registry.handlers = self.handlers
+        registry.subfunctions = self.subfunctions
+        registry._shared = self._shared = True
+        return registry
+    
+    def supported_services(self) -> list:
+        """List service IDs that have at least one handler"""
+        return [
+            sid for sid in range(256)
+            if self.handlers[sid] is not None or self.subfunctions[sid] is not None
+        ]
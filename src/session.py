@@ -0,0 +1,184 @@
+"""Diagnostic Session and SecurityAccess State Machine"""
+
+import os
+from typing import Optional
+
+from .timer_wheel import Timer, TimerWheel, shared_wheel
+
+# Diagnostic sessions (ISO 14229-1 10.2)
+DEFAULT_SESSION = 0x01
+PROGRAMMING_SESSION = 0x02
+EXTENDED_SESSION = 0x03
+
+# Negative response codes used by the session services
+NRC_SUBFUNCTION_NOT_SUPPORTED = 0x12
+NRC_INCORRECT_LENGTH = 0x13
+NRC_REQUEST_SEQUENCE_ERROR = 0x24
+NRC_INVALID_KEY = 0x35
+NRC_EXCEEDED_NUMBER_OF_ATTEMPTS = 0x36
+NRC_REQUIRED_TIME_DELAY_NOT_EXPIRED = 0x37
+NRC_RESPONSE_PENDING = 0x78
+NRC_SERVICE_NOT_SUPPORTED_IN_ACTIVE_SESSION = 0x7F
+
+
+def default_key(seed: bytes, level: int) -> bytes:
+    """Key for a seed: each byte XORed with a level-dependent constant"""
+    return bytes(b ^ (0xA5 + level) & 0xFF for b in seed)
+
+
+class DiagnosticSession:
+    """Active diagnostic session, security level and their timers
+    
+    A non-default session falls back to the default session (and relocks
+    security) when no request arrives within the S3 server time. Requests
+    only move a deadline; the single S3 timer on the shared ``TimerWheel``
+    re-arms itself for the remaining time when it fires early, so busy
+    testers cost no timer operations per request. Too many invalid keys
+    lock SecurityAccess for ``security_delay`` seconds.
+    """
+    
+    SESSIONS = (DEFAULT_SESSION, PROGRAMMING_SESSION, EXTENDED_SESSION)
+    
+    def __init__(self, uds, timers: Optional[TimerWheel] = None, s3_server: float = 5.0,
+                 p2_server: float = 0.05, p2_star_server: float = 5.0,
+                 security_delay: float = 10.0, max_attempts: int = 3,
+                 key_function=default_key, seed_length: int = 4,
+                 sessions: tuple = SESSIONS, security_levels: Optional[tuple] = None):
+        """Initialize in the default session with security locked
+        
+        ``sessions`` lists the supported session types and
+        ``security_levels`` the supported SecurityAccess levels (default:
+        every level).
+        """
+        self.uds = uds
+        self.timers = timers if timers is not None else shared_wheel()
+        self.s3_server = s3_server
+        self.p2_server = p2_server
+        self.p2_star_server = p2_star_server
+        self.security_delay = security_delay
+        self.max_attempts = max_attempts
+        self.key_function = key_function
+        self.seed_length = seed_length
+        self.sessions = sessions
+        self.security_levels = security_levels
+        
+        self.session = DEFAULT_SESSION
+        self.security_level = 0
+        self.failed_attempts = 0
+        self._seed: Optional[bytes] = None
+        self._seed_level = 0
+        self._s3_deadline = 0.0
+        self._s3_timer: Optional[Timer] = None
+        self._lockout_timer: Optional[Timer] = None
+        self._sync()
+    
+    def copy(self, uds, timers: Optional[TimerWheel] = None) -> "DiagnosticSession":
+        """New session with the same configuration, in the default state"""
+        return DiagnosticSession(
+            uds, timers if timers is not None else self.timers, self.s3_server,
+            self.p2_server, self.p2_star_server, self.security_delay, self.max_attempts,
+            self.key_function, self.seed_length, self.sessions, self.security_levels,
+        )
+    
+    @property
+    def locked_out(self) -> bool:
+        """Whether the security-access delay is running"""
+        return self._lockout_timer is not None
+    
+    def _sync(self):
+        """Mirror the state into the ``UDSProtocol`` flags"""
+        self.uds.session_active = self.session != DEFAULT_SESSION
+        self.uds.security_unlocked = self.security_level != 0
+    
+    def change(self, session: int) -> bool:
+        """Switch session; returns False for unsupported sessions
+        
+        Every session transition relocks security.
+        """
+        if session not in self.sessions:
+            return False
+        self.session = session
+        self.security_level = 0
+        self._seed = None
+        self._sync()
+        if session != DEFAULT_SESSION:
+            self.touch()
+        return True
+    
+    def touch(self):
+        """Restart the S3 server timer (called for every request)"""
+        if self.session == DEFAULT_SESSION:
+            return
+        self._s3_deadline = self.timers.time + self.s3_server
+        if self._s3_timer is None:
+            self._s3_timer = self.timers.schedule(self.s3_server, self._s3_expired)
+    
+    def _s3_expired(self):
+        """S3 timer fired: re-arm if a request came in since, else time out"""
+        self._s3_timer = None
+        if self.session == DEFAULT_SESSION:
+            return
+        remaining = self._s3_deadline - self.timers.time
+        if remaining > 0:
+            self._s3_timer = self.timers.schedule(remaining, self._s3_expired)
+        else:
+            self.change(DEFAULT_SESSION)
+    
+    def timing_parameters(self) -> bytes:
+        """P2 (1 ms units) and P2* (10 ms units) for the session control response"""
+        p2 = int(self.p2_server * 1000)
+        p2_star = int(self.p2_star_server * 100)
+        return p2.to_bytes(2, "big") + p2_star.to_bytes(2, "big")
+    
+    def pending_responses(self, elapsed: float) -> int:
+        """Number of NRC 0x78 responses due while a request took ``elapsed`` seconds"""
+        if elapsed <= self.p2_server:
+            return 0
+        return 1 + int((elapsed - self.p2_server) // self.p2_star_server)
+    
+    def security_access(self, ecu, payload: bytes) -> bytes:
+        """Handle SecurityAccess (0x27) requestSeed / sendKey"""
+        if not payload:
+            return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+        if self.session == DEFAULT_SESSION:
+            return ecu._create_error_response(NRC_SERVICE_NOT_SUPPORTED_IN_ACTIVE_SESSION)
+        subfunction = payload[0] & 0x7F
+        if not subfunction or subfunction > 0x7E:
+            return ecu._create_error_response(NRC_SUBFUNCTION_NOT_SUPPORTED)
+        level = (subfunction + 1) // 2
+        if self.security_levels is not None and level not in self.security_levels:
+            return ecu._create_error_response(NRC_SUBFUNCTION_NOT_SUPPORTED)
+        
+        if subfunction & 1:
+            # requestSeed
+            if len(payload) != 1:
+                return ecu._create_error_response(NRC_INCORRECT_LENGTH)
+            if self.locked_out:
+                return ecu._create_error_response(NRC_REQUIRED_TIME_DELAY_NOT_EXPIRED)
+            if self.security_level == level:
+                return bytes([0x67, subfunction]) + bytes(self.seed_length)  # Already unlocked
+            self._seed = os.urandom(self.seed_length)
+            self._seed_level = level
+            return bytes([0x67, subfunction]) + self._seed
+        
+        # sendKey
+        if self._seed is None or self._seed_level != level:
+            return ecu._create_error_response(NRC_REQUEST_SEQUENCE_ERROR)
+        seed, self._seed = self._seed, None
+        if bytes(payload[1:]) != self.key_function(seed, level):
+            self.failed_attempts += 1
+            if self.failed_attempts >= self.max_attempts:
+                self._lockout_timer = self.timers.schedule(self.security_delay,
+                                                           self._lockout_expired)
+                return ecu._create_error_response(NRC_EXCEEDED_NUMBER_OF_ATTEMPTS)
+            return ecu._create_error_response(NRC_INVALID_KEY)
+        
+        self.failed_attempts = 0
+        self.security_level = level
+        self._sync()
+        return bytes([0x67, subfunction])
+    
+    def _lockout_expired(self):
+        """Security delay elapsed: allow new attempts"""
+        self._lockout_timer = None
+        self.failed_attempts = 0
@@ -0,0 +1,184 @@
+"""Process-pool Sharding of Virtual ECU Fleets"""
+
+import multiprocessing
+import os
+import struct
+import zlib
+from multiprocessing import shared_memory
+from typing import Optional, cast
+
+from .virtual_ecu import VirtualECU
+
+# Ring record: local ECU index, position in the output batch, 8-byte frame
+RECORD = struct.Struct("<II8s")
+FRAME_SIZE = 8
+
+
+def shard_for(ecu_id: str, workers: int) -> int:
+    """Stable worker index for an ECU ID (independent of PYTHONHASHSEED)"""
+    return zlib.crc32(ecu_id.encode()) % workers
+
+
+def _worker_main(conn, ecu_factory, ecu_ids, ring_name, out_name, capacity):
+    """Worker loop: process ring records and write responses in place"""
+    ecus = [ecu_factory(ecu_id) for ecu_id in ecu_ids]
+    ring = shared_memory.SharedMemory(name=ring_name)
+    out = shared_memory.SharedMemory(name=out_name)
+    ring_buf = ring.buf
+    out_buf = out.buf
+    unpack_from = RECORD.unpack_from
+    record_size = RECORD.size
+    padding = bytes(FRAME_SIZE)
+    
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            start, count = message
+            for pos in range(start, start + count):
+                local, index, frame = unpack_from(ring_buf, (pos % capacity) * record_size)
+                response = ecus[local].process_request(frame)[:FRAME_SIZE]
+                offset = index * FRAME_SIZE
+                out_buf[offset:offset + FRAME_SIZE] = response + padding[len(response):]
+            conn.send(count)
+    finally:
+        del ring_buf, out_buf
+        ring.close()
+        out.close()
+
+
+class ShardedRuntime:
+    """Serve an ECU fleet from a pool of worker processes
+    
+    ECUs are partitioned across workers by ``ecu_id``. Each worker owns a
+    shared-memory ring of request records; only ``(start, count)`` control
+    messages go through the pipes. Workers write responses straight into a
+    shared output buffer at each frame's original position, so the merged
+    result keeps input order without a copy per frame in the parent.
+    """
+    
+    def __init__(self, ecu_ids, ecu_factory=VirtualECU, workers: Optional[int] = None,
+                 batch_size: int = 65536):
+        """Initialize runtime
+        
+        ``ecu_factory`` is called in the worker with each ``ecu_id`` and must
+        be picklable (a module-level function or class).
+        """
+        self.ecu_ids = list(ecu_ids)
+        self.ecu_factory = ecu_factory
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self._index = {}
+        self._shards: list = [[] for _ in range(self.workers)]
+        for ecu_id in self.ecu_ids:
+            worker = shard_for(ecu_id, self.workers)
+            self._index[ecu_id] = (worker, len(self._shards[worker]))
+            self._shards[worker].append(ecu_id)
+        
+        self._processes: list = []
+        self._conns: list = []
+        self._rings: list = []
+        self._heads: list = []
+        self._out: Optional[shared_memory.SharedMemory] = None
+    
+    def start(self):
+        """Create shared memory and start worker processes"""
+        if self._processes:
+            return
+        self._out = shared_memory.SharedMemory(create=True, size=self.batch_size * FRAME_SIZE)
+        context = multiprocessing.get_context()
+        for shard in self._shards:
+            ring = shared_memory.SharedMemory(create=True, size=self.batch_size * RECORD.size)
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, self.ecu_factory, shard, ring.name, self._out.name,
+                      self.batch_size),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._rings.append(ring)
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+            self._heads.append(0)
+    
+    def close(self):
+        """Stop workers and release shared memory"""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for shm in self._rings + ([self._out] if self._out else []):
+            shm.close()
+            shm.unlink()
+        self._processes, self._conns, self._rings, self._heads = [], [], [], []
+        self._out = None
+    
+    def __enter__(self):
+        """Start workers on entering ``with``"""
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        """Stop workers on leaving ``with``"""
+        self.close()
+    
+    def process(self, targets, frames) -> bytearray:
+        """Process frames addressed to ECUs, returning responses in input order
+        
+        ``targets[i]`` is the ``ecu_id`` frame ``i`` is sent to. ``frames`` is
+        a contiguous buffer of 8-byte frames; the result uses the same layout
+        as ``VirtualECU.process_many``.
+        """
+        if not self._processes or self._out is None:
+            raise RuntimeError("Runtime is not started")
+        view = memoryview(frames).cast("B")
+        count = len(targets)
+        if len(view) != count * FRAME_SIZE:
+            raise ValueError("Frame buffer length must be 8 bytes per target")
+        
+        result = bytearray(count * FRAME_SIZE)
+        out = cast(memoryview, self._out.buf)  # Only None once closed
+        for chunk_start in range(0, count, self.batch_size):
+            chunk_end = min(chunk_start + self.batch_size, count)
+            self._process_chunk(targets, view, chunk_start, chunk_end)
+            size = (chunk_end - chunk_start) * FRAME_SIZE
+            result[chunk_start * FRAME_SIZE:chunk_end * FRAME_SIZE] = out[:size]
+        return result
+    
+    def _process_chunk(self, targets, view, chunk_start: int, chunk_end: int):
+        """Fill the worker rings with one chunk and wait for completion"""
+        index = self._index
+        heads = self._heads
+        starts = list(heads)
+        ring_bufs = [ring.buf for ring in self._rings]
+        pack_into = RECORD.pack_into
+        record_size = RECORD.size
+        capacity = self.batch_size
+        
+        for i in range(chunk_start, chunk_end):
+            try:
+                worker, local = index[targets[i]]
+            except KeyError:
+                raise ValueError(f"Unknown ECU {targets[i]!r}") from None
+            pos = heads[worker]
+            offset = i * FRAME_SIZE
+            pack_into(ring_bufs[worker], (pos % capacity) * record_size,
+                      local, i - chunk_start, bytes(view[offset:offset + FRAME_SIZE]))
+            heads[worker] = pos + 1
+        
+        pending = []
+        for worker, conn in enumerate(self._conns):
+            submitted = heads[worker] - starts[worker]
+            if submitted:
+                conn.send((starts[worker], submitted))
+                pending.append(conn)
+        for conn in pending:
+            conn.recv()
@@ -0,0 +1,240 @@
+"""Lazy DID Value Providers and Signal Generators"""
+
+import bisect
+import csv
+import math
+import time
+import weakref
+from typing import Optional
+
+from .ecu_profile import INTEGER_TYPES
+
+
+class Sine:
+    """Sine wave ``offset + amplitude * sin(2 pi t / period + phase)``"""
+    
+    __slots__ = ("amplitude", "period", "offset", "phase")
+    
+    def __init__(self, amplitude: float = 1.0, period: float = 1.0, offset: float = 0.0,
+                 phase: float = 0.0):
+        """Initialize wave; ``period`` in seconds, ``phase`` in radians"""
+        if period <= 0:
+            raise ValueError("Period must be positive")
+        self.amplitude = amplitude
+        self.period = period
+        self.offset = offset
+        self.phase = phase
+    
+    def __call__(self, t: float) -> float:
+        """Value at ``t`` seconds"""
+        return self.offset + self.amplitude * math.sin(2 * math.pi * t / self.period + self.phase)
+    
+    def sample(self, times) -> list:
+        """Values at each of ``times`` seconds, e.g. to precompute a trace"""
+        offset, amplitude, period, phase = self.offset, self.amplitude, self.period, self.phase
+        sin = math.sin
+        scale = 2 * math.pi
+        return [offset + amplitude * sin(scale * t / period + phase) for t in times]
+
+
+class Ramp:
+    """Linear ramp from ``start`` at ``rate`` per second
+    
+    With ``stop`` the ramp restarts from ``start`` each time it reaches
+    ``stop`` (a sawtooth); without it the ramp runs on, e.g. for an odometer.
+    """
+    
+    __slots__ = ("start", "rate", "stop")
+    
+    def __init__(self, start: float = 0.0, rate: float = 1.0, stop: Optional[float] = None):
+        """Initialize ramp"""
+        if stop is not None and (stop - start) * rate <= 0:
+            raise ValueError("Ramp never reaches stop")
+        self.start = start
+        self.rate = rate
+        self.stop = stop
+    
+    def __call__(self, t: float) -> float:
+        """Value at ``t`` seconds"""
+        if self.stop is None:
+            return self.start + self.rate * t
+        return self.start + math.fmod(self.rate * t, self.stop - self.start)
+    
+    def sample(self, times) -> list:
+        """Values at each of ``times`` seconds, e.g. to precompute a trace"""
+        start, rate = self.start, self.rate
+        if self.stop is None:
+            return [start + rate * t for t in times]
+        fmod = math.fmod
+        span = self.stop - start
+        return [start + fmod(rate * t, span) for t in times]
+
+
+class CsvColumn:
+    """Column of a recorded CSV file, replayed over time
+    
+    The file needs a header row. With ``time_column`` the value at ``t`` is
+    the last sample whose timestamp, relative to the first one, is at most
+    ``t``; otherwise samples are ``interval`` seconds apart. The last sample
+    lasts ``interval`` seconds. With ``loop`` the recording then repeats,
+    otherwise the last sample holds.
+    """
+    
+    def __init__(self, path: str, column: str, time_column: Optional[str] = None,
+                 interval: float = 0.01, loop: bool = True):
+        """Load the samples"""
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        if not rows:
+            raise ValueError(f"No samples in {path}")
+        try:
+            self.values = [float(row[column]) for row in rows]
+            if time_column is None:
+                self.times = [i * interval for i in range(len(rows))]
+            else:
+                first = float(rows[0][time_column])
+                self.times = [float(row[time_column]) - first for row in rows]
+        except KeyError as e:
+            raise ValueError(f"No column {e.args[0]!r} in {path}") from None
+        self.duration = self.times[-1] + interval
+        self.loop = loop
+    
+    def __call__(self, t: float) -> float:
+        """Value at ``t`` seconds"""
+        if self.loop:
+            t = math.fmod(t, self.duration)
+        return self.values[max(bisect.bisect_right(self.times, t) - 1, 0)]
+    
+    def sample(self, times) -> list:
+        """Values at each of ``times`` seconds, e.g. to precompute a trace"""
+        values, recorded, duration = self.values, self.times, self.duration
+        bisect_right, fmod = bisect.bisect_right, math.fmod
+        if self.loop:
+            times = [fmod(t, duration) for t in times]
+        return [values[max(bisect_right(recorded, t) - 1, 0)] for t in times]
+
+
+class _Provider:
+    """One provided DID: its function, encoding and TTL-cached value"""
+    
+    __slots__ = ("function", "encode", "ttl", "value", "expires")
+    
+    def __init__(self, function, encode, ttl: Optional[float]):
+        """Initialize provider with nothing cached"""
+        self.function = function
+        self.encode = encode
+        self.ttl = ttl
+        self.value = None
+        self.expires = float("-inf")
+
+
+def _as_bytes(value) -> bytes:
+    """DID bytes returned by a provider without an encoding"""
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        raise TypeError(f"Provider returned {type(value).__name__}; register it with an encoding")
+    return bytes(value)
+
+
+def _integer_encoder(encoding: str, scale: float, offset: float):
+    """Function turning a number into DID bytes, saturating at the type's range"""
+    try:
+        size, signed = INTEGER_TYPES[encoding]
+    except KeyError:
+        raise ValueError(f"Unknown DID encoding: {encoding}") from None
+    if signed:
+        low, high = -(1 << (8 * size - 1)), (1 << (8 * size - 1)) - 1
+    else:
+        low, high = 0, (1 << (8 * size)) - 1
+    
+    def encode(value) -> bytes:
+        raw = min(max(round((value - offset) / scale), low), high)
+        return raw.to_bytes(size, "big", signed=signed)
+    return encode
+
+
+class DataProviders:
+    """DID values computed on read instead of stored
+    
+    A provider is a callable taking the time in seconds since the providers
+    were created and returning the DID value: ``bytes``, or a number encoded
+    as one of the profile ``INTEGER_TYPES`` with a linear ``scale`` /
+    ``offset`` (raw = (value - offset) / scale, saturated to the type's
+    range). Providers are only called when a ReadDataByIdentifier (0x22),
+    periodic read (0x2A) or dynamic DID built from them reads the DID; with
+    a ``ttl`` the value is reused for that many seconds. A provided DID
+    takes precedence over a static value of the same DID, and responses
+    reading one are never put in the response cache. One instance may be
+    installed on several ECUs; installing and (un)registering bump their
+    ``state_version`` so responses cached before are not served.
+    """
+    
+    def __init__(self, clock=time.monotonic):
+        """Initialize without providers; ``clock`` returns seconds"""
+        self.clock = clock
+        self.start = clock()
+        self.providers = {}
+        self.reads = 0  # Provided values read, for the response cache
+        self._ecus = weakref.WeakSet()  # ECUs serving these providers
+    
+    def __contains__(self, did: int) -> bool:
+        """Check whether a DID is provided"""
+        return did in self.providers
+    
+    def __len__(self) -> int:
+        """Number of provided DIDs"""
+        return len(self.providers)
+    
+    def install(self, ecu) -> "DataProviders":
+        """Serve the provided DIDs from an ECU"""
+        with ecu._write_lock:
+            ecu.signals = self
+            ecu.state_version += 1
+        self._ecus.add(ecu)
+        return self
+    
+    def register(self, did: int, provider, encoding: Optional[str] = None, scale: float = 1.0,
+                 offset: float = 0.0, ttl: Optional[float] = None) -> "DataProviders":
+        """Provide a DID's value; ``encoding`` is needed for numeric providers"""
+        if ttl is not None and ttl < 0:
+            raise ValueError("TTL must not be negative")
+        encode = _integer_encoder(encoding, scale, offset) if encoding is not None else _as_bytes
+        self.providers[did] = _Provider(provider, encode, ttl)
+        self._changed()
+        return self
+    
+    def unregister(self, did: int):
+        """Stop providing a DID"""
+        self.providers.pop(did, None)
+        self._changed()
+    
+    def _changed(self):
+        """Invalidate responses cached by the ECUs serving these providers"""
+        for ecu in list(self._ecus):
+            with ecu._write_lock:
+                ecu.state_version += 1
+    
+    def read(self, did: int):
+        """Current value of a provided DID, or None if it is not provided"""
+        entry = self.providers.get(did)
+        if entry is None:
+            return None
+        self.reads += 1
+        now = self.clock()
+        if now < entry.expires:
+            return entry.value
+        value = entry.encode(entry.function(now - self.start))
+        if entry.ttl is not None:
+            entry.value = value
+            entry.expires = now + entry.ttl
+        return value
+    
+    def getter(self, get):
+        """``get(did, default=None)`` of a static DID table, with provided DIDs first"""
+        providers = self.providers
+        read = self.read
+        
+        def provided_get(did: int, default=None):
+            if did in providers:
+                return read(did)
+            return get(did, default)
+        return provided_get
@@ -0,0 +1,168 @@
+"""Hierarchical Timer Wheel shared by simulated ECUs"""
+
+import math
+import threading
+import time
+from typing import Optional
+
+
+class Timer:
+    """Handle for a scheduled callback"""
+    
+    __slots__ = ("expires", "callback", "args", "active")
+    
+    def __init__(self, expires: int, callback, args: tuple):
+        """Initialize timer"""
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.active = True
+    
+    def cancel(self):
+        """Cancel the timer; cancelled timers are dropped when their slot is reached"""
+        self.active = False
+
+
+class TimerWheel:
+    """Hierarchical timer wheel (Varghese & Lauck)
+    
+    Timers are bucketed by expiry tick into ``levels`` wheels of ``slots``
+    slots each; a timer sits on the coarsest wheel that can hold it and is
+    cascaded to finer wheels as its expiry comes near. Scheduling and
+    cancelling are O(1), and advancing costs one slot per tick whatever the
+    number of timers, so thousands of ECUs share one wheel instead of each
+    owning an OS timer or thread. The wheel is driven by calling
+    ``advance`` (or running ``run`` as an asyncio task). Scheduling and
+    advancing are serialized by a lock, so ECU channels served from several
+    threads can share a wheel.
+    """
+    
+    def __init__(self, tick: float = 0.01, slots: int = 64, levels: int = 4, clock=time.monotonic):
+        """Initialize wheel with ``tick`` seconds resolution"""
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError("Slots per level must be a power of two")
+        self.tick = tick
+        self.clock = clock
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._range = slots ** levels
+        self._wheels: list = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._start = clock()
+        self._ticks = 0
+        self._pending = 0
+        self._lock = threading.RLock()  # Re-entrant: callbacks schedule timers
+    
+    def __len__(self) -> int:
+        """Number of timers on the wheel (including cancelled ones not yet dropped)"""
+        return self._pending
+    
+    @property
+    def time(self) -> float:
+        """Wheel time in seconds, advanced in whole ticks"""
+        return self._ticks * self.tick
+    
+    def schedule(self, delay: float, callback, *args) -> Timer:
+        """Call ``callback(*args)`` once ``delay`` seconds have passed"""
+        ticks = max(1, math.ceil(round(delay / self.tick, 9)))  # Whole ticks, rounded up
+        with self._lock:
+            timer = Timer(self._ticks + ticks, callback, args)
+            self._insert(timer)
+            self._pending += 1
+        return timer
+    
+    def _insert(self, timer: Timer):
+        """Put a timer in the slot for its expiry"""
+        expires = timer.expires
+        delta = min(expires - self._ticks, self._range - 1)
+        if delta <= 0:
+            # Due now (cascaded on its expiry tick): fire with this tick's slot
+            self._wheels[0][self._ticks & self._mask].append(timer)
+            return
+        if delta < expires - self._ticks:
+            expires = self._ticks + delta  # Beyond the wheel: park and re-insert later
+        level = 0
+        while delta >= 1 << (self._bits * (level + 1)):
+            level += 1
+        self._wheels[level][(expires >> (self._bits * level)) & self._mask].append(timer)
+    
+    def advance(self, now: Optional[float] = None) -> int:
+        """Advance to ``now`` (default: the clock) and fire expired timers
+        
+        Returns the number of callbacks fired.
+        """
+        if now is None:
+            now = self.clock()
+        target = int(round((now - self._start) / self.tick, 9))
+        if target <= self._ticks:
+            return 0
+        with self._lock:
+            return self._advance(target)
+    
+    def _advance(self, target: int) -> int:
+        """Advance to tick ``target``, firing expired timers"""
+        if target <= self._ticks:
+            return 0  # Another thread got there first
+        if not self._pending:
+            self._ticks = target  # Nothing to fire; skip the idle ticks
+            return 0
+        
+        fired = 0
+        bits = self._bits
+        mask = self._mask
+        wheels = self._wheels
+        while self._ticks < target and self._pending:
+            self._ticks += 1
+            ticks = self._ticks
+            
+            # Cascade coarser slots whose span starts at this tick
+            level = 1
+            while level < len(wheels) and not (ticks >> (bits * (level - 1))) & mask:
+                slot = (ticks >> (bits * level)) & mask
+                timers = wheels[level][slot]
+                if timers:
+                    wheels[level][slot] = []
+                    for timer in timers:
+                        if timer.active:
+                            self._insert(timer)
+                        else:
+                            self._pending -= 1
+                level += 1
+            
+            timers = wheels[0][ticks & mask]
+            if not timers:
+                continue
+            wheels[0][ticks & mask] = []
+            for timer in timers:
+                if not timer.active:
+                    self._pending -= 1
+                elif timer.expires > ticks:
+                    self._insert(timer)  # Parked beyond the wheel's range
+                else:
+                    self._pending -= 1
+                    timer.active = False
+                    timer.callback(*timer.args)
+                    fired += 1
+        
+        if self._ticks < target:
+            self._ticks = target
+        return fired
+    
+    async def run(self, interval: Optional[float] = None):
+        """Advance the wheel from the event loop until cancelled"""
+        import asyncio  # Deferred: ECUs driven by ``advance`` never need asyncio
+        
+        interval = interval or self.tick
+        while True:
+            self.advance()
+            await asyncio.sleep(interval)
+
+
+_shared_wheel = None
+
+
+def shared_wheel() -> TimerWheel:
+    """Process-wide wheel used by ECUs not given their own"""
+    global _shared_wheel
+    if _shared_wheel is None:
+        _shared_wheel = TimerWheel()
+    return _shared_wheel
@@ -0,0 +1,207 @@
+"""CAN Trace Replay and Response Recording"""
+
+import os
+import struct
+import time
+from typing import NamedTuple
+
+from .gateway import Gateway
+
+# Recording layout: header, then one record per frame (record header + data)
+RECORDING_HEADER = struct.Struct("<8sH")
+RECORDING_MAGIC = b"VECU-TRC"
+RECORDING_VERSION = 1
+RECORD_HEADER = struct.Struct("<dIB")
+BUFFER_SIZE = 1 << 20
+
+
+class TraceFrame(NamedTuple):
+    """One CAN frame from a trace or recording"""
+    timestamp: float
+    arbitration_id: int
+    data: bytes
+
+
+def read_candump(path: str):
+    """Stream frames from a ``candump -l`` log (``(ts) can0 7E0#0322F190``)"""
+    with open(path, "r", buffering=BUFFER_SIZE) as fh:
+        for line in fh:
+            fields = line.split()
+            if len(fields) < 3 or not fields[0].startswith("("):
+                continue
+            arbitration_id, _, data = fields[2].partition("#")
+            if data.startswith("#"):
+                data = data[2:]  # CAN FD: "##<flags><data>"
+            elif data.startswith("R"):
+                continue  # Remote frame
+            yield TraceFrame(float(fields[0][1:-1]), int(arbitration_id, 16), bytes.fromhex(data))
+
+
+def read_asc(path: str):
+    """Stream classic CAN frames from a Vector ASC log"""
+    with open(path, "r", buffering=BUFFER_SIZE) as fh:
+        for line in fh:
+            fields = line.split()
+            if len(fields) < 6 or fields[4] != "d" or not fields[1].isdigit():
+                continue  # Header, comment, error or CAN FD line
+            try:
+                timestamp = float(fields[0])
+            except ValueError:
+                continue
+            length = int(fields[5], 16)
+            data = bytes.fromhex("".join(fields[6:6 + length]))
+            yield TraceFrame(timestamp, int(fields[2].rstrip("xX"), 16), data)
+
+
+def read_blf(path: str):
+    """Stream frames from a Vector BLF log (requires python-can)"""
+    import can  # type: ignore[import-not-found]  # Optional, only needed for BLF
+    
+    for message in can.BLFReader(path):
+        if not message.is_error_frame and not message.is_remote_frame:
+            yield TraceFrame(message.timestamp, message.arbitration_id, bytes(message.data))
+
+
+TRACE_READERS = {
+    ".log": read_candump,
+    ".candump": read_candump,
+    ".asc": read_asc,
+    ".blf": read_blf,
+}
+
+
+def read_trace(path: str):
+    """Stream frames from a trace file, choosing the reader by extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in TRACE_READERS:
+        raise ValueError(f"Unsupported trace format: {extension or path}")
+    return TRACE_READERS[extension](path)
+
+
+class TraceRecorder:
+    """Write frames to a compact binary recording
+    
+    Each record is ``timestamp (f64) | arbitration ID (u32) | length (u8)``
+    followed by the data bytes. Responses are stamped with the timestamp of
+    the trace frame that caused them, so replaying the same trace gives
+    byte-identical recordings that can be compared with ``cmp``.
+    """
+    
+    def __init__(self, path: str):
+        """Create the recording file"""
+        self.path = path
+        self.count = 0
+        self._file = open(path, "wb", buffering=BUFFER_SIZE)
+        self._file.write(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION))
+    
+    def write(self, frame: TraceFrame):
+        """Append one frame"""
+        self._file.write(RECORD_HEADER.pack(frame.timestamp, frame.arbitration_id, len(frame.data)))
+        self._file.write(frame.data)
+        self.count += 1
+    
+    def close(self):
+        """Flush and close the recording"""
+        self._file.close()
+    
+    def __enter__(self):
+        """Return the open recorder"""
+        return self
+    
+    def __exit__(self, *exc_info):
+        """Close the recorder"""
+        self.close()
+
+
+def read_recording(path: str):
+    """Stream frames from a binary recording"""
+    with open(path, "rb", buffering=BUFFER_SIZE) as fh:
+        magic, version = RECORDING_HEADER.unpack(fh.read(RECORDING_HEADER.size))
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{path} is not a version {RECORDING_VERSION} recording")
+        read = fh.read
+        unpack = RECORD_HEADER.unpack
+        size = RECORD_HEADER.size
+        while True:
+            header = read(size)
+            if len(header) < size:
+                return
+            timestamp, arbitration_id, length = unpack(header)
+            yield TraceFrame(timestamp, arbitration_id, read(length))
+
+
+def diff_recordings(expected: str, actual: str):
+    """Yield ``(index, expected_frame, actual_frame)`` for differing records
+    
+    A missing record on either side is reported as ``None``.
+    """
+    index = 0
+    left = read_recording(expected)
+    right = read_recording(actual)
+    while True:
+        a = next(left, None)
+        b = next(right, None)
+        if a is None and b is None:
+            return
+        if a != b:
+            yield index, a, b
+        index += 1
+
+
+class TracePlayer:
+    """Replay trace frames against Virtual ECUs
+    
+    Frames are routed by arbitration ID through a ``Gateway``, so frames
+    for unknown IDs (e.g. the responses of the recorded vehicle) are
+    skipped. By default frames are replayed as fast as possible; with
+    ``realtime=True`` the gaps between trace timestamps are reproduced,
+    scaled by ``speed``.
+    """
+    
+    def __init__(self, gateway: Gateway, realtime: bool = False, speed: float = 1.0,
+                 clock=time.perf_counter, sleep=time.sleep):
+        """Initialize player"""
+        self.gateway = gateway
+        self.realtime = realtime
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+        self.frames_in = 0
+        self.frames_out = 0
+    
+    @classmethod
+    def for_ecu(cls, ecu, request_id: int, response_id: int, **kwargs) -> "TracePlayer":
+        """Player for a single ECU on a physical request / response ID pair"""
+        gateway = Gateway(functional_ids=())
+        gateway.add_ecu(ecu, request_id, response_id)
+        return cls(gateway, **kwargs)
+    
+    def play(self, frames):
+        """Replay frames and yield the response frames"""
+        route = self.gateway.route
+        frames_in = 0
+        frames_out = 0
+        origin = None
+        try:
+            for frame in frames:
+                frames_in += 1
+                if self.realtime:
+                    if origin is None:
+                        origin = (frame.timestamp, self.clock())
+                    delay = (frame.timestamp - origin[0]) / self.speed - (self.clock() - origin[1])
+                    if delay > 0:
+                        self.sleep(delay)
+                for response_id, data in route(frame.arbitration_id, frame.data):
+                    frames_out += 1
+                    yield TraceFrame(frame.timestamp, response_id, data)
+        finally:
+            self.frames_in += frames_in
+            self.frames_out += frames_out
+    
+    def record(self, frames, path: str) -> int:
+        """Replay frames and write the responses to a recording"""
+        with TraceRecorder(path) as recorder:
+            write = recorder.write
+            for response in self.play(frames):
+                write(response)
+        return recorder.count
@@ -0,0 +1,467 @@
+"""Asyncio ISO-TP Transport for serving Virtual ECUs on a CAN bus"""
+
+import abc
+import asyncio
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .docan_bus import CAN_FD_FRAME_SIZES, DoCAN
+from .session import NRC_RESPONSE_PENDING
+
+
+class IsoTpError(Exception):
+    """ISO-TP transfer aborted (timeout, overflow or protocol error)"""
+
+
+class IsoTpConfig:
+    """ISO-TP timing and flow control parameters"""
+    
+    def __init__(self, block_size: int = 0, st_min: int = 0,
+                 n_bs: float = 1.0, n_cr: float = 1.0, max_wait_frames: int = 10,
+                 frame_size: int = 8):
+        """Initialize ISO-TP parameters
+        
+        ``block_size`` and ``st_min`` are advertised in our Flow Control
+        frames. ``n_bs`` and ``n_cr`` are the timeouts in seconds for
+        receiving a Flow Control and a Consecutive Frame respectively.
+        ``frame_size`` is the CAN frame data length we send: 8 for classic
+        CAN, up to 64 for CAN FD.
+        """
+        self.block_size = block_size
+        self.st_min = st_min
+        self.n_bs = n_bs
+        self.n_cr = n_cr
+        self.max_wait_frames = max_wait_frames
+        self.frame_size = frame_size
+
+
+def st_min_to_seconds(st_min: int) -> float:
+    """Decode an STmin byte into seconds"""
+    if st_min <= 0x7F:
+        return st_min / 1000
+    if 0xF1 <= st_min <= 0xF9:
+        return (st_min - 0xF0) / 10000
+    return 0x7F / 1000  # Reserved values are treated as the maximum
+
+
+class CANBus(abc.ABC):
+    """Base class routing received frames to listeners by arbitration ID"""
+    
+    def __init__(self):
+        """Initialize listener table"""
+        self._listeners = {}
+    
+    def listen(self, arbitration_id: int, queue: Optional[asyncio.Queue] = None) -> asyncio.Queue:
+        """Return a queue (a new one unless given) receiving every frame sent to an ID"""
+        if queue is None:
+            queue = asyncio.Queue()
+        self._listeners.setdefault(arbitration_id, []).append(queue)
+        return queue
+    
+    def unlisten(self, arbitration_id: int, queue: asyncio.Queue):
+        """Stop delivering frames to a queue"""
+        queues = self._listeners.get(arbitration_id)
+        if queues and queue in queues:
+            queues.remove(queue)
+            if not queues:
+                del self._listeners[arbitration_id]
+    
+    def _deliver(self, arbitration_id: int, data: bytes):
+        """Hand a received frame to the listeners for its ID"""
+        for queue in self._listeners.get(arbitration_id, ()):
+            queue.put_nowait(data)
+    
+    @abc.abstractmethod
+    async def send(self, arbitration_id: int, data: bytes):
+        """Transmit a frame"""
+    
+    def close(self):
+        """Release bus resources"""
+
+
+class VirtualCANBus(CANBus):
+    """In-process CAN bus, a dependency-free stand-in for python-can's virtual interface"""
+    
+    async def send(self, arbitration_id: int, data: bytes):
+        """Transmit a frame to every listener on the ID"""
+        self._deliver(arbitration_id, bytes(data))
+
+
+class PythonCANBus(CANBus):
+    """CAN bus backed by a python-can interface (``virtual`` by default)
+    
+    Frames longer than 8 bytes are sent as CAN FD frames (open the bus with
+    ``fd=True``), padded with ``padding`` to the next CAN FD data length.
+    """
+    
+    def __init__(self, channel: str = "vcan0", interface: str = "virtual", padding: int = 0xCC,
+                 bitrate_switch: bool = True, **kwargs):
+        """Open the python-can bus"""
+        super().__init__()
+        # Optional dependency, only needed for this backend
+        import can  # type: ignore[import-not-found]
+        
+        self._can = can
+        self.bus = can.Bus(channel=channel, interface=interface, **kwargs)
+        self.padding = bytes([padding])
+        self.bitrate_switch = bitrate_switch
+        self._notifier = None
+    
+    def listen(self, arbitration_id: int, queue: Optional[asyncio.Queue] = None) -> asyncio.Queue:
+        """Return a queue (a new one unless given) receiving every frame sent to an ID"""
+        if self._notifier is None:
+            self._notifier = self._can.Notifier(
+                self.bus, [self._on_message], loop=asyncio.get_running_loop()
+            )
+        return super().listen(arbitration_id, queue)
+    
+    def _on_message(self, message):
+        """python-can listener callback"""
+        self._deliver(message.arbitration_id, bytes(message.data))
+    
+    async def send(self, arbitration_id: int, data: bytes):
+        """Transmit a frame on the python-can bus"""
+        data = bytes(data)
+        if len(data) > 8:
+            size = CAN_FD_FRAME_SIZES[bisect.bisect_left(CAN_FD_FRAME_SIZES, len(data))]
+            message = self._can.Message(
+                arbitration_id=arbitration_id, data=data.ljust(size, self.padding),
+                is_extended_id=arbitration_id > 0x7FF, is_fd=True,
+                bitrate_switch=self.bitrate_switch
+            )
+        else:
+            message = self._can.Message(
+                arbitration_id=arbitration_id, data=data, is_extended_id=arbitration_id > 0x7FF
+            )
+        self.bus.send(message)
+    
+    def close(self):
+        """Stop the notifier and shut down the bus"""
+        if self._notifier is not None:
+            self._notifier.stop()
+            self._notifier = None
+        self.bus.shutdown()
+
+
+class _ReceiveQueue(asyncio.Queue):
+    """Receive queue setting Flow Control frames aside for the sender"""
+    
+    def __init__(self):
+        """Initialize with an empty Flow Control queue"""
+        super().__init__()
+        self.flow_control = asyncio.Queue()
+    
+    def put_nowait(self, frame: bytes):
+        """Queue a frame, Flow Control frames on ``flow_control``"""
+        if frame and frame[0] >> 4 == DoCAN.FLOW_CONTROL_FRAME:
+            self.flow_control.put_nowait(frame)
+        else:
+            super().put_nowait(frame)
+
+
+class IsoTpChannel:
+    """One ISO-TP connection (receive ID / transmit ID pair) on a bus
+    
+    All waiting is done with asyncio timeouts and sleeps, so any number of
+    channels can run concurrently in one event loop. Received Flow Control
+    frames are kept apart from other frames, so a message can be received
+    while another is sent, and sends are serialized, so concurrent senders
+    (e.g. responses and periodic messages) never take each other's Flow
+    Control.
+    """
+    
+    def __init__(self, bus: CANBus, rx_id: int, tx_id: int, config: Optional[IsoTpConfig] = None):
+        """Attach the channel to the bus"""
+        self.bus = bus
+        self.rx_id = rx_id
+        self.tx_id = tx_id
+        self.config = config or IsoTpConfig()
+        self.docan = DoCAN(self.config.frame_size)
+        self._queue = queue = _ReceiveQueue()
+        bus.listen(rx_id, queue)
+        self._flow_control = queue.flow_control
+        self._send_lock = asyncio.Lock()
+    
+    async def recv(self, timeout: Optional[float] = None) -> bytes:
+        """Receive one complete message, sending Flow Control as needed"""
+        docan = self.docan
+        config = self.config
+        wait = timeout
+        block_count = 0
+        
+        while True:
+            try:
+                frame = await asyncio.wait_for(self._queue.get(), wait)
+            except asyncio.TimeoutError:
+                if docan.expected_length:
+                    docan.reset()
+                    raise IsoTpError("N_Cr timeout waiting for consecutive frame")
+                raise
+            
+            result = docan.reassemble(frame)
+            if "error" in result:
+                # Stray flow control or out-of-sequence frame; drop it
+                wait = config.n_cr if docan.expected_length else timeout
+                continue
+            if result["complete"]:
+                return bytes(result["data"])
+            
+            if result["type"] == "FirstFrame":
+                if result.get("overflow"):
+                    await self._send_flow_control(DoCAN.FC_OVERFLOW)
+                    wait = timeout
+                    continue
+                block_count = 0
+                await self._send_flow_control()
+            else:
+                block_count += 1
+                if config.block_size and block_count == config.block_size:
+                    block_count = 0
+                    await self._send_flow_control()
+            wait = config.n_cr
+    
+    async def send(self, data: bytes):
+        """Send one message, honouring the receiver's Flow Control"""
+        async with self._send_lock:
+            await self._send(data)
+    
+    async def _send(self, data: bytes):
+        """Send one message; the caller holds the send lock"""
+        frames = self.docan.segment(data)
+        if len(frames) > 1:
+            while not self._flow_control.empty():
+                self._flow_control.get_nowait()  # Stale, e.g. after an N_Bs timeout
+        await self.bus.send(self.tx_id, frames[0])
+        if len(frames) == 1:
+            return
+        
+        index = 1
+        while index < len(frames):
+            block_size, st_min = await self._wait_flow_control()
+            end = len(frames) if not block_size else min(index + block_size, len(frames))
+            for i in range(index, end):
+                if i != index and st_min:
+                    await asyncio.sleep(st_min)
+                await self.bus.send(self.tx_id, frames[i])
+            index = end
+    
+    async def request(self, data: bytes, timeout: Optional[float] = None) -> bytes:
+        """Send a message and wait for the reply"""
+        await self.send(data)
+        return await self.recv(timeout)
+    
+    async def _send_flow_control(self, flow_status: int = DoCAN.FC_CONTINUE_TO_SEND):
+        """Send Flow Control (default Continue To Send) with our block size and STmin"""
+        frame = self.docan.create_flow_control_frame(
+            flow_status, self.config.block_size, self.config.st_min
+        )
+        await self.bus.send(self.tx_id, frame)
+    
+    async def _wait_flow_control(self) -> tuple:
+        """Wait for Continue To Send and return (block size, STmin seconds)"""
+        waits = 0
+        while True:
+            try:
+                frame = await asyncio.wait_for(self._flow_control.get(), self.config.n_bs)
+            except asyncio.TimeoutError:
+                raise IsoTpError("N_Bs timeout waiting for flow control") from None
+            
+            if len(frame) < 3:
+                continue
+            flow_status = frame[0] & 0x0F
+            if flow_status == DoCAN.FC_CONTINUE_TO_SEND:
+                return frame[1], st_min_to_seconds(frame[2])
+            if flow_status == DoCAN.FC_WAIT:
+                waits += 1
+                if waits > self.config.max_wait_frames:
+                    raise IsoTpError("Too many flow control WAIT frames")
+                continue
+            raise IsoTpError("Receiver reported buffer overflow")
+    
+    def close(self):
+        """Detach the channel from the bus"""
+        self.bus.unlisten(self.rx_id, self._queue)
+
+
+class ECUServer:
+    """Serve one or many VirtualECU instances on an asyncio CAN bus
+    
+    By default handlers run on the event loop, which is fastest, but a slow
+    handler blocks the loop and its ResponsePending (NRC 0x78) messages only
+    go out right before the response (see ``process_uds_responses``). With
+    ``handler_thread`` requests are handled one at a time on a worker
+    thread, so the loop keeps running: a request still in progress after P2
+    gets a ResponsePending message from a timer on the ECU's session wheel,
+    and another one every P2* until the response is sent. Periodic messages
+    given to ``send_periodic`` are sent in background tasks;
+    ``periodic_errors`` counts the sends that failed and
+    ``last_periodic_error`` keeps the latest exception. A request whose
+    handler raises gets no response and is counted in ``request_errors``
+    (the exception is kept in ``last_request_error``); the ECU keeps being
+    served.
+    """
+    
+    def __init__(self, bus: CANBus, config: Optional[IsoTpConfig] = None,
+                 handler_thread: bool = False):
+        """Initialize server"""
+        self.bus = bus
+        self.config = config or IsoTpConfig()
+        self.handler_thread = handler_thread
+        self.channels: list = []
+        self._tasks: list = []
+        self._wheels: set = set()
+        self._ecu_channels: dict = {}
+        self._periodic_sends: set = set()
+        self._handler_thread = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = False
+        self.periodic_errors = 0
+        self.last_periodic_error: Optional[BaseException] = None
+        self.request_errors = 0
+        self.last_request_error: Optional[Exception] = None
+    
+    def add_ecu(self, ecu, rx_id: int, tx_id: int,
+                config: Optional[IsoTpConfig] = None) -> IsoTpChannel:
+        """Serve an ECU on a physical request / response ID pair
+        
+        ``config`` overrides the server's ISO-TP parameters for this
+        channel, e.g. a CAN FD frame size.
+        """
+        channel = IsoTpChannel(self.bus, rx_id, tx_id, config or self.config)
+        self.channels.append((channel, ecu))
+        self._ecu_channels[id(ecu)] = channel
+        if self._running:
+            loop = asyncio.get_running_loop()
+            self._tasks.append(loop.create_task(self._serve(channel, ecu)))
+            self._drive_timers(loop, ecu)
+        return channel
+    
+    async def start(self):
+        """Start one serving task per ECU channel"""
+        loop = self._loop = asyncio.get_running_loop()
+        self._running = True
+        if self.handler_thread:
+            self._handler_thread = ThreadPoolExecutor(max_workers=1,
+                                                      thread_name_prefix="uds-handler")
+        self._tasks = [
+            loop.create_task(self._serve(channel, ecu)) for channel, ecu in self.channels
+        ]
+        for _, ecu in self.channels:
+            self._drive_timers(loop, ecu)
+    
+    def _drive_timers(self, loop, ecu):
+        """Start one task advancing each distinct session timer wheel"""
+        wheel = ecu.session.timers
+        if wheel not in self._wheels:
+            self._wheels.add(wheel)
+            self._tasks.append(loop.create_task(wheel.run()))
+    
+    async def stop(self):
+        """Cancel serving tasks and detach channels"""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        for task in self._periodic_sends:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._periodic_sends, return_exceptions=True)
+        if self._handler_thread is not None:
+            self._handler_thread.shutdown(wait=False)
+            self._handler_thread = None
+        self._tasks = []
+        self._wheels = set()
+        for channel, _ in self.channels:
+            channel.close()
+        self.channels = []
+        self._ecu_channels = {}
+    
+    def send_periodic(self, ecu, message: bytes):
+        """``PeriodicScheduler`` sink: send a periodic message on the ECU's channel
+        
+        May be called from any thread, e.g. the handler thread when a
+        request advances the timer wheel; the send runs on the server's loop.
+        """
+        channel = self._ecu_channels.get(id(ecu))
+        loop = self._loop
+        if channel is None or loop is None or not self._running:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._send_periodic(channel, message)
+        else:
+            loop.call_soon_threadsafe(self._send_periodic, channel, message)
+    
+    def _send_periodic(self, channel: IsoTpChannel, message: bytes):
+        """Start sending a periodic message; runs on the server's loop"""
+        task = asyncio.create_task(channel.send(message))
+        self._periodic_sends.add(task)  # Keep a reference until sent
+        task.add_done_callback(self._periodic_sent)
+    
+    def _periodic_sent(self, task: asyncio.Task):
+        """Forget a finished periodic send, counting it if it failed"""
+        self._periodic_sends.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.periodic_errors += 1
+            self.last_periodic_error = task.exception()
+    
+    async def __aenter__(self):
+        """Start serving on entering ``async with``"""
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        """Stop serving on leaving ``async with``"""
+        await self.stop()
+    
+    async def _serve(self, channel: IsoTpChannel, ecu):
+        """Request / response loop for one ECU"""
+        while True:
+            try:
+                request = await channel.recv()
+                if not ecu.is_running:
+                    continue
+                if self._handler_thread is None:
+                    for response in ecu.process_uds_responses(request):
+                        await channel.send(response)
+                    continue
+                response = await self._handle(channel, ecu, request)
+                if response:
+                    await channel.send(response)
+            except IsoTpError:
+                continue  # Transfer aborted; wait for the next request
+            except Exception as exc:
+                self.request_errors += 1
+                self.last_request_error = exc
+    
+    async def _handle(self, channel: IsoTpChannel, ecu, request: bytes) -> bytes:
+        """Run a request's handler on the worker thread, sending ResponsePending while it is busy"""
+        if not request:
+            return ecu.process_uds_request(request)  # Rejected without calling a handler
+        loop = asyncio.get_running_loop()
+        session = ecu.session
+        pending = bytes([0x7F, request[0], NRC_RESPONSE_PENDING])
+        sends = []
+        state: dict = {"done": False, "timer": None}
+        
+        def send_pending():
+            if not state["done"]:
+                sends.append(loop.create_task(channel.send(pending)))
+        
+        def due():
+            # Wheel callback, on whichever thread advances the wheel
+            if not state["done"]:
+                state["timer"] = session.timers.schedule(session.p2_star_server, due)
+                loop.call_soon_threadsafe(send_pending)
+        
+        state["timer"] = session.timers.schedule(session.p2_server, due)
+        try:
+            return await loop.run_in_executor(self._handler_thread, ecu.process_uds_request,
+                                              request)
+        finally:
+            state["done"] = True
+            state["timer"].cancel()
+            if sends:
+                await asyncio.gather(*sends)
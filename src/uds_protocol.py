@@ -19,6 +19,24 @@ class UDSProtocol:
     READ_DTC_INFORMATION = 0x19
     CLEAR_DIAGNOSTIC_INFORMATION = 0x14
     
+    # Service names by SID, looked up on every parsed request
+    SERVICE_NAMES = {
+        0x10: "DiagnosticSessionControl",
+        0x11: "ECUReset",
+        0x14: "ClearDiagnosticInformation",
+        0x19: "ReadDTCInformation",
+        0x22: "ReadDataByIdentifier",
+        0x27: "SecurityAccess",
+        0x28: "CommunicationControl",
+        0x2E: "WriteDataByIdentifier",
+        0x31: "RoutineControl",
+        0x34: "RequestDownload",
+        0x35: "RequestUpload",
+        0x36: "TransferData",
+        0x37: "RequestTransferExit",
+        0x3E: "TesterPresent",
+    }
+    
     def __init__(self):
         """Initialize UDS Protocol handler"""
         self.session_active = False
@@ -40,12 +58,4 @@ class UDSProtocol:
     
     def _get_service_name(self, sid: int) -> str:
         """Get service name from SID"""
-        services = {
-            0x10: "DiagnosticSessionControl",
-            0x11: "ECUReset",
-            0x27: "SecurityAccess",
-            0x22: "ReadDataByIdentifier",
-            0x2E: "WriteDataByIdentifier",
-            0x3E: "TesterPresent",
-        }
-        return services.get(sid, "Unknown")
+        return self.SERVICE_NAMES.get(sid, "Unknown")
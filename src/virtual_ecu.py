@@ -1,33 +1,177 @@
 """Virtual ECU Implementation"""
 
+import threading
+import time
+from operator import attrgetter
+from typing import TYPE_CHECKING, Optional, Union
+
+from .periodic import DynamicDataIdentifiers
+from .response_cache import ResponseCache
 from .uds_protocol import UDSProtocol
 from .docan_bus import DoCAN
+from .dtc_store import DTCOverlay, DTCStore, DTC_FORMAT_ISO_14229_1
+from .service_registry import ServiceRegistry
+from .session import DiagnosticSession, NRC_RESPONSE_PENDING
+
+if TYPE_CHECKING:
+    from .metrics import Metrics  # Imported at run time by enable_metrics
+
+
+class DataIdentifierOverlay:
+    """DID table layered over a shared, read-only base table
+    
+    Reads fall through to ``base`` unless the DID was written on this
+    instance; writes only go to the instance's own ``overlay``. Cloned ECUs
+    share one base, so each costs only the DIDs it has written.
+    """
+    
+    __slots__ = ("base", "overlay")
+    
+    def __init__(self, base: dict, overlay: Optional[dict] = None):
+        """Initialize overlay over ``base``"""
+        self.base = base
+        self.overlay = overlay if overlay is not None else {}
+    
+    def get(self, did: int, default=None):
+        """Value of a DID, or ``default``"""
+        value = self.overlay.get(did)
+        if value is None:
+            return self.base.get(did, default)
+        return value
+    
+    def __getitem__(self, did: int) -> bytes:
+        """Value of a DID"""
+        value = self.overlay.get(did)
+        if value is None:
+            return self.base[did]
+        return value
+    
+    def __setitem__(self, did: int, value: bytes):
+        """Write a DID on this instance only"""
+        self.overlay[did] = value
+    
+    def __contains__(self, did: int) -> bool:
+        """Check whether a DID is defined"""
+        return did in self.overlay or did in self.base
+    
+    def __len__(self) -> int:
+        """Number of DIDs"""
+        base = self.base
+        return len(base) + sum(1 for did in self.overlay if did not in base)
+    
+    def __iter__(self):
+        """Iterate over DIDs, base table first"""
+        yield from self.base
+        base = self.base
+        for did in self.overlay:
+            if did not in base:
+                yield did
+    
+    def keys(self):
+        """DIDs"""
+        return list(self)
+    
+    def items(self):
+        """``(did, value)`` pairs"""
+        return [(did, self[did]) for did in self]
+
 
 class VirtualECU:
     """Virtual ECU with UDS and DoCAN support"""
     
-    def __init__(self, ecu_id: str = "ECU_001"):
-        """Initialize Virtual ECU"""
+    # Classic CAN frame size (default for frame_size)
+    FRAME_SIZE = 8
+    
+    # Handlers shared by every ECU, copied into each instance's table
+    default_services = ServiceRegistry()
+    
+    def __init__(self, ecu_id: str = "ECU_001", timers=None, frame_size: int = FRAME_SIZE):
+        """Initialize Virtual ECU
+        
+        ``timers`` is the ``TimerWheel`` driving the session timers; by
+        default all ECUs in the process share one wheel. ``frame_size`` is
+        the CAN frame data length of the frame path: 8 for classic CAN, up
+        to 64 for CAN FD.
+        """
         self.ecu_id = ecu_id
         self.uds = UDSProtocol()
-        self.docan = DoCAN()
-        self.dtc_codes = []
-        self.data_identifiers = {}
+        self.session = DiagnosticSession(self.uds, timers)
+        self.docan = DoCAN(frame_size)
+        self.dtc_codes: Union[DTCStore, DTCOverlay] = DTCStore()
+        self.data_identifiers: Union[dict, "DataIdentifierOverlay"] = {}
+        self.services = self.default_services.copy()
+        self._init_state()
+    
+    def _init_state(self):
+        """Set the running state and optional features a new ECU starts with"""
         self.is_running = True
-        
+        self.flash = None  # FlashTransfer, installed on demand
+        self.metrics: Optional["Metrics"] = None  # See enable_metrics
+        self.dynamic_dids = None  # DynamicDataIdentifiers, created by the first 0x2C request
+        self.faults = None  # FaultInjector on the frame path, if installed
+        self.signals = None  # DataProviders computing DIDs on read, if installed
+        self.channels = {}  # ChannelContext per tester address, see channel()
+        self._write_lock = threading.Lock()
+        self.response_cache = None  # ResponseCache, see enable_response_cache
+        self.state_version = 0  # Bumped by every DID / DTC change
+    
     def process_request(self, request_data: bytes) -> bytes:
-        """Process incoming request and generate response"""
-        # Parse DoCAN frame
-        docan_frame = self.docan.parse_frame(request_data)
+        """Process incoming request and generate response
+        
+        Returns the response frames concatenated. A long response starts
+        with its First Frame; the Consecutive Frames are returned for the
+        tester's Flow Control frame. Use ``process_frame`` to get the frames
+        as a list.
+        """
+        return b"".join(self.process_frame(request_data))
+    
+    def process_frame(self, request_data: bytes) -> list:
+        """Process one incoming frame and return the frames to send back"""
+        if self.faults is not None:
+            return self.faults.process_frame(self, request_data)
+        return self._process_frame(request_data)
+    
+    def _process_frame(self, request_data: bytes) -> list:
+        """Frame path without fault injection"""
+        # Flow control from the tester releases the next block of a response
+        if request_data and request_data[0] >> 4 == DoCAN.FLOW_CONTROL_FRAME:
+            return self.docan.handle_flow_control(request_data)
+        
+        # Parse DoCAN frame and reassemble multi-frame requests
+        docan_frame = self.docan.reassemble(request_data)
         if "error" in docan_frame:
-            return self._create_error_response(0x12)  # NRC: Service not supported
+            return [self._create_error_response(0x12)]  # NRC: Service not supported
         
         # Extract UDS data from DoCAN frame
-        if docan_frame["type"] == "SingleFrame":
+        if docan_frame["complete"]:
             uds_data = docan_frame["data"]
+        elif docan_frame["type"] == "FirstFrame":
+            if docan_frame.get("overflow"):
+                # Longer than we can receive: refuse instead of buffering it
+                return [self.docan.create_flow_control_frame(DoCAN.FC_OVERFLOW)]
+            # Accept the rest of the message in one block
+            return [self.docan.create_flow_control_frame()]
         else:
-            # Handle multi-frame (simplified)
-            return self._create_error_response(0x31)  # NRC: Request out of range
+            # Waiting for more consecutive frames
+            return []
+        
+        # Handle UDS request; send each response as a single frame, or
+        # First Frame + Consecutive Frames
+        return [self.docan.start_transmission(response)
+                for response in self.process_uds_responses(uds_data)]
+    
+    def process_uds_request(self, uds_data: bytes) -> bytes:
+        """Process a complete UDS request and return the UDS response
+        
+        This is the transport-independent entry point used once a request
+        has been reassembled, e.g. by the asyncio transport.
+        """
+        self.session.timers.advance()
+        self.session.touch()
+        
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter_ns()
         
         # Parse UDS request
         uds_request = self.uds.parse_request(uds_data)
@@ -37,58 +181,347 @@ class VirtualECU:
         # Handle UDS service
         service_id = uds_request["service_id"]
         response = self._handle_uds_service(service_id, uds_request["payload"])
+        if metrics is not None:
+            metrics.observe(service_id, response, time.perf_counter_ns() - start)
+        return response
+    
+    def process_uds_responses(self, uds_data: bytes) -> list:
+        """Process a complete UDS request and return all UDS messages to send
+        
+        If handling took longer than P2, the final response is preceded by
+        the ResponsePending (NRC 0x78) messages the ECU would have sent
+        every P2* in the meantime. They are only returned once the handler
+        is done, so they do not keep a tester's P2 timer from expiring; an
+        ``ECUServer`` with ``handler_thread`` sends them while the request
+        is in progress. A suppressed positive response yields no final
+        message.
+        """
+        start = time.perf_counter()
+        response = self.process_uds_request(uds_data)
+        pending = self.session.pending_responses(time.perf_counter() - start)
         
-        # Wrap response in DoCAN single frame
-        docan_response = self.docan.create_single_frame(response)
-        return docan_response
+        messages = [bytes([0x7F, uds_data[0], NRC_RESPONSE_PENDING])] * pending if pending else []
+        if response:
+            messages.append(response)
+        return messages
     
-    def _handle_uds_service(self, service_id: int, payload: bytes) -> bytes:
-        """Handle UDS service request"""
+    def process_many(self, frames) -> bytearray:
+        """Process a contiguous buffer of fixed-size frames
+        
+        ``frames`` may be any object exposing the buffer protocol (``bytes``,
+        ``bytearray``, ``memoryview`` or a NumPy ``uint8[N, 8]`` array), with
+        one slot of ``docan.frame_size`` bytes (8 for classic CAN) per frame.
+        The response to frame ``i`` is written to slot ``i`` of the returned
+        buffer, zero padded; an all-zero slot means no response.
+        Only the first response frame fits a slot, so Consecutive Frames
+        released by a Flow Control frame are not returned; use
+        ``process_frame`` to replay multi-frame responses. Single frames are
+        dispatched directly without building the intermediate DoCAN/UDS
+        dicts.
+        """
+        view = memoryview(frames).cast("B")
+        size = len(view)
+        docan = self.docan
+        frame_size = docan.frame_size
+        if size % frame_size:
+            raise ValueError(f"Frame buffer length must be a multiple of {frame_size}")
+        
+        out = bytearray(size)
+        lookup = self.services.lookup
+        touch = self.session.touch
+        metrics = self.metrics
+        faulty = self.faults is not None
+        cache = self.response_cache
+        self.session.timers.advance()
+        
+        for offset in range(0, size, frame_size):
+            pci = view[offset]
+            length = pci & 0x0F
+            if pci > 0x07 or not length or docan.expected_length or docan.transmitting or faulty:
+                # Anything but a plain single frame (or any frame with faults
+                # injected) goes through the full path
+                frames_out = self.process_frame(bytes(view[offset:offset + frame_size]))
+                if frames_out:
+                    out[offset:offset + len(frames_out[0])] = frames_out[0]
+                continue
+            
+            touch()
+            if metrics is not None:
+                start = time.perf_counter_ns()
+                metrics.frames_received[DoCAN.SINGLE_FRAME] += 1
+            payload = bytes(view[offset + 2:offset + 1 + length])
+            handler = lookup(view[offset + 1], payload)
+            if handler is None:
+                response = self._create_error_response(0x12)
+            elif cache is not None and view[offset + 1] in cache.services:
+                response = cache.respond(self, view[offset + 1], payload, handler)
+            else:
+                response = handler(self, payload)
+            if metrics is not None:
+                metrics.observe(view[offset + 1], response, time.perf_counter_ns() - start)
+            
+            response_length = len(response)
+            if response_length > 7:
+                first_frame = docan.start_transmission(response)
+                out[offset:offset + len(first_frame)] = first_frame
+                continue
+            if metrics is not None and response_length:
+                metrics.frames_sent[DoCAN.SINGLE_FRAME] += 1
+            out[offset] = response_length
+            out[offset + 1:offset + 1 + response_length] = response
+        
+        return out
+    
+    def channel(self, tester_address: int, frame_size: Optional[int] = None) -> "ChannelContext":
+        """Context for one tester address, created on first use
+        
+        Each tester gets its own ISO-TP reassembly state and diagnostic
+        session; DIDs, DTCs and services stay shared with the ECU.
+        ``frame_size`` sets the channel's CAN frame data length when it is
+        created (default: the ECU's).
+        """
+        channel = self.channels.get(tester_address)
+        if channel is None:
+            with self._write_lock:
+                channel = self.channels.get(tester_address)
+                if channel is None:
+                    channel = ChannelContext(self, tester_address, frame_size)
+                    self.channels[tester_address] = channel
+        return channel
+    
+    def process_concurrently(self, requests, executor=None) -> dict:
+        """Process ``(tester address, frame)`` pairs with testers in parallel
         
-        if service_id == 0x3E:  # Tester Present
-            return bytes([service_id + 0x40])  # Positive response
+        The frames of each tester are processed in order on its channel, as
+        one task on ``executor`` (default: a thread pool with a worker per
+        tester, up to 32). Returns ``{tester address: [frames sent back for
+        each request frame]}``.
+        """
+        frames_by_tester: dict = {}
+        for tester_address, frame in requests:
+            frames_by_tester.setdefault(tester_address, []).append(frame)
+        if executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(32, len(frames_by_tester) or 1)) as pool:
+                return self.process_concurrently(
+                    ((address, frame) for address, frames in frames_by_tester.items()
+                     for frame in frames), pool)
         
-        elif service_id == 0x10:  # Diagnostic Session Control
-            session_type = payload[0] if payload else 0
-            self.uds.session_active = True
-            return bytes([service_id + 0x40, session_type])
+        futures = {
+            tester_address: executor.submit(self.channel(tester_address).process_frames, frames)
+            for tester_address, frames in frames_by_tester.items()
+        }
+        return {tester_address: future.result() for tester_address, future in futures.items()}
+    
+    def clone(self, ecu_id: Optional[str] = None, timers=None) -> "VirtualECU":
+        """Create an ECU sharing this one's DIDs, DTCs and services
         
-        elif service_id == 0x22:  # Read Data By Identifier
-            return self._handle_read_data_identifier(payload)
+        Nothing is copied up front: the clone reads this ECU's DID table
+        and DTC store through a ``DataIdentifierOverlay`` and a
+        ``DTCOverlay``, and shares the service table until it changes it.
+        Writes on either ECU (0x2E, ``set_data_identifier``, ``add_dtc``,
+        0x14) stay private to it. The clone starts in the default session
+        with the same session configuration and without the optional
+        features (flash, metrics, faults, providers, response cache); the
+        transfer services of this ECU's flash are not carried over.
+        """
+        clone = VirtualECU.__new__(VirtualECU)
+        clone.ecu_id = ecu_id or self.ecu_id
+        clone.uds = UDSProtocol()
+        clone.session = self.session.copy(clone.uds, timers)
+        clone.docan = DoCAN(self.docan.frame_size, self.docan.max_data_length)
+        clone.dtc_codes = self.dtc_codes.overlay()
+        clone.data_identifiers = DataIdentifierOverlay(self._shared_data_identifiers())
+        clone.services = services = self.services.copy()
+        if self.flash is not None:
+            # Handlers bound to this ECU's flash would write to its memory
+            for service_id in services.supported_services():
+                if getattr(services.handlers[service_id], "__self__", None) is self.flash:
+                    services.unregister(service_id)
+        clone._init_state()
+        return clone
+    
+    def _shared_data_identifiers(self) -> dict:
+        """DID table that clones can share without seeing later writes
         
-        elif service_id == 0x19:  # Read DTC Information
-            return self._handle_read_dtc(payload)
+        A plain dict becomes the read-only base of this ECU's own overlay,
+        so both sides write to overlays from now on.
+        """
+        dids = self.data_identifiers
+        if isinstance(dids, DataIdentifierOverlay):
+            if not dids.overlay:
+                return dids.base
+            base = {**dids.base, **dids.overlay}
+        elif type(dids) is dict:
+            base = dids
+        else:
+            return dict(dids.items())  # E.g. NVM-backed: snapshot, keep this ECU's table
+        self.data_identifiers = DataIdentifierOverlay(base)
+        return base
+    
+    def enable_metrics(self, metrics: Optional["Metrics"] = None) -> "Metrics":
+        """Start counting requests, NRCs, latency and frames
         
+        Pass a shared ``Metrics`` to aggregate several ECUs.
+        """
+        if metrics is None:
+            from .metrics import Metrics
+            metrics = Metrics()
+        self.metrics = self.docan.metrics = metrics
+        for channel in list(self.channels.values()):
+            channel.docan.metrics = metrics
+        return metrics
+    
+    def enable_response_cache(self, capacity: int = 1024) -> ResponseCache:
+        """Cache responses to repeated 0x22 / 0x19 requests (LRU, ``capacity`` entries)"""
+        self.response_cache = ResponseCache(capacity)
+        return self.response_cache
+    
+    def disable_response_cache(self):
+        """Stop caching responses"""
+        self.response_cache = None
+    
+    def disable_metrics(self):
+        """Stop counting; the hot paths go back to a single ``None`` check"""
+        self.metrics = self.docan.metrics = None
+        for channel in list(self.channels.values()):
+            channel.docan.metrics = None
+    
+    def _handle_uds_service(self, service_id: int, payload: bytes) -> bytes:
+        """Handle UDS service request"""
+        # ServiceRegistry.lookup, inlined: this runs for every request
+        services = self.services
+        table = services.subfunctions[service_id]
+        if table is not None and payload:
+            handler = table[payload[0] & 0x7F] or services.handlers[service_id]
         else:
+            handler = services.handlers[service_id]
+        if handler is None:
             return self._create_error_response(0x12)  # Service not supported
+        cache = self.response_cache
+        if cache is not None and service_id in cache.services:
+            return cache.respond(self, service_id, payload, handler)
+        return handler(self, payload)
+    
+    @default_services.register(0x3E)
+    def _handle_tester_present(self, payload: bytes) -> bytes:
+        """Handle Tester Present request (the S3 timer restarts on every request)"""
+        if payload and payload[0] & 0x80:
+            return b""  # Positive response suppressed
+        return bytes([0x7E]) + payload[:1]  # Positive response
+    
+    @default_services.register(0x10)
+    def _handle_session_control(self, payload: bytes) -> bytes:
+        """Handle Diagnostic Session Control request"""
+        if len(payload) != 1:
+            return self._create_error_response(0x13)  # Incorrect length
+        
+        session_type = payload[0] & 0x7F
+        if not self.session.change(session_type):
+            return self._create_error_response(0x12)  # Sub-function not supported
+        if payload[0] & 0x80:
+            return b""  # Positive response suppressed
+        return bytes([0x50, session_type]) + self.session.timing_parameters()
     
+    @default_services.register(0x27)
+    def _handle_security_access(self, payload: bytes) -> bytes:
+        """Handle Security Access request"""
+        return self.session.security_access(self, payload)
+    
+    @default_services.register(0x22)
     def _handle_read_data_identifier(self, payload: bytes) -> bytes:
-        """Handle Read Data By Identifier request"""
-        if len(payload) < 2:
+        """Handle Read Data By Identifier request (one or more DIDs)"""
+        if not payload or len(payload) % 2:
             return self._create_error_response(0x13)  # Incorrect length
         
-        did = int.from_bytes(payload[:2], "big")
-        response_data = self.data_identifiers.get(did, b"\x00")
+        # Collect the records, then build the response in a single join
+        parts = [b"\x62"]
+        get = self.data_identifiers.get
+        if self.signals is not None:
+            get = self.signals.getter(get)
+        dynamic = self.dynamic_dids
+        for offset in range(0, len(payload), 2):
+            did = int.from_bytes(payload[offset:offset + 2], "big")
+            value = get(did)
+            if value is None and dynamic is not None:
+                value = dynamic.read(self, did)
+            if value is not None:
+                parts.append(payload[offset:offset + 2])
+                parts.append(value)
         
-        # Limit response to fit in single frame (max 7 bytes total minus service ID)
-        response_data = response_data[:4]  # Limit to 4 bytes
-        return bytes([0x62]) + payload[:2] + response_data
+        if len(parts) == 1:
+            return self._create_error_response(0x31)  # No supported DID
+        response = b"".join(parts)
+        if len(response) > self.docan.max_data_length:
+            return self._create_error_response(0x14)  # Response too long
+        return response
     
-    def _handle_read_dtc(self, payload: bytes) -> bytes:
-        """Handle Read DTC Information request"""
-        subfunction = payload[0] if payload else 0
-        
-        if subfunction == 0x01:  # Read number of DTCs
-            num_dtcs = len(self.dtc_codes)
-            return bytes([0x59, 0x01, 0x00, num_dtcs, 0x00])
+    @default_services.register(0x2E)
+    def _handle_write_data_identifier(self, payload: bytes) -> bytes:
+        """Handle Write Data By Identifier request"""
+        if len(payload) < 3:
+            return self._create_error_response(0x13)  # Incorrect length
         
-        elif subfunction == 0x02:  # Read all DTCs
-            response = bytes([0x59, 0x02])
-            for dtc in self.dtc_codes:
-                response += dtc.to_bytes(3, "big") + b"\x00"
-            return response
+        did = int.from_bytes(payload[:2], "big")
+        if did not in self.data_identifiers:
+            return self._create_error_response(0x31)  # Request out of range
+        try:
+            self.set_data_identifier(did, bytes(payload[2:]))
+        except KeyError:
+            return self._create_error_response(0x31)  # Request out of range
+        except ValueError:
+            return self._create_error_response(0x13)  # Incorrect length
+        return bytes([0x6E]) + payload[:2]
+    
+    @default_services.register(0x2C)
+    def _handle_dynamically_define_data_identifier(self, payload: bytes) -> bytes:
+        """Handle Dynamically Define Data Identifier request"""
+        with self._write_lock:
+            # Created and changed under the lock: channels share one instance
+            if self.dynamic_dids is None:
+                self.dynamic_dids = DynamicDataIdentifiers()
+            response = self.dynamic_dids.handle(self, payload)
+            if not response or response[0] != 0x7F:
+                self.state_version += 1  # Positive (possibly suppressed): definitions changed
+        return response
+    
+    @default_services.register(0x19, 0x01)
+    def _handle_report_number_of_dtc(self, payload: bytes) -> bytes:
+        """Handle Read DTC Information: report number of DTCs by status mask"""
+        mask = payload[1] if len(payload) > 1 else 0xFF
+        with self._write_lock:  # Other channels may be adding DTCs
+            count = min(self.dtc_codes.count_by_status_mask(mask), 0xFFFF)  # 2-byte DTCCount
+        return bytes([0x59, 0x01, self.dtc_codes.availability_mask,
+                      DTC_FORMAT_ISO_14229_1, count >> 8, count & 0xFF])
+    
+    @default_services.register(0x19, 0x02)
+    def _handle_report_dtc(self, payload: bytes) -> bytes:
+        """Handle Read DTC Information: report DTCs by status mask"""
+        mask = payload[1] if len(payload) > 1 else 0xFF
+        header = bytes([0x59, 0x02, self.dtc_codes.availability_mask])
+        with self._write_lock:  # NumPy views of the columns must not see them grow
+            records = self.dtc_codes.report_by_status_mask(mask)
+        return header + records
+    
+    @default_services.register(0x14)
+    def _handle_clear_diagnostic_information(self, payload: bytes) -> bytes:
+        """Handle Clear Diagnostic Information request"""
+        if len(payload) != 3:
+            return self._create_error_response(0x13)  # Incorrect length
         
-        return self._create_error_response(0x12)
+        group = int.from_bytes(payload, "big")
+        with self._write_lock:
+            cleared = self.dtc_codes.clear(group)
+            self.state_version += 1
+        if not cleared:
+            return self._create_error_response(0x31)  # Request out of range
+        return bytes([0x54])
+    
+    def _data_identifier_get(self):
+        """``get(did)`` for DID values, including provided DIDs"""
+        if self.signals is None:
+            return self.data_identifiers.get
+        return self.signals.getter(self.data_identifiers.get)
     
     def _create_error_response(self, nrc: int) -> bytes:
         """Create negative response"""
@@ -96,12 +529,86 @@ class VirtualECU:
     
     def set_data_identifier(self, did: int, value: bytes):
         """Set a data identifier value"""
-        self.data_identifiers[did] = value
+        with self._write_lock:
+            self.data_identifiers[did] = value
+            self.state_version += 1
     
-    def add_dtc(self, dtc_code: int):
-        """Add a DTC code"""
-        self.dtc_codes.append(dtc_code)
+    def add_dtc(self, dtc_code: int, status: int = 0x09):
+        """Add a DTC code (default status: testFailed | confirmedDTC)"""
+        with self._write_lock:
+            self.dtc_codes.add(dtc_code, status)
+            self.state_version += 1
     
     def clear_dtcs(self):
         """Clear all DTCs"""
-        self.dtc_codes.clear()
+        with self._write_lock:
+            self.dtc_codes.clear()
+            self.state_version += 1
+
+
+def _shared(name: str) -> property:
+    """Attribute of a channel that reads and writes its ECU's attribute"""
+    return property(attrgetter("ecu." + name),
+                    lambda channel, value: setattr(channel.ecu, name, value))
+
+
+class ChannelContext(VirtualECU):
+    """Per-tester view of a VirtualECU
+    
+    Holds the ISO-TP reassembly state, the diagnostic session and a lock
+    for one tester address. DIDs, DTCs, services, metrics and the other
+    shared tables are properties reading and writing the ECU's, so the
+    service handlers run unchanged on a channel. Frames of one channel are
+    processed one at a time; channels share no lock except the ECU's short
+    write lock around DID and DTC changes, so testers can be served from a
+    thread pool.
+    """
+    
+    ecu_id = _shared("ecu_id")
+    data_identifiers = _shared("data_identifiers")
+    dtc_codes = _shared("dtc_codes")
+    is_running = _shared("is_running")
+    services = _shared("services")
+    flash = _shared("flash")
+    metrics = _shared("metrics")
+    dynamic_dids = _shared("dynamic_dids")
+    faults = _shared("faults")
+    signals = _shared("signals")
+    channels = _shared("channels")
+    _write_lock = _shared("_write_lock")
+    response_cache = _shared("response_cache")
+    state_version = _shared("state_version")
+    
+    def __init__(self, ecu: VirtualECU, tester_address: int, frame_size: Optional[int] = None):
+        """Initialize channel in the default session"""
+        self.ecu = ecu
+        self.tester_address = tester_address
+        self.uds = UDSProtocol()
+        self.session = ecu.session.copy(self.uds)
+        self.docan = DoCAN(frame_size or ecu.docan.frame_size)
+        self.docan.metrics = ecu.metrics
+        self.lock = threading.RLock()
+    
+    def process_frame(self, request_data: bytes) -> list:
+        """Process one frame from this tester"""
+        with self.lock:
+            return super().process_frame(request_data)
+    
+    def process_frames(self, frames) -> list:
+        """Process frames from this tester in order; one list of frames sent back per frame"""
+        process_frame = super().process_frame
+        with self.lock:
+            return [process_frame(frame) for frame in frames]
+    
+    def process_uds_request(self, uds_data: bytes) -> bytes:
+        """Process a complete UDS request from this tester"""
+        with self.lock:
+            return super().process_uds_request(uds_data)
+    
+    def channel(self, tester_address: int, frame_size: Optional[int] = None) -> "ChannelContext":
+        """Channel of the ECU (channels do not nest)"""
+        return self.ecu.channel(tester_address, frame_size)
+    
+    def clone(self, ecu_id: Optional[str] = None, timers=None) -> VirtualECU:
+        """Clone the ECU"""
+        return self.ecu.clone(ecu_id, timers)
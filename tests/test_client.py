@@ -0,0 +1,197 @@
+"""Tests for the asyncio UDS tester client"""
+
+import asyncio
+import time
+
+import pytest
+from src.client import (
+    ClientPool, NegativeResponseError, RequestOutOfRangeError, SecurityAccessError,
+    ServiceNotSupportedError, SessionTiming, UDSClient
+)
+from src.flash import FlashMemory, FlashTransfer
+from src.session import default_key
+from src.transport import ECUServer, IsoTpChannel, VirtualCANBus
+from src.virtual_ecu import VirtualECU
+
+
+def run(coro):
+    """Run a coroutine to completion"""
+    return asyncio.run(coro)
+
+
+async def serve(ecu, scenario):
+    """Serve one ECU on 0x7E0 / 0x7E8 and run ``scenario(client)``"""
+    bus = VirtualCANBus()
+    async with ECUServer(bus) as server:
+        server.add_ecu(ecu, 0x7E0, 0x7E8)
+        client = UDSClient(IsoTpChannel(bus, 0x7E8, 0x7E0), timeout=1)
+        try:
+            return await scenario(client)
+        finally:
+            client.close()
+
+
+class TestUDSClient:
+    """Test suite for UDS Client"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create Virtual ECU with DIDs and DTCs"""
+        ecu = VirtualECU("TEST_ECU")
+        ecu.set_data_identifier(0xF190, b"VIN0123456789ABCD")
+        ecu.set_data_identifier(0x0102, b"\x12\x34")
+        ecu.add_dtc(0x123456, 0x09)
+        ecu.add_dtc(0x654321, 0x01)
+        return ecu
+    
+    def test_read_data_by_identifier(self, ecu):
+        """Test single DID read over a multi-frame response"""
+        result = run(serve(ecu, lambda client: client.read_data_by_identifier(0xF190)))
+        assert result == b"VIN0123456789ABCD"
+    
+    def test_read_data_by_identifiers(self, ecu):
+        """Test several DIDs split by their lengths"""
+        result = run(serve(ecu, lambda client: client.read_data_by_identifiers(
+            {0xF190: 17, 0x0102: 2})))
+        assert result == {0xF190: b"VIN0123456789ABCD", 0x0102: b"\x12\x34"}
+    
+    def test_write_then_read(self, ecu):
+        """Test WriteDataByIdentifier round trip"""
+        async def scenario(client):
+            await client.write_data_by_identifier(0x0102, b"\xAB\xCD")
+            return await client.read_data_by_identifier(0x0102)
+        
+        assert run(serve(ecu, scenario)) == b"\xAB\xCD"
+    
+    def test_negative_response_raises(self, ecu):
+        """Test NRC mapping to exception classes"""
+        with pytest.raises(RequestOutOfRangeError) as excinfo:
+            run(serve(ecu, lambda client: client.read_data_by_identifier(0x9999)))
+        assert excinfo.value.service_id == 0x22
+        assert excinfo.value.nrc == 0x31
+        assert "requestOutOfRange" in str(excinfo.value)
+    
+    def test_unmapped_nrc_raises_base_class(self, ecu):
+        """Test an NRC without a dedicated class"""
+        @ecu.services.register(0x31)
+        def busy(ecu, payload):
+            return ecu._create_error_response(0x21)
+        
+        with pytest.raises(NegativeResponseError) as excinfo:
+            run(serve(ecu, lambda client: client.request(b"\x31\x01\x02\x03")))
+        assert type(excinfo.value) is NegativeResponseError
+        assert excinfo.value.nrc == 0x21
+    
+    def test_unsupported_service(self, ecu):
+        """Test NRC 0x11 maps to ServiceNotSupportedError"""
+        with pytest.raises(ServiceNotSupportedError):
+            run(serve(ecu, lambda client: client.request(b"\x85\x01")))
+    
+    def test_session_control_timing(self, ecu):
+        """Test P2 / P2* parsed from the session control response"""
+        result = run(serve(ecu, lambda client: client.diagnostic_session_control(0x03)))
+        assert result == SessionTiming(0x03, 0.05, 5.0)
+    
+    def test_security_access_unlock(self, ecu):
+        """Test seed / key exchange through the client"""
+        async def scenario(client):
+            await client.diagnostic_session_control(0x03)
+            await client.unlock(1, default_key)
+            await client.tester_present()
+        
+        run(serve(ecu, scenario))
+        assert ecu.session.security_level == 1
+    
+    def test_invalid_key(self, ecu):
+        """Test invalid key maps to SecurityAccessError"""
+        async def scenario(client):
+            await client.diagnostic_session_control(0x03)
+            await client.request_seed(1)
+            await client.send_key(1, b"\x00\x00\x00\x00")
+        
+        with pytest.raises(SecurityAccessError) as excinfo:
+            run(serve(ecu, scenario))
+        assert excinfo.value.nrc == 0x35
+    
+    def test_dtc_services(self, ecu):
+        """Test DTC count, report and clear"""
+        async def scenario(client):
+            count = await client.read_dtc_count(0x08)
+            dtcs = await client.read_dtcs()
+            await client.clear_diagnostic_information()
+            return count, dtcs, await client.read_dtc_count()
+        
+        count, dtcs, cleared = run(serve(ecu, scenario))
+        assert count == 1
+        assert dtcs == {0x123456: 0x09, 0x654321: 0x01}
+        assert cleared == 0
+    
+    def test_response_pending_is_awaited(self, ecu):
+        """Test NRC 0x78 extends the wait instead of raising"""
+        ecu.session.p2_server = 0.0
+        
+        @ecu.services.register(0x31)
+        def slow(ecu, payload):
+            time.sleep(0.001)
+            return bytes([0x71]) + payload
+        
+        result = run(serve(ecu, lambda client: client.request(b"\x31\x01\xAA\xBB")))
+        assert result == b"\x71\x01\xAA\xBB"
+    
+    def test_download(self, ecu, tmp_path):
+        """Test flash download with CRC verification"""
+        memory = FlashMemory(str(tmp_path / "flash.bin"), 0x1000, base_address=0x8000)
+        FlashTransfer(memory, max_block_length=0x82).install(ecu)
+        image = bytes(range(256)) * 3
+        try:
+            run(serve(ecu, lambda client: client.download(0x8000, image)))
+            assert memory.read(0x8000, len(image)) == image
+        finally:
+            memory.close()
+    
+    def test_pool_queries_many_ecus(self):
+        """Test pooled clients query a network concurrently"""
+        async def scenario():
+            bus = VirtualCANBus()
+            server = ECUServer(bus)
+            pool = ClientPool(bus)
+            for i in range(20):
+                ecu = VirtualECU(f"ECU_{i:02d}")
+                ecu.set_data_identifier(0xF190, bytes([i]) * 17)
+                server.add_ecu(ecu, 0x10000 + i, 0x20000 + i)
+                pool.connect(f"ECU_{i:02d}", 0x10000 + i, 0x20000 + i)
+            async with server, pool:
+                return await pool.gather(lambda client: client.read_data_by_identifier(0xF190))
+        
+        results = run(scenario())
+        assert len(results) == 20
+        assert results["ECU_07"] == bytes([7]) * 17
+    
+    def test_pool_collects_exceptions(self):
+        """Test a failing ECU does not abort the other requests"""
+        async def scenario():
+            bus = VirtualCANBus()
+            pool = ClientPool(bus)
+            async with ECUServer(bus) as server, pool:
+                for i in range(2):
+                    ecu = VirtualECU(f"ECU_{i}")
+                    if i:
+                        ecu.set_data_identifier(0x0102, b"\x01")
+                    server.add_ecu(ecu, 0x700 + i, 0x708 + i)
+                    pool.connect(f"ECU_{i}", 0x700 + i, 0x708 + i)
+                return await pool.gather(lambda client: client.read_data_by_identifier(0x0102))
+        
+        results = run(scenario())
+        assert isinstance(results["ECU_0"], RequestOutOfRangeError)
+        assert results["ECU_1"] == b"\x01"
+    
+    def test_pool_rejects_duplicate_name(self):
+        """Test connecting the same name twice"""
+        pool = ClientPool(VirtualCANBus())
+        pool.connect("ECU", 0x7E0, 0x7E8)
+        with pytest.raises(ValueError):
+            pool.connect("ECU", 0x7E1, 0x7E9)
+        assert len(pool) == 1
+        assert isinstance(pool["ECU"], UDSClient)
+        pool.close()
+        assert len(pool) == 0
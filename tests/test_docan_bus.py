@@ -1,7 +1,7 @@
 """Tests for DoCAN Bus implementation"""
 
 import pytest
-from src.docan_bus import DoCAN
+from src.docan_bus import DoCAN, Frame, FrameType
 
 
 class TestDoCAN:
@@ -100,3 +100,267 @@ class TestDoCAN:
         assert docan.FIRST_FRAME == 0x1
         assert docan.CONSECUTIVE_FRAME == 0x2
         assert docan.FLOW_CONTROL_FRAME == 0x3
+    
+    def test_create_flow_control_frame(self, docan):
+        """Test creating flow control frame"""
+        frame = docan.create_flow_control_frame(docan.FC_WAIT, 8, 20)
+        
+        assert frame == bytes([0x31, 0x08, 0x14])
+    
+    def test_segment_short_payload(self, docan):
+        """Test segmenting payload that fits in a single frame"""
+        frames = docan.segment(b"\x22\xF1\x90")
+        
+        assert frames == [bytes([0x03, 0x22, 0xF1, 0x90])]
+    
+    def test_segment_long_payload(self, docan):
+        """Test segmenting payload into first and consecutive frames"""
+        data = bytes(range(20))
+        frames = docan.segment(data)
+        
+        assert len(frames) == 3
+        assert frames[0] == bytes([0x10, 0x14]) + data[:6]
+        assert frames[1] == bytes([0x21]) + data[6:13]
+        assert frames[2] == bytes([0x22]) + data[13:20]
+    
+    def test_segment_exceeds_max_length(self, docan):
+        """Test segmenting payload longer than the 12-bit length field"""
+        with pytest.raises(ValueError):
+            docan.segment(bytes(4096))
+    
+    def test_reassemble_single_frame(self, docan):
+        """Test reassembling single frame"""
+        result = docan.reassemble(bytes([0x02, 0x10, 0x03]))
+        
+        assert result["complete"] is True
+        assert result["data"] == b"\x10\x03"
+    
+    def test_reassemble_multi_frame(self, docan):
+        """Test reassembling a maximum length transfer"""
+        data = bytes(i & 0xFF for i in range(4095))
+        frames = docan.segment(data)
+        
+        for frame in frames[:-1]:
+            assert docan.reassemble(frame)["complete"] is False
+        result = docan.reassemble(frames[-1])
+        
+        assert result["complete"] is True
+        assert result["data"] == data
+        assert docan.expected_length == 0
+    
+    def test_reassemble_wrong_sequence_number(self, docan):
+        """Test reassembly aborts on wrong sequence number"""
+        frames = docan.segment(bytes(20))
+        docan.reassemble(frames[0])
+        result = docan.reassemble(frames[2])
+        
+        assert "error" in result
+        assert docan.expected_length == 0
+    
+    def test_reassemble_unexpected_consecutive_frame(self, docan):
+        """Test consecutive frame without a first frame"""
+        result = docan.reassemble(bytes([0x21, 0x00]))
+        
+        assert "error" in result
+    
+    def test_parse_flow_control_frame(self, docan):
+        """Test parsing flow control frame"""
+        result = docan.parse_frame(bytes([0x30, 0x08, 0x14]))
+        
+        assert result["type"] == "FlowControl"
+        assert result["flow_status"] == docan.FC_CONTINUE_TO_SEND
+        assert result["block_size"] == 8
+        assert result["st_min"] == 20
+    
+    def test_start_transmission_single_frame(self, docan):
+        """Test short messages need no flow control"""
+        assert docan.start_transmission(b"\x7E") == b"\x01\x7E"
+        assert docan.transmitting is False
+    
+    def test_transmission_with_block_size(self, docan):
+        """Test consecutive frames are released one block per flow control"""
+        data = bytes(range(40))
+        first_frame = docan.start_transmission(data)
+        
+        assert first_frame == docan.segment(data)[0]
+        assert docan.transmitting is True
+        
+        block = docan.handle_flow_control(bytes([0x30, 0x02, 0x00]))
+        assert block == docan.segment(data)[1:3]
+        
+        rest = docan.handle_flow_control(bytes([0x30, 0x00, 0x00]))
+        assert rest == docan.segment(data)[3:]
+        assert docan.transmitting is False
+    
+    def test_transmission_overflow_aborts(self, docan):
+        """Test overflow flow status aborts the transfer"""
+        docan.start_transmission(bytes(40))
+        
+        assert docan.handle_flow_control(bytes([0x32, 0x00, 0x00])) == []
+        assert docan.transmitting is False
+    
+    def test_decode_frames(self, docan):
+        """Test decoding each frame type into a Frame"""
+        single = docan.decode(bytes([0x03, 0x22, 0xF1, 0x90]))
+        assert single.frame_type is FrameType.SINGLE_FRAME
+        assert single.length == 3
+        assert single.data == bytes([0x22, 0xF1, 0x90])
+        
+        first = docan.decode(bytes([0x10, 0x14, 1, 2, 3, 4, 5, 6]))
+        assert first.frame_type is FrameType.FIRST_FRAME
+        assert first.length == 0x14
+        assert first.data == bytes([1, 2, 3, 4, 5, 6])
+        
+        consecutive = docan.decode(bytes([0x25, 7, 8]))
+        assert consecutive.frame_type == docan.CONSECUTIVE_FRAME
+        assert consecutive.sequence_number == 5
+        assert consecutive.data == bytes([7, 8])
+        
+        flow_control = docan.decode(bytes([0x31, 0x08, 0x14]))
+        assert flow_control.frame_type is FrameType.FLOW_CONTROL
+        assert (flow_control.flow_status, flow_control.block_size,
+                flow_control.st_min) == (1, 8, 20)
+    
+    def test_decode_reuses_frame(self, docan):
+        """Test decoding into a caller-owned Frame"""
+        frame = Frame()
+        
+        assert docan.decode(bytes([0x01, 0x3E]), frame) is frame
+        assert docan.decode(bytes([0x02, 0x10, 0x03]), frame) is frame
+        assert frame.data == bytes([0x10, 0x03])
+    
+    def test_decode_invalid(self, docan):
+        """Test invalid frames raise ValueError"""
+        for frame in (b"", bytes([0x40, 0x00]), bytes([0x30, 0x00]), bytes([0x10])):
+            with pytest.raises(ValueError):
+                docan.decode(frame)
+        assert "error" in docan.parse_frame(bytes([0x10]))
+    
+    def test_pack_into_buffer(self, docan):
+        """Test the pack_*_into codecs match the create_* frames"""
+        buffer = bytearray(32)
+        data = bytes(range(1, 21))
+        
+        size = docan.pack_single_frame_into(buffer, 0, data[:3])
+        assert buffer[:size] == docan.create_single_frame(data[:3])
+        size = docan.pack_first_frame_into(buffer, 8, data, len(data))
+        assert buffer[8:8 + size] == docan.create_first_frame(data, len(data))
+        size = docan.pack_consecutive_frame_into(buffer, 16, memoryview(data)[6:], 1)
+        assert buffer[16:16 + size] == docan.create_consecutive_frame(data[6:], 1)
+        size = DoCAN.pack_flow_control_frame_into(buffer, 24, DoCAN.FC_WAIT, 4, 10)
+        assert buffer[24:24 + size] == docan.create_flow_control_frame(DoCAN.FC_WAIT, 4, 10)
+    
+    def test_pack_first_frame_length_escape(self, docan):
+        """Test pack_first_frame_into escapes FF_DL above 4095 and rejects bad lengths"""
+        buffer = bytearray(8)
+        data = bytes(range(1, 9))
+        
+        size = docan.pack_first_frame_into(buffer, 0, data, 10000)
+        assert buffer[:size] == b"\x10\x00\x00\x00\x27\x10\x01\x02"
+        size = docan.pack_first_frame_into(buffer, 0, data, 4095)
+        assert buffer[:size] == b"\x1F\xFF" + data[:6]
+        for length in (7, 0x100000000):
+            with pytest.raises(ValueError):
+                docan.pack_first_frame_into(buffer, 0, data, length)
+    
+    def test_single_frame_escape_rejected(self, docan):
+        """Test classic CAN links reject the CAN FD single frame escape"""
+        frame = b"\x00\x03\x22\xF1\x90"
+        
+        assert "error" in docan.reassemble(frame)
+        with pytest.raises(ValueError):
+            docan.decode(frame)
+        assert DoCAN(frame_size=64).reassemble(frame)["data"] == b"\x22\xF1\x90"
+
+
+class TestCANFD:
+    """Test suite for CAN FD framing and escape sequences"""
+    
+    @pytest.fixture
+    def docan(self):
+        """Create DoCAN instance with 64-byte frames"""
+        return DoCAN(frame_size=64)
+    
+    def reassemble(self, frames: list) -> bytes:
+        """Feed frames to a fresh CAN FD receiver"""
+        receiver = DoCAN(frame_size=64)
+        for frame in frames:
+            result = receiver.reassemble(frame)
+        assert result["complete"]
+        return bytes(result["data"])
+    
+    def test_single_frame_escape(self, docan):
+        """Test CAN FD single frames put the length in the second byte"""
+        data = bytes(range(20))
+        
+        assert docan.create_single_frame(b"\x3E") == b"\x01\x3E"
+        assert docan.create_single_frame(data) == b"\x00\x14" + data
+        assert docan.segment(bytes(62)) == [b"\x00\x3E" + bytes(62)]
+        assert self.reassemble([docan.create_single_frame(data)]) == data
+        with pytest.raises(ValueError):
+            docan.create_single_frame(bytes(63))
+    
+    def test_segment_frame_counts(self, docan):
+        """Test 64-byte frames need ~9x fewer frames than classic CAN"""
+        data = bytes(i & 0xFF for i in range(4095))
+        frames = docan.segment(data)
+        
+        assert len(DoCAN().segment(data)) == 586
+        assert len(frames) == 66
+        assert all(len(frame) <= 64 for frame in frames)
+        assert self.reassemble(frames) == data
+    
+    def test_first_frame_length_escape(self, docan):
+        """Test messages over 4095 bytes use a 32-bit FF_DL"""
+        data = bytes(i & 0xFF for i in range(10000))
+        frames = docan.segment(data)
+        
+        assert frames[0][:6] == b"\x10\x00\x00\x00\x27\x10"
+        assert frames[0][6:] == data[:58]
+        assert self.reassemble(frames) == data
+        assert docan.decode(frames[0]).length == 10000
+        assert docan.decode(frames[0]).data == data[:58]
+    
+    def test_classic_length_limit(self):
+        """Test classic CAN keeps the 4095-byte limit unless raised"""
+        data = bytes(5000)
+        with pytest.raises(ValueError):
+            DoCAN().segment(data)
+        
+        frames = DoCAN(max_data_length=0xFFFFFFFF).segment(data)
+        assert frames[0] == b"\x10\x00\x00\x00\x13\x88\x00\x00"
+        assert self.reassemble(frames) == data
+    
+    def test_transmission_with_block_size(self, docan):
+        """Test flow-controlled CAN FD transmission"""
+        data = bytes(i & 0xFF for i in range(1000))
+        first_frame = docan.start_transmission(data)
+        block = docan.handle_flow_control(bytes([0x30, 0x04, 0x00]))
+        rest = docan.handle_flow_control(bytes([0x30, 0x00, 0x00]))
+        
+        assert [first_frame] + block + rest == docan.segment(data)
+        assert len(block) == 4
+    
+    def test_first_frame_over_limit(self):
+        """Test a First Frame over max_data_length is refused without buffering"""
+        receiver = DoCAN()
+        result = receiver.reassemble(b"\x10\x00\x10\x00\x00\x00\x00\x00")  # 256 MiB
+        
+        assert result["overflow"] and result["length"] == 0x10000000
+        assert receiver.expected_length == 0
+        assert len(receiver.buffer) == 0
+    
+    def test_invalid_first_frame_lengths(self, docan):
+        """Test escaped FF_DL <= 4095 and FD First Frames fitting a single frame"""
+        receiver = DoCAN(frame_size=64)
+        
+        assert "error" in receiver.reassemble(b"\x10\x00\x00\x00\x0F\xFF\x00\x00")
+        assert "error" in receiver.reassemble(b"\x10\x3E" + bytes(62))
+        assert receiver.reassemble(b"\x10\x3F" + bytes(62))["length"] == 63
+        with pytest.raises(ValueError):
+            docan.decode(b"\x10\x00\x00\x00\x0F\xFF\x00\x00")
+    
+    def test_invalid_frame_size(self):
+        """Test frame sizes that are not CAN FD data lengths"""
+        with pytest.raises(ValueError):
+            DoCAN(frame_size=10)
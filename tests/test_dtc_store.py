@@ -0,0 +1,218 @@
+"""Tests for DTC store"""
+
+import pytest
+from src import dtc_store
+from src.dtc_store import DTCStore
+
+
+class TestDTCStore:
+    """Test suite for DTC Store"""
+    
+    @pytest.fixture
+    def store(self):
+        """Create DTC store with mixed statuses"""
+        store = DTCStore()
+        store.add(0x010203, 0x09)
+        store.add(0x040506, 0x04)
+        store.add(0x070809, 0x2F)
+        return store
+    
+    def test_add_and_contains(self, store):
+        """Test DTCs are stored in insertion order"""
+        assert len(store) == 3
+        assert 0x040506 in store
+        assert list(store) == [0x010203, 0x040506, 0x070809]
+    
+    def test_add_updates_status(self, store):
+        """Test re-adding a DTC updates its status only"""
+        store.add(0x040506, 0x08)
+        
+        assert len(store) == 3
+        assert store.status_of(0x040506) == 0x08
+        assert store.count_by_status_mask(0x04) == 1
+    
+    def test_add_invalid_dtc(self, store):
+        """Test DTC numbers are limited to 24 bits"""
+        with pytest.raises(ValueError):
+            store.add(0x1000000)
+    
+    def test_count_by_status_mask(self, store):
+        """Test counting through the status index"""
+        assert store.count_by_status_mask(0xFF) == 3
+        assert store.count_by_status_mask(0x08) == 2
+        assert store.count_by_status_mask(0x40) == 0
+    
+    def test_count_index_tracks_statuses(self, store):
+        """Test the index only holds status values that occur"""
+        store.add(0x040506, 0x09)
+        
+        assert dict(store._status_counts) == {0x09: 2, 0x2F: 1}
+        assert store.count_by_status_mask(0x04) == 1
+    
+    def test_report_by_status_mask(self, store):
+        """Test record serialization"""
+        assert store.report_by_status_mask(0x08) == bytes(
+            [0x01, 0x02, 0x03, 0x09, 0x07, 0x08, 0x09, 0x2F]
+        )
+        assert store.report_by_status_mask(0x40) == b""
+    
+    def test_report_without_numpy(self, store, monkeypatch):
+        """Test pure-Python serialization matches"""
+        monkeypatch.setattr(dtc_store, "NUMPY_MIN_DTCS", 0)
+        expected = store.report_by_status_mask(0xFF)
+        monkeypatch.setattr(dtc_store, "np", None)
+        
+        assert store.report_by_status_mask(0xFF) == expected
+    
+    def test_clear_group_without_numpy(self, monkeypatch):
+        """Test the pure-Python group clear matches the column path"""
+        monkeypatch.setattr(dtc_store, "NUMPY_MIN_DTCS", 0)
+        stores = [DTCStore(), DTCStore()]
+        for store in stores:
+            for i in range(300):
+                store.add(0x120000 + i * 37, i % 5 * 4 + 1)
+        stores[0].clear(0x120100)
+        monkeypatch.setattr(dtc_store, "np", None)
+        stores[1].clear(0x120100)
+        
+        vectorized, python = stores
+        assert list(vectorized) == list(python)
+        assert vectorized._status == python._status
+        assert vectorized._rows == python._rows
+        assert vectorized._status_counts == python._status_counts
+        assert len(python) == 293
+    
+    def test_clear_single_dtc(self, store):
+        """Test clearing one DTC keeps the index consistent"""
+        assert store.clear(0x010203) is True
+        
+        assert list(store) == [0x040506, 0x070809]
+        assert store.status_of(0x070809) == 0x2F
+        assert store.count_by_status_mask(0x08) == 1
+    
+    def test_clear_group(self, store):
+        """Test groups with trailing zero bytes clear every DTC they cover"""
+        for dtc in (0x123401, 0x123402, 0x123500, 0x130000):
+            store.add(dtc, 0x01)
+        
+        assert store.clear(0x123400) is True
+        assert list(store) == [0x010203, 0x040506, 0x070809, 0x123500, 0x130000]
+        assert store.clear(0x120000) is True
+        assert store.clear(0x123400) is False
+        assert list(store) == [0x010203, 0x040506, 0x070809, 0x130000]
+        assert store.status_of(0x130000) == 0x01
+        assert store.count_by_status_mask(0x01) == 3
+        
+        store.add(0x123456)
+        assert list(store)[-1] == 0x123456
+    
+    def test_clear_all(self, store):
+        """Test clearing the all-DTC group"""
+        assert store.clear() is True
+        
+        assert len(store) == 0
+        assert store.count_by_status_mask(0xFF) == 0
+    
+    def test_clear_unknown_group(self, store):
+        """Test clearing an unknown group"""
+        assert store.clear(0x123456) is False
+        assert len(store) == 3
+    
+    def test_copy_is_independent(self, store):
+        """Test a copy keeps its own columns and index"""
+        copy = store.copy()
+        copy.add(0x0A0B0C, 0x01)
+        copy.clear(0x010203)
+        
+        assert len(store) == 3
+        assert store.count_by_status_mask(0x01) == 2
+        assert list(copy) == [0x040506, 0x070809, 0x0A0B0C]
+        assert copy.count_by_status_mask(0x01) == 2
+
+
+class TestDTCOverlay:
+    """Test suite for DTC Overlay"""
+    
+    @pytest.fixture
+    def base(self):
+        """Create shared base store"""
+        store = DTCStore()
+        store.add(0x010203, 0x09)
+        store.add(0x040506, 0x04)
+        return store
+    
+    @pytest.fixture
+    def overlay(self, base):
+        """Create overlay over the base store"""
+        return base.overlay()
+    
+    def test_reads_fall_through(self, overlay):
+        """Test an unchanged overlay reports the base records"""
+        assert len(overlay) == 2
+        assert 0x040506 in overlay
+        assert overlay.count_by_status_mask(0x04) == 1
+        assert overlay.report_by_status_mask(0xFF) == bytes.fromhex("01020309 04050604")
+        assert overlay.own is None
+    
+    def test_add_and_update(self, base, overlay):
+        """Test new DTCs and status changes stay in the overlay"""
+        overlay.add(0x070809, 0x01)
+        overlay.add(0x010203, 0x04)
+        
+        assert list(overlay) == [0x040506, 0x070809, 0x010203]
+        assert overlay.status_of(0x010203) == 0x04
+        assert overlay.count_by_status_mask(0x04) == 2
+        assert overlay.count_by_status_mask(0x08) == 0
+        assert overlay.report_by_status_mask(0x04) == bytes.fromhex("04050604 01020304")
+        assert base.status_of(0x010203) == 0x09
+        assert len(base) == 2
+    
+    def test_clear_single_base_dtc(self, base, overlay):
+        """Test clearing a base DTC hides it"""
+        assert overlay.clear(0x010203) is True
+        assert overlay.clear(0x010203) is False
+        
+        assert 0x010203 not in overlay
+        assert len(overlay) == 1
+        assert overlay.count_by_status_mask(0xFF) == 1
+        with pytest.raises(KeyError):
+            overlay.status_of(0x010203)
+        assert 0x010203 in base
+    
+    def test_clear_group(self, base, overlay):
+        """Test clearing a group hides base DTCs and drops own DTCs"""
+        overlay.add(0x040599)
+        overlay.add(0x040506, 0x08)
+        
+        assert overlay.clear(0x040500) is True
+        assert list(overlay) == [0x010203]
+        assert overlay.count_by_status_mask(0xFF) == 1
+        assert overlay.clear(0x040000) is False
+        assert len(base) == 2
+    
+    def test_clear_all(self, base, overlay):
+        """Test clearing everything detaches from the base"""
+        overlay.add(0x070809)
+        
+        assert overlay.clear() is True
+        assert len(overlay) == 0
+        assert overlay.report_by_status_mask(0xFF) == b""
+        assert len(base) == 2
+    
+    def test_base_changes_are_not_seen(self, base, overlay):
+        """Test the overlay keeps the base as it was when created"""
+        base.add(0x070809)
+        base.clear(0x010203)
+        
+        assert list(overlay) == [0x010203, 0x040506]
+    
+    def test_copy_is_independent(self, overlay):
+        """Test copies of a changed overlay"""
+        overlay.add(0x070809)
+        overlay.clear(0x040506)
+        copy = overlay.copy()
+        copy.add(0x0A0B0C)
+        overlay.add(0x040506)
+        
+        assert list(copy) == [0x010203, 0x070809, 0x0A0B0C]
+        assert list(overlay) == [0x010203, 0x070809, 0x040506]
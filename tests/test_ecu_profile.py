@@ -0,0 +1,154 @@
+"""Tests for declarative ECU profiles"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from src import ecu_profile
+from src.ecu_profile import ECUProfile, encode_value, load_profile
+from src.session import default_key
+
+EXAMPLE_PROFILE = Path(__file__).parent.parent / "examples" / "profiles" / "body_control.yaml"
+
+DOCUMENT = {
+    "name": "BCM",
+    "services": ["0x10", "0x22", "0x27", "0x2E", "0x3E"],
+    "sessions": [1, 3],
+    "timing": {"p2_server": 0.025, "s3_server": 2.0},
+    "security": {"levels": [1], "max_attempts": 2},
+    "dids": {
+        "0xF190": {"type": "ascii", "value": "VIN123", "length": 8},
+        "0xF18C": "SERIAL",
+        "0x0200": {"type": "uint16", "value": 13.8, "scale": 0.01},
+    },
+    "dtcs": {"0xC0FF01": "0x09", "0x9A0101": 36},
+}
+
+
+class TestECUProfile:
+    """Test suite for ECU Profile"""
+    
+    @pytest.fixture(autouse=True)
+    def fresh_process_cache(self, monkeypatch):
+        """Isolate the in-process compiled profile cache"""
+        monkeypatch.setattr(ecu_profile, "_compiled", {})
+    
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Write the test profile as JSON"""
+        path = tmp_path / "bcm.json"
+        path.write_text(json.dumps(DOCUMENT))
+        return str(path)
+    
+    def test_encodings(self):
+        """Test DID value encodings"""
+        assert encode_value("ABC") == b"ABC"
+        assert encode_value({"type": "ascii", "value": "AB", "length": 4}) == b"AB  "
+        assert encode_value({"type": "hex", "value": "DEAD BEEF"}) == b"\xDE\xAD\xBE\xEF"
+        assert encode_value({"type": "bytes", "value": [1, "0x02"]}) == b"\x01\x02"
+        assert encode_value({"type": "uint24", "value": 0x123456}) == b"\x12\x34\x56"
+        assert encode_value({"type": "int8", "value": -1}) == b"\xFF"
+        scaled = {"type": "uint8", "value": 20, "scale": 0.5, "offset": -40}
+        assert encode_value(scaled) == bytes([120])
+    
+    def test_invalid_encodings(self):
+        """Test values that cannot be encoded"""
+        with pytest.raises(ValueError):
+            encode_value({"type": "uint8", "value": 256})
+        with pytest.raises(ValueError):
+            encode_value({"type": "float", "value": 1.0})
+        with pytest.raises(ValueError):
+            encode_value({"type": "ascii", "value": "TOO LONG", "length": 4})
+        with pytest.raises(ValueError):
+            encode_value({"type": "ascii"})
+    
+    def test_spawned_ecu_serves_profile(self, path):
+        """Test DIDs, DTCs, sessions and services come from the profile"""
+        ecu = load_profile(path).spawn("BCM_1")
+        
+        assert ecu.ecu_id == "BCM_1"
+        assert ecu.process_uds_request(b"\x22\xF1\x90") == b"\x62\xF1\x90VIN123  "
+        assert ecu.process_uds_request(b"\x22\x02\x00") == b"\x62\x02\x00\x05\x64"
+        assert ecu.dtc_codes.status_of(0x9A0101) == 0x24
+        assert ecu.process_uds_request(b"\x10\x02")[2] == 0x12  # Programming session not listed
+        assert ecu.process_uds_request(b"\x19\x01\xFF")[2] == 0x12  # Service not listed
+        assert ecu.process_uds_request(b"\x10\x03") == bytes([0x50, 0x03, 0x00, 0x19, 0x01, 0xF4])
+        assert ecu.session.s3_server == 2.0
+    
+    def test_security_levels(self, path):
+        """Test only the listed SecurityAccess levels are supported"""
+        ecu = load_profile(path).spawn()
+        ecu.process_uds_request(b"\x10\x03")
+        
+        assert ecu.process_uds_request(b"\x27\x03")[2] == 0x12
+        seed = ecu.process_uds_request(b"\x27\x01")[2:]
+        assert ecu.process_uds_request(b"\x27\x02" + default_key(seed, 1)) == b"\x67\x02"
+        assert ecu.session.max_attempts == 2
+    
+    def test_spawned_ecus_share_values_not_containers(self, path):
+        """Test writes stay local while DID values are shared"""
+        profile = load_profile(path)
+        first, second = profile.spawn("A"), profile.spawn("B")
+        
+        assert first.data_identifiers[0xF18C] is second.data_identifiers[0xF18C]
+        first.set_data_identifier(0xF18C, b"OTHER")
+        first.add_dtc(0x111111)
+        
+        assert second.data_identifiers[0xF18C] == b"SERIAL"
+        assert 0x111111 not in second.dtc_codes
+        assert 0x111111 not in profile.dtcs
+    
+    def test_compiled_once_per_process(self, path):
+        """Test loading the same content twice returns the same profile"""
+        assert load_profile(path) is load_profile(path)
+    
+    def test_disk_cache_skips_parsing(self, path, tmp_path, monkeypatch):
+        """Test a cached profile is read without parsing the document"""
+        cache_dir = str(tmp_path / "cache")
+        profile = load_profile(path, cache_dir)
+        assert os.listdir(cache_dir) == [profile.digest + ".pickle"]
+        
+        monkeypatch.setattr(ecu_profile, "_compiled", {})
+        monkeypatch.setattr(ecu_profile, "parse_profile", None)  # Would fail if called
+        cached = load_profile(path, cache_dir)
+        
+        assert cached is not profile
+        assert cached.digest == profile.digest
+        assert cached.data_identifiers == profile.data_identifiers
+    
+    def test_content_change_invalidates_cache(self, path, tmp_path):
+        """Test an edited profile gets a new digest"""
+        cache_dir = str(tmp_path / "cache")
+        first = load_profile(path, cache_dir)
+        Path(path).write_text(json.dumps(dict(DOCUMENT, name="BCM2")))
+        second = load_profile(path, cache_dir)
+        
+        assert second.digest != first.digest
+        assert second.name == "BCM2"
+    
+    def test_invalid_profiles(self):
+        """Test validation errors"""
+        with pytest.raises(ValueError):
+            ECUProfile.compile([])
+        with pytest.raises(ValueError):
+            ECUProfile.compile({"timing": {"p4_server": 1}})
+        with pytest.raises(ValueError):
+            ECUProfile.compile({"dids": {"0x10000": "X"}})
+        with pytest.raises(ValueError):
+            ECUProfile.compile({"dtcs": {"0x1000000": 9}})
+    
+    def test_unsupported_format(self, tmp_path):
+        """Test unknown file extensions are rejected"""
+        path = tmp_path / "bcm.ini"
+        path.write_text("name = BCM")
+        with pytest.raises(ValueError):
+            load_profile(str(path))
+    
+    def test_yaml_example_profile(self):
+        """Test the shipped YAML example"""
+        pytest.importorskip("yaml")
+        ecu = load_profile(str(EXAMPLE_PROFILE)).spawn()
+        
+        assert ecu.ecu_id == "BCM"
+        assert ecu.process_uds_request(b"\x22\xF1\x90") == b"\x62\xF1\x90WVWZZZ1JZXW000001"
@@ -0,0 +1,160 @@
+"""Tests for seeded fault injection"""
+
+import pytest
+from src.faults import FaultInjector, FaultSchedule
+from src.virtual_ecu import VirtualECU
+
+# ReadDataByIdentifier 0xF190 (long response) and WriteDataByIdentifier First Frame
+READ_VIN = b"\x03\x22\xF1\x90"
+WRITE_FIRST_FRAME = b"\x10\x14\x2E\x01\x00\xAA\xAA\xAA"
+FLOW_CONTROL = b"\x30\x00\x00"
+
+
+class TestFaultSchedule:
+    """Test suite for FaultSchedule"""
+    
+    def draws(self, schedule: FaultSchedule, count: int) -> list:
+        """Draw ``count`` frames"""
+        return [schedule.draw() for _ in range(count)]
+    
+    def test_seeded(self):
+        """Test the same seed gives the same schedule"""
+        rates = {"a": 0.05, "b": 0.01}
+        
+        first = self.draws(FaultSchedule(rates, seed=7, block=64), 5000)
+        assert first == self.draws(FaultSchedule(rates, seed=7, block=64), 5000)
+        assert first != self.draws(FaultSchedule(rates, seed=8, block=64), 5000)
+    
+    def test_rates(self):
+        """Test fault frequencies follow the rates"""
+        faults = self.draws(FaultSchedule({"a": 0.05, "b": 0.01}, seed=1), 100000)
+        
+        assert 4500 < faults.count("a") < 5500
+        assert 800 < faults.count("b") < 1200
+    
+    def test_no_faults_and_all_faults(self):
+        """Test zero and certain rates"""
+        assert set(self.draws(FaultSchedule({"a": 0.0}), 1000)) == {None}
+        assert set(self.draws(FaultSchedule({"a": 1.0}, block=16), 1000)) == {"a"}
+    
+    def test_rates_above_one(self):
+        """Test rates adding up to more than 1 are rejected"""
+        with pytest.raises(ValueError):
+            FaultSchedule({"a": 0.6, "b": 0.6})
+
+
+class TestFaultInjector:
+    """Test suite for FaultInjector"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create ECU with a 40-byte DID (First Frame + 6 Consecutive Frames)"""
+        ecu = VirtualECU("FAULT_ECU")
+        ecu.set_data_identifier(0xF190, bytes(range(40)))
+        ecu.set_data_identifier(0x0100, b"\x00")
+        return ecu
+    
+    def consecutive_frames(self, ecu, **rates) -> list:
+        """Read 0xF190 with faults and return the Consecutive Frames"""
+        FaultInjector(seed=3, **rates).install(ecu)
+        ecu.process_frame(READ_VIN)
+        return ecu.process_frame(FLOW_CONTROL)
+    
+    def test_clean_frames_unchanged(self, ecu):
+        """Test zero rates leave the frame path unchanged"""
+        expected = [ecu.process_frame(READ_VIN), ecu.process_frame(FLOW_CONTROL)]
+        FaultInjector().install(ecu)
+        
+        assert [ecu.process_frame(READ_VIN), ecu.process_frame(FLOW_CONTROL)] == expected
+    
+    def test_drop(self, ecu):
+        """Test dropped Consecutive Frames"""
+        assert self.consecutive_frames(ecu, drop=1.0) == []
+        assert ecu.faults.injected["drop"] == 6
+    
+    def test_duplicate(self, ecu):
+        """Test duplicated Consecutive Frames"""
+        frames = self.consecutive_frames(ecu, duplicate=1.0)
+        
+        assert [frame[0] for frame in frames] == [0x21, 0x21, 0x22, 0x22, 0x23, 0x23,
+                                                  0x24, 0x24, 0x25, 0x25, 0x26, 0x26]
+    
+    def test_reorder(self, ecu):
+        """Test Consecutive Frames swapped in pairs"""
+        frames = self.consecutive_frames(ecu, reorder=1.0)
+        
+        assert [frame[0] for frame in frames] == [0x22, 0x21, 0x24, 0x23, 0x26, 0x25]
+    
+    def test_wrong_sequence(self, ecu):
+        """Test wrong sequence numbers keep the payload"""
+        frames = self.consecutive_frames(ecu, wrong_sequence=1.0)
+        
+        assert frames[0] == b"\x22" + bytes(range(3, 10))
+        assert [frame[0] for frame in frames] == [0x22, 0x23, 0x24, 0x25, 0x26, 0x27]
+    
+    def test_fc_wait(self, ecu):
+        """Test FC WAIT frames before the Flow Control"""
+        FaultInjector(fc_wait=1.0, wait_frames=2).install(ecu)
+        
+        assert ecu.process_frame(WRITE_FIRST_FRAME) == [b"\x31\x00\x00", b"\x31\x00\x00",
+                                                        b"\x30\x00\x00"]
+    
+    def test_fc_overflow(self, ecu):
+        """Test FC OVFLW aborts the incoming request"""
+        FaultInjector(fc_overflow=1.0).install(ecu)
+        
+        assert ecu.process_frame(WRITE_FIRST_FRAME) == [b"\x32\x00\x00"]
+        assert ecu.docan.expected_length == 0
+    
+    def test_injected_nrc(self, ecu):
+        """Test responses replaced by a negative response"""
+        FaultInjector(nrc=1.0, nrcs=(0x21,)).install(ecu)
+        
+        assert ecu.process_request(b"\x03\x22\x01\x00") == b"\x03\x7F\x22\x21"
+        assert ecu.process_frame(READ_VIN) == [b"\x03\x7F\x22\x21"]
+        assert not ecu.docan.transmitting
+    
+    def test_injected_nrc_can_fd(self):
+        """Test the service is read from CAN FD single frames with the length escape"""
+        ecu = VirtualECU("FAULT_FD_ECU", frame_size=64)
+        ecu.set_data_identifier(0x0100, bytes(20))
+        FaultInjector(nrc=1.0, nrcs=(0x21,)).install(ecu)
+        
+        assert ecu.process_frame(b"\x03\x22\x01\x00") == [b"\x03\x7F\x22\x21"]
+    
+    def test_delay(self, ecu):
+        """Test delayed responses"""
+        delays = []
+        FaultInjector(delay=1.0, response_delay=0.2, sleep=delays.append).install(ecu)
+        
+        assert ecu.process_request(b"\x03\x22\x01\x00") == b"\x04\x62\x01\x00\x00"
+        assert delays == [0.2]
+    
+    def test_process_many(self, ecu):
+        """Test batched frames go through the fault layer"""
+        FaultInjector(nrc=1.0, nrcs=(0x22,)).install(ecu)
+        out = ecu.process_many(b"\x03\x22\x01\x00\x00\x00\x00\x00" * 2)
+        
+        assert bytes(out) == b"\x03\x7F\x22\x22\x00\x00\x00\x00" * 2
+    
+    def test_reproducible_runs(self):
+        """Test two ECUs with the same seed see the same faults"""
+        def run():
+            ecu = VirtualECU("SEEDED")
+            ecu.set_data_identifier(0xF190, bytes(range(200)))
+            FaultInjector(seed=42, drop=0.1, duplicate=0.1, reorder=0.1, nrc=0.2).install(ecu)
+            frames = []
+            for _ in range(50):
+                frames += ecu.process_frame(READ_VIN)
+                frames += ecu.process_frame(FLOW_CONTROL)
+            return frames
+        
+        assert run() == run()
+    
+    def test_removed(self, ecu):
+        """Test clearing ``faults`` restores the clean frame path"""
+        FaultInjector(drop=1.0).install(ecu)
+        ecu.faults = None
+        
+        ecu.process_frame(READ_VIN)
+        assert len(ecu.process_frame(FLOW_CONTROL)) == 6
@@ -0,0 +1,147 @@
+"""Tests for streaming flash transfer services"""
+
+import zlib
+
+import pytest
+from src.flash import FlashMemory, FlashTransfer
+from src.virtual_ecu import VirtualECU
+
+
+class TestFlashTransfer:
+    """Test suite for Flash Transfer"""
+    
+    @pytest.fixture
+    def memory(self, tmp_path):
+        """Create a 64 KiB flash region at 0x8000"""
+        memory = FlashMemory(str(tmp_path / "flash.bin"), 0x10000, base_address=0x8000)
+        yield memory
+        memory.close()
+    
+    @pytest.fixture
+    def ecu(self, memory):
+        """Create ECU with transfer services installed"""
+        ecu = VirtualECU("FLASH_ECU")
+        FlashTransfer(memory, max_block_length=0x82, hash_algorithm="sha256").install(ecu)
+        return ecu
+    
+    def download(self, ecu, address: int, image: bytes, block: int = 0x80) -> list:
+        """Run a complete download and return all responses"""
+        request = bytes([0x34, 0x00, 0x44]) + address.to_bytes(4, "big")
+        responses = [ecu.process_uds_request(request + len(image).to_bytes(4, "big"))]
+        for i, offset in enumerate(range(0, len(image), block)):
+            sequence = (i + 1) & 0xFF
+            responses.append(ecu.process_uds_request(
+                bytes([0x36, sequence]) + image[offset:offset + block]))
+        responses.append(ecu.process_uds_request(b"\x37"))
+        return responses
+    
+    def test_request_download_response(self, ecu):
+        """Test RequestDownload reports maxNumberOfBlockLength"""
+        response = ecu.process_uds_request(bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x01, 0x00]))
+        
+        assert response == bytes([0x74, 0x20, 0x00, 0x82])
+    
+    def test_download_streams_to_memory(self, ecu, memory):
+        """Test a multi-block download lands in memory with matching CRC"""
+        image = bytes(i * 7 & 0xFF for i in range(1000))
+        responses = self.download(ecu, 0x8100, image)
+        
+        assert responses[1:-1] == [bytes([0x76, i + 1]) for i in range(8)]
+        assert responses[-1] == b"\x77" + zlib.crc32(image).to_bytes(4, "big")
+        assert memory.read(0x8100, len(image)) == image
+        assert ecu.flash.direction is None
+    
+    def test_block_sequence_wraps(self, ecu):
+        """Test the block sequence counter wraps from 0xFF to 0x00"""
+        image = bytes(300)
+        responses = self.download(ecu, 0x8000, image, block=1)
+        
+        assert responses[256] == bytes([0x76, 0x00])
+        assert responses[-1][0] == 0x77
+    
+    def test_repeated_block_is_not_rewritten(self, ecu):
+        """Test a repeated TransferData block is acknowledged without writing"""
+        ecu.process_uds_request(bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x00, 0x04]))
+        ecu.process_uds_request(bytes([0x36, 0x01, 0x01, 0x02]))
+        
+        assert ecu.process_uds_request(bytes([0x36, 0x01, 0x01, 0x02])) == bytes([0x76, 0x01])
+        assert ecu.flash.transferred == 2
+    
+    def test_wrong_block_sequence_counter(self, ecu):
+        """Test out-of-order blocks are rejected"""
+        ecu.process_uds_request(bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x00, 0x10]))
+        
+        response = ecu.process_uds_request(bytes([0x36, 0x02, 0x00]))
+        assert response[2] == 0x73
+    
+    def test_transfer_data_without_request(self, ecu):
+        """Test TransferData outside a transfer"""
+        assert ecu.process_uds_request(bytes([0x36, 0x01, 0x00]))[2] == 0x24
+    
+    def test_block_too_long(self, ecu):
+        """Test blocks beyond maxNumberOfBlockLength"""
+        ecu.process_uds_request(bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x01, 0x00]))
+        
+        response = ecu.process_uds_request(bytes([0x36, 0x01]) + bytes(0x81))
+        assert response[2] == 0x13
+    
+    def test_out_of_range_download(self, ecu):
+        """Test download outside the memory region"""
+        response = ecu.process_uds_request(bytes([0x34, 0x00, 0x22, 0x00, 0x00, 0x00, 0x10]))
+        
+        assert response[2] == 0x31
+    
+    def test_exit_before_complete(self, ecu):
+        """Test RequestTransferExit before all data was sent"""
+        ecu.process_uds_request(bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x00, 0x10]))
+        
+        assert ecu.process_uds_request(b"\x37")[2] == 0x24
+    
+    def test_exit_with_crc_mismatch(self, ecu):
+        """Test RequestTransferExit verifies a CRC sent by the tester"""
+        ecu.process_uds_request(bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x00, 0x02]))
+        ecu.process_uds_request(bytes([0x36, 0x01, 0xAA, 0xBB]))
+        
+        assert ecu.process_uds_request(b"\x37\x00\x00\x00\x00")[2] == 0x72
+    
+    def test_upload(self, ecu, memory):
+        """Test RequestUpload streams memory back in blocks"""
+        image = bytes(range(200))
+        memory.write(0x9000, image)
+        response = ecu.process_uds_request(bytes([0x35, 0x00, 0x22, 0x90, 0x00, 0x00, 0xC8]))
+        assert response[0] == 0x75
+        
+        first = ecu.process_uds_request(bytes([0x36, 0x01]))
+        second = ecu.process_uds_request(bytes([0x36, 0x02]))
+        
+        assert first[2:] + second[2:] == image
+        assert len(first) == 0x82
+        assert ecu.process_uds_request(b"\x37") == b"\x77" + zlib.crc32(image).to_bytes(4, "big")
+    
+    def test_transfer_over_docan(self, ecu, memory):
+        """Test a download through multi-frame DoCAN requests"""
+        image = bytes(range(100))
+        frames = ecu.docan.segment(bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x00, 0x64]))
+        assert ecu.process_request(frames[0])[1] == 0x74
+        
+        for frame in ecu.docan.segment(bytes([0x36, 0x01]) + image):
+            response = ecu.process_request(frame)
+        assert response[1:3] == bytes([0x76, 0x01])
+        assert ecu.process_request(bytes([0x01, 0x37]))[1] == 0x77
+        assert ecu.flash.digest is not None
+    
+    def test_transfer_services_not_installed(self):
+        """Test plain ECUs reject transfer services"""
+        assert VirtualECU().process_uds_request(bytes([0x36, 0x01]))[2] == 0x12
+    
+    def test_clone_drops_transfer_services(self, ecu, memory):
+        """Test a clone does not reach its template's flash"""
+        clone = ecu.clone("CLONE")
+        request = bytes([0x34, 0x00, 0x22, 0x80, 0x00, 0x00, 0x10])
+        
+        assert clone.flash is None
+        assert clone.process_uds_request(request)[2] == 0x12
+        assert ecu.flash.direction is None
+        FlashTransfer(memory).install(clone)
+        assert clone.process_uds_request(request)[0] == 0x74
+        assert ecu.flash.direction is None
@@ -0,0 +1,68 @@
+"""Tests for multi-ECU gateway"""
+
+import pytest
+from src.gateway import Gateway
+from src.virtual_ecu import VirtualECU
+
+
+class TestGateway:
+    """Test suite for Gateway"""
+    
+    @pytest.fixture
+    def gateway(self):
+        """Create gateway with three ECUs"""
+        gateway = Gateway()
+        for i in range(3):
+            ecu = VirtualECU(f"ECU_{i}")
+            ecu.set_data_identifier(0xF190, bytes([i]))
+            gateway.add_ecu(ecu, 0x7E0 + i, 0x7E8 + i)
+        return gateway
+    
+    def test_physical_routing(self, gateway):
+        """Test physical request reaches only the addressed ECU"""
+        responses = gateway.route(0x7E1, bytes([0x03, 0x22, 0xF1, 0x90]))
+        
+        assert responses == [(0x7E9, bytes([0x04, 0x62, 0xF1, 0x90, 0x01]))]
+    
+    def test_unknown_id_ignored(self, gateway):
+        """Test frames on unknown IDs are dropped"""
+        assert gateway.route(0x123, bytes([0x01, 0x3E])) == []
+    
+    def test_functional_fan_out(self, gateway):
+        """Test functional request is answered by every ECU"""
+        responses = gateway.route(0x7DF, bytes([0x03, 0x22, 0xF1, 0x90]))
+        
+        assert [response_id for response_id, _ in responses] == [0x7E8, 0x7E9, 0x7EA]
+        assert [frame[4] for _, frame in responses] == [0, 1, 2]
+    
+    def test_functional_suppresses_not_supported(self, gateway):
+        """Test unsupported functional requests get no negative response"""
+        assert gateway.route(0x7DF, bytes([0x01, 0x85])) == []
+    
+    def test_functional_ignores_multi_frame(self, gateway):
+        """Test functional first frames are dropped"""
+        frame = gateway.ecus["ECU_0"].docan.segment(bytes(20))[0]
+        assert gateway.route(0x7DF, frame) == []
+    
+    def test_duplicate_id_rejected(self, gateway):
+        """Test attaching two ECUs on the same request ID"""
+        with pytest.raises(ValueError):
+            gateway.add_ecu(VirtualECU("ECU_X"), 0x7E0, 0x7F0)
+    
+    def test_remove_ecu(self, gateway):
+        """Test detached ECU no longer receives frames"""
+        gateway.remove_ecu("ECU_1")
+        
+        assert gateway.route(0x7E1, bytes([0x01, 0x3E])) == []
+        assert len(gateway.route(0x7DF, bytes([0x01, 0x3E]))) == 2
+    
+    def test_multi_frame_response(self, gateway):
+        """Test long responses continue after the tester's flow control"""
+        gateway.ecus["ECU_2"].set_data_identifier(0xF190, bytes(20))
+        
+        first = gateway.route(0x7E2, bytes([0x03, 0x22, 0xF1, 0x90]))
+        assert first[0][1][0] == 0x10  # First frame
+        
+        rest = gateway.route(0x7E2, bytes([0x30, 0x00, 0x00]))
+        assert [frame[0] for _, frame in rest] == [0x21, 0x22, 0x23]
+        assert all(response_id == 0x7EA for response_id, _ in rest)
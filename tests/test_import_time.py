@@ -0,0 +1,58 @@
+"""Tests for the import cost of the core ECU module"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Cumulative import time of src.virtual_ecu, in microseconds (~40 ms on a
+# slow single-core runner; eagerly importing asyncio alone roughly doubles it)
+IMPORT_BUDGET_US = 75_000
+
+# Modules only transports, exporters and optional paths may pull in
+DEFERRED_MODULES = ("asyncio", "can", "concurrent.futures", "json", "numpy", "yaml",
+                    "src.client", "src.ecu_profile", "src.metrics", "src.sharding",
+                    "src.transport")
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of ``module`` in a fresh interpreter"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not in import time report")
+
+
+class TestImportTime:
+    """Test suite for the core import budget"""
+    
+    def test_deferred_modules(self):
+        """Test importing the core leaves optional modules unloaded"""
+        code = ("import sys, src.virtual_ecu; "
+                f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        
+        assert result.stdout.split() == []
+    
+    def test_import_budget(self):
+        """Test the core imports within budget (best of three)"""
+        best = min(import_time_us("src.virtual_ecu") for _ in range(3))
+        
+        assert best < IMPORT_BUDGET_US
+    
+    def test_lazy_features_still_load(self):
+        """Test metrics export and thread pools work once used"""
+        from src.virtual_ecu import VirtualECU
+        
+        ecu = VirtualECU("LAZY_ECU")
+        ecu.set_data_identifier(0x0100, b"\x01")
+        metrics = ecu.enable_metrics()
+        out = ecu.process_concurrently([(0xF1, b"\x03\x22\x01\x00")])
+        
+        assert out == {0xF1: [[b"\x04\x62\x01\x00\x01"]]}
+        assert '"0x22"' in metrics.to_json()
@@ -0,0 +1,112 @@
+"""Tests for request, NRC, latency and frame metrics"""
+
+import json
+
+import pytest
+from src.metrics import Metrics, bucket_upper_bound, latency_bucket
+from src.virtual_ecu import VirtualECU
+
+
+class TestMetrics:
+    """Test suite for Metrics"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create ECU with metrics enabled"""
+        ecu = VirtualECU("METRICS_ECU")
+        ecu.set_data_identifier(0xF190, b"WVWZZZ1JZXW000001")
+        ecu.enable_metrics()
+        return ecu
+    
+    def test_latency_buckets(self):
+        """Test every latency falls below its bucket's upper bound and above the previous"""
+        for ns in list(range(200)) + [10 ** k + d for k in range(3, 12) for d in (-1, 0, 1)]:
+            index = latency_bucket(ns)
+            assert ns < bucket_upper_bound(index)
+            assert index == 0 or ns >= bucket_upper_bound(index - 1)
+    
+    def test_request_and_nrc_counters(self, ecu):
+        """Test requests are counted per SID and NRCs per code"""
+        ecu.process_request(bytes([0x02, 0x3E, 0x00]))
+        ecu.process_request(bytes([0x02, 0x3E, 0x00]))
+        ecu.process_request(bytes([0x03, 0x22, 0x99, 0x99]))
+        ecu.process_request(bytes([0x01, 0xFF]))
+        
+        metrics = ecu.metrics
+        assert metrics.requests[0x3E] == 2
+        assert metrics.requests[0x22] == 1
+        assert metrics.nrcs[0x31] == 1
+        assert metrics.nrcs[0x12] == 1
+        assert sum(metrics.latency[0x3E]) == 2
+    
+    def test_frame_counters(self, ecu):
+        """Test frames are counted by direction and type"""
+        ecu.process_frame(bytes([0x03, 0x22, 0xF1, 0x90]))
+        ecu.process_frame(bytes([0x30, 0x00, 0x00]))
+        frames = ecu.docan.segment(bytes([0x2E, 0xF1, 0x90]) + bytes(10))
+        for frame in frames:
+            ecu.process_frame(frame)
+        
+        assert ecu.metrics.frames_received[:4] == [1, 1, 1, 1]
+        assert ecu.metrics.frames_sent[:4] == [1, 1, 2, 1]
+    
+    def test_process_many_counts(self, ecu):
+        """Test the batched fast path is instrumented too"""
+        ecu.process_many(bytes([0x02, 0x3E, 0x00, 0, 0, 0, 0, 0]) * 3)
+        
+        assert ecu.metrics.requests[0x3E] == 3
+        assert ecu.metrics.frames_received[0] == 3
+        assert ecu.metrics.frames_sent[0] == 3
+    
+    def test_disabled_by_default(self):
+        """Test ECUs do not count without metrics"""
+        ecu = VirtualECU()
+        ecu.process_request(bytes([0x02, 0x3E, 0x00]))
+        
+        assert ecu.metrics is None
+        assert ecu.docan.metrics is None
+    
+    def test_disable_metrics(self, ecu):
+        """Test counting stops once disabled"""
+        metrics = ecu.metrics
+        ecu.disable_metrics()
+        ecu.process_request(bytes([0x02, 0x3E, 0x00]))
+        
+        assert metrics.requests[0x3E] == 0
+    
+    def test_shared_metrics(self):
+        """Test several ECUs aggregate into one Metrics"""
+        metrics = Metrics()
+        ecus = [VirtualECU(f"ECU_{i}") for i in range(3)]
+        for ecu in ecus:
+            ecu.enable_metrics(metrics)
+            ecu.process_request(bytes([0x02, 0x3E, 0x00]))
+        
+        assert metrics.requests[0x3E] == 3
+    
+    def test_json_snapshot(self, ecu):
+        """Test the JSON export"""
+        ecu.process_request(bytes([0x03, 0x22, 0x99, 0x99]))
+        
+        snapshot = json.loads(ecu.metrics.to_json())
+        
+        assert snapshot["services"]["0x22"]["requests"] == 1
+        assert snapshot["services"]["0x22"]["name"] == "ReadDataByIdentifier"
+        assert snapshot["nrcs"] == {"0x31": 1}
+        assert snapshot["frames"]["received"]["SingleFrame"] == 1
+        assert 0 < snapshot["services"]["0x22"]["latency_seconds"]["p99"] < 1
+    
+    def test_prometheus_export(self, ecu):
+        """Test the Prometheus text export"""
+        ecu.process_request(bytes([0x02, 0x3E, 0x00]))
+        
+        text = ecu.metrics.to_prometheus()
+        
+        assert 'uds_requests_total{sid="0x3E",service="TesterPresent"} 1' in text
+        assert 'uds_request_duration_seconds_bucket{sid="0x3E",le="+Inf"} 1' in text
+        assert 'uds_request_duration_seconds_count{sid="0x3E"} 1' in text
+        assert 'docan_frames_total{direction="rx",type="SingleFrame"} 1' in text
+        buckets = [line for line in text.splitlines()
+                   if line.startswith("uds_request_duration_seconds_bucket")]
+        counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+        assert counts == sorted(counts)  # Cumulative
@@ -0,0 +1,121 @@
+"""Tests for memory-mapped NVM storage"""
+
+import pytest
+from src.nvm_storage import NVMImage
+from src.virtual_ecu import VirtualECU
+
+
+class TestNVMImage:
+    """Test suite for NVM Image"""
+    
+    @pytest.fixture
+    def image_path(self, tmp_path):
+        """Build an image with three DIDs and two DTCs"""
+        path = str(tmp_path / "ecu.nvm")
+        dids = {0xF190: b"VIN1234567890ABCD", 0x0102: b"\x12\x34", 0xF189: b"v1.0"}
+        image = NVMImage.build(path, dids, [(0x123456, 0x09), 0x234567],
+                               did_capacities={0xF189: 16}, dtc_capacity=4)
+        image.close()
+        return path
+    
+    def test_read_dids(self, image_path):
+        """Test DIDs are read through the mapped index"""
+        with NVMImage(image_path) as image:
+            assert len(image.dids) == 3
+            assert list(image.dids) == [0x0102, 0xF189, 0xF190]
+            assert image.dids[0xF190] == b"VIN1234567890ABCD"
+            assert image.dids.get(0x9999) is None
+            assert 0x0102 in image.dids
+    
+    def test_write_did_in_place(self, image_path):
+        """Test writes within capacity persist across reopen"""
+        with NVMImage(image_path) as image:
+            image.dids[0xF189] = b"v2.0.1-rc"
+        
+        with NVMImage(image_path) as image:
+            assert image.dids[0xF189] == b"v2.0.1-rc"
+    
+    def test_write_did_errors(self, image_path):
+        """Test writes to unknown DIDs or beyond capacity"""
+        with NVMImage(image_path) as image:
+            with pytest.raises(KeyError):
+                image.dids[0x9999] = b"\x00"
+            with pytest.raises(ValueError):
+                image.dids[0x0102] = b"\x00\x01\x02"
+    
+    def test_dtcs_persist(self, image_path):
+        """Test DTC changes are written through to the image"""
+        with NVMImage(image_path) as image:
+            assert list(image.dtcs) == [0x123456, 0x234567]
+            image.dtcs.add(0x345678, 0x04)
+            image.dtcs.clear(0x123456)
+        
+        with NVMImage(image_path) as image:
+            assert list(image.dtcs) == [0x234567, 0x345678]
+            assert image.dtcs.status_of(0x345678) == 0x04
+    
+    def test_load_dtcs(self, image_path):
+        """Test the DTC rows and status counts are rebuilt from the image"""
+        with NVMImage(image_path) as image:
+            image.dtcs.add(0x00FF01, 0x2F)
+        
+        with NVMImage(image_path) as image:
+            assert list(image.dtcs) == [0x123456, 0x234567, 0x00FF01]
+            assert 0x00FF01 in image.dtcs
+            assert image.dtcs.status_of(0x00FF01) == 0x2F
+            assert image.dtcs.count_by_status_mask(0x08) == 3
+            assert image.dtcs.count_by_status_mask(0x20) == 1
+    
+    def test_clear_dtc_group(self, image_path):
+        """Test clearing a DTC group rewrites the remaining records"""
+        with NVMImage(image_path) as image:
+            image.dtcs.add(0x123401, 0x04)
+            image.dtcs.add(0x345678, 0x04)
+            assert image.dtcs.clear(0x123400) is True
+        
+        with NVMImage(image_path) as image:
+            assert list(image.dtcs) == [0x234567, 0x345678]
+            assert image.dtcs.status_of(0x345678) == 0x04
+    
+    def test_dtc_area_full(self, image_path):
+        """Test adding beyond the reserved DTC slots"""
+        with NVMImage(image_path) as image:
+            image.dtcs.add(0x000001)
+            image.dtcs.add(0x000002)
+            with pytest.raises(ValueError):
+                image.dtcs.add(0x000003)
+    
+    def test_invalid_image(self, tmp_path):
+        """Test opening a file that is not an image"""
+        path = tmp_path / "bad.nvm"
+        path.write_bytes(bytes(64))
+        
+        with pytest.raises(ValueError):
+            NVMImage(str(path))
+    
+    def test_ecu_from_image(self, image_path):
+        """Test an ECU serves and writes DIDs through an attached image"""
+        with NVMImage(image_path) as image:
+            ecu = image.attach(VirtualECU("NVM_ECU"))
+            
+            response = ecu.process_request(bytes([0x03, 0x22, 0x01, 0x02]))
+            assert response[1:6] == bytes([0x62, 0x01, 0x02, 0x12, 0x34])
+            
+            response = ecu.process_request(bytes([0x05, 0x2E, 0x01, 0x02, 0xAB, 0xCD]))
+            assert response[1:4] == bytes([0x6E, 0x01, 0x02])
+            
+            response = ecu.process_request(bytes([0x04, 0x2E, 0x99, 0x99, 0x00]))
+            assert response[3] == 0x31  # Unknown DID
+        
+        with NVMImage(image_path) as image:
+            assert image.dids[0x0102] == b"\xAB\xCD"
+    
+    def test_from_ecu(self, tmp_path):
+        """Test building an image from a configured ECU"""
+        ecu = VirtualECU("SRC_ECU")
+        ecu.set_data_identifier(0x0102, b"\x01")
+        ecu.add_dtc(0xC0FF01, 0x08)
+        
+        with NVMImage.from_ecu(str(tmp_path / "ecu.nvm"), ecu) as image:
+            assert image.dids[0x0102] == b"\x01"
+            assert image.dtcs.status_of(0xC0FF01) == 0x08
@@ -0,0 +1,303 @@
+"""Tests for dynamically defined DIDs and periodic reads"""
+
+import asyncio
+
+import pytest
+from src.periodic import PeriodicScheduler, SlicePlan
+from src.timer_wheel import TimerWheel
+from src.transport import ECUServer, IsoTpChannel, IsoTpConfig, VirtualCANBus
+from src.virtual_ecu import VirtualECU
+
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self):
+        """Start at zero"""
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        """Current time"""
+        return self.now
+
+
+class TestDynamicDataIdentifiers:
+    """Test suite for DynamicallyDefineDataIdentifier"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create ECU with source DIDs"""
+        ecu = VirtualECU("DYN_ECU")
+        ecu.set_data_identifier(0x0100, b"\x01\x02\x03\x04")
+        ecu.set_data_identifier(0x0200, b"\xA0\xB0")
+        return ecu
+    
+    def test_define_and_read(self, ecu):
+        """Test a dynamic DID assembled from slices of two DIDs"""
+        response = ecu.process_uds_request(b"\x2C\x01\xF2\x01"
+                                           b"\x01\x00\x02\x02" b"\x02\x00\x01\x02")
+        
+        assert response == b"\x6C\x01\xF2\x01"
+        assert ecu.process_uds_request(b"\x22\xF2\x01") == b"\x62\xF2\x01\x02\x03\xA0\xB0"
+    
+    def test_record_follows_source_values(self, ecu):
+        """Test the plan copies current values on every read"""
+        ecu.process_uds_request(b"\x2C\x01\xF2\x01\x02\x00\x01\x01")
+        ecu.set_data_identifier(0x0200, b"\xFF\xEE")
+        
+        assert ecu.process_uds_request(b"\x22\xF2\x01") == b"\x62\xF2\x01\xFF"
+    
+    def test_define_appends(self, ecu):
+        """Test a second define request extends the record"""
+        ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x01\x01")
+        ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x02\x02")
+        
+        assert ecu.process_uds_request(b"\x22\xF2\x01") == b"\x62\xF2\x01\x01\x02\x03"
+        assert list(ecu.dynamic_dids.plans[0xF201].slices()) == [(0x0100, 0, 3)]  # Merged
+    
+    def test_dynamic_source(self, ecu):
+        """Test a dynamic DID defined from another one is flattened"""
+        ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x03\x02\x02\x00\x01\x02")
+        ecu.process_uds_request(b"\x2C\x01\xF2\x02\xF2\x01\x02\x02")
+        
+        assert ecu.process_uds_request(b"\x22\xF2\x02") == b"\x62\xF2\x02\x04\xA0"
+        assert {did for did, *_ in ecu.dynamic_dids.plans[0xF202].copies} == {0x0100, 0x0200}
+    
+    def test_define_errors(self, ecu):
+        """Test length and range checks"""
+        assert ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x01")[2] == 0x13
+        # Not a DDDI, unknown source, beyond the source, position 0
+        assert ecu.process_uds_request(b"\x2C\x01\x01\x00\x01\x00\x01\x01")[2] == 0x31
+        assert ecu.process_uds_request(b"\x2C\x01\xF2\x01\x09\x99\x01\x01")[2] == 0x31
+        assert ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x04\x02")[2] == 0x31
+        assert ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x00\x01")[2] == 0x31
+        assert ecu.process_uds_request(b"\x2C\x02\xF2\x01")[2] == 0x12  # By memory address
+        assert 0xF201 not in ecu.dynamic_dids
+    
+    def test_clear(self, ecu):
+        """Test clearing one and all dynamic DIDs"""
+        ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x01\x01")
+        ecu.process_uds_request(b"\x2C\x01\xF2\x02\x01\x00\x01\x01")
+        
+        assert ecu.process_uds_request(b"\x2C\x03\xF2\x01") == b"\x6C\x03\xF2\x01"
+        assert ecu.process_uds_request(b"\x22\xF2\x01")[2] == 0x31
+        assert ecu.process_uds_request(b"\x2C\x03") == b"\x6C\x03"
+        assert len(ecu.dynamic_dids.plans) == 0
+    
+    def test_suppressed_response(self, ecu):
+        """Test suppressPosRspMsgIndicationBit"""
+        assert ecu.process_uds_request(b"\x2C\x81\xF2\x01\x01\x00\x01\x01") == b""
+        assert 0xF201 in ecu.dynamic_dids
+    
+    def test_plan_zero_fills_short_sources(self):
+        """Test a source shorter than at definition time reads as zeros"""
+        plan = SlicePlan.compile([(0x0100, 1, 2), (0x0200, 0, 1)])
+        values = {0x0100: b"\x01", 0x0200: b"\x07"}
+        
+        assert plan.read(values.get) == b"\x00\x00\x07"
+
+
+class TestPeriodicScheduler:
+    """Test suite for ReadDataByPeriodicIdentifier"""
+    
+    @pytest.fixture
+    def clock(self):
+        """Create a fake clock"""
+        return FakeClock()
+    
+    @pytest.fixture
+    def wheel(self, clock):
+        """Create a fake-clock timer wheel"""
+        return TimerWheel(clock=clock)
+    
+    @pytest.fixture
+    def sent(self):
+        """Collected ``(ecu_id, message)`` pairs"""
+        return []
+    
+    @pytest.fixture
+    def scheduler(self, wheel, sent):
+        """Create scheduler collecting messages"""
+        return PeriodicScheduler(lambda ecu, message: sent.append((ecu.ecu_id, message)),
+                                 timers=wheel, slow=1.0, medium=0.1, fast=0.02)
+    
+    def make_ecu(self, scheduler, wheel, name: str) -> VirtualECU:
+        """Create ECU with a dynamic DID 0xF201 and a static DID 0xF202"""
+        ecu = VirtualECU(name, timers=wheel)
+        scheduler.install(ecu)
+        ecu.set_data_identifier(0x0100, b"\x01\x02\x03\x04")
+        ecu.set_data_identifier(0xF202, b"\x55")
+        ecu.process_uds_request(b"\x2C\x01\xF2\x01\x01\x00\x03\x02")
+        return ecu
+    
+    def test_periodic_messages(self, scheduler, wheel, clock, sent):
+        """Test messages at the requested rate"""
+        ecu = self.make_ecu(scheduler, wheel, "ECU_A")
+        
+        assert ecu.process_uds_request(b"\x2A\x03\x01\x02") == b"\x6A"
+        clock.now = 0.02
+        wheel.advance()
+        assert sent == [("ECU_A", b"\x01\x03\x04"), ("ECU_A", b"\x02\x55")]
+        
+        ecu.set_data_identifier(0x0100, b"\x01\x02\x09\x09")
+        clock.now = 0.04
+        wheel.advance()
+        assert sent[2] == ("ECU_A", b"\x01\x09\x09")
+    
+    def test_rates_share_one_timer(self, scheduler, wheel, clock, sent):
+        """Test many ECUs at one rate use a single wheel timer"""
+        ecus = [self.make_ecu(scheduler, wheel, f"ECU_{i}") for i in range(50)]
+        for ecu in ecus:
+            ecu.process_uds_request(b"\x2A\x02\x01")
+        ecus[0].process_uds_request(b"\x2A\x01\x02")
+        
+        assert len(wheel) == 2
+        clock.now = 0.1
+        wheel.advance()
+        assert len(sent) == 50
+        clock.now = 1.0
+        wheel.advance()
+        assert len(sent) == 50 * 10 + 1
+    
+    def test_change_rate_and_stop(self, scheduler, wheel, clock, sent):
+        """Test rescheduling moves an identifier and stop removes it"""
+        ecu = self.make_ecu(scheduler, wheel, "ECU_A")
+        ecu.process_uds_request(b"\x2A\x03\x01")
+        ecu.process_uds_request(b"\x2A\x01\x01")
+        assert len(scheduler) == 1
+        
+        assert ecu.process_uds_request(b"\x2A\x04\x01") == b"\x6A"
+        assert len(scheduler) == 0
+        ecu.process_uds_request(b"\x2A\x03\x01\x02")
+        ecu.process_uds_request(b"\x2A\x04")
+        assert len(scheduler) == 0
+    
+    def test_cleared_dynamic_did_stops_sending(self, scheduler, wheel, clock, sent):
+        """Test clearing a scheduled dynamic DID removes it on the next tick"""
+        ecu = self.make_ecu(scheduler, wheel, "ECU_A")
+        ecu.process_uds_request(b"\x2A\x03\x01")
+        ecu.process_uds_request(b"\x2C\x03\xF2\x01")
+        clock.now = 0.02
+        wheel.advance()
+        
+        assert sent == []
+        assert len(scheduler) == 0
+    
+    def test_failing_sink(self, wheel, clock):
+        """Test a sink exception is counted and the schedule keeps running"""
+        sent = []
+        
+        def sink(ecu, message):
+            if ecu.ecu_id == "ECU_A":
+                raise ConnectionError("channel closed")
+            sent.append(message)
+        
+        scheduler = PeriodicScheduler(sink, timers=wheel, fast=0.02)
+        for name in ("ECU_A", "ECU_B"):
+            self.make_ecu(scheduler, wheel, name).process_uds_request(b"\x2A\x03\x02")
+        for tick in (1, 2):
+            clock.now = 0.02 * tick
+            wheel.advance()
+        
+        assert sent == [b"\x02\x55", b"\x02\x55"]
+        assert scheduler.errors == 2
+        assert isinstance(scheduler.last_error, ConnectionError)
+        assert len(wheel) == 1
+    
+    def test_errors(self, scheduler, wheel):
+        """Test request validation"""
+        ecu = self.make_ecu(scheduler, wheel, "ECU_A")
+        
+        assert ecu.process_uds_request(b"\x2A")[2] == 0x13
+        assert ecu.process_uds_request(b"\x2A\x03")[2] == 0x13
+        assert ecu.process_uds_request(b"\x2A\x05\x01")[2] == 0x31
+        assert ecu.process_uds_request(b"\x2A\x03\x01\x09")[2] == 0x31  # 0xF209 undefined
+        assert len(scheduler) == 0
+    
+    def test_not_installed(self):
+        """Test 0x2A is unsupported without a scheduler"""
+        assert VirtualECU("PLAIN").process_uds_request(b"\x2A\x03\x01")[2] == 0x12
+    
+    def test_streams_over_transport(self):
+        """Test periodic messages reach the tester through ECUServer"""
+        async def scenario():
+            bus = VirtualCANBus()
+            async with ECUServer(bus) as server:
+                ecu = VirtualECU("STREAM_ECU")
+                PeriodicScheduler(server.send_periodic, fast=0.01).install(ecu)
+                ecu.set_data_identifier(0xF201, b"\x42")
+                server.add_ecu(ecu, 0x7E0, 0x7E8)
+                tester = IsoTpChannel(bus, 0x7E8, 0x7E0)
+                assert await tester.request(b"\x2A\x03\x01", timeout=1) == b"\x6A"
+                messages = [await tester.recv(timeout=1) for _ in range(3)]
+                await tester.request(b"\x2A\x04", timeout=1)
+                return messages
+        
+        assert asyncio.run(scenario()) == [b"\x01\x42"] * 3
+    
+    def test_stream_with_handler_thread(self):
+        """Test periodic messages keep flowing when requests advance the wheel off the loop"""
+        async def scenario():
+            bus = VirtualCANBus()
+            async with ECUServer(bus, handler_thread=True) as server:
+                ecu = VirtualECU("STREAM_ECU")
+                scheduler = PeriodicScheduler(server.send_periodic, fast=0.01).install(ecu)
+                ecu.set_data_identifier(0xF201, b"\x42")
+                server.add_ecu(ecu, 0x7E0, 0x7E8)
+                tester = IsoTpChannel(bus, 0x7E8, 0x7E0)
+                assert await tester.request(b"\x2A\x03\x01", timeout=1) == b"\x6A"
+                received = 0
+                for _ in range(20):
+                    await asyncio.sleep(0.01)
+                    await tester.send(b"\x3E\x00")
+                    while (await tester.recv(timeout=1)) != b"\x7E\x00":
+                        received += 1
+                await tester.request(b"\x2A\x04", timeout=1)
+                return received, scheduler.errors
+        
+        received, errors = asyncio.run(scenario())
+        assert errors == 0
+        assert received >= 10
+    
+    def test_multi_frame_stream_with_requests(self):
+        """Test multi-frame periodic messages interleaved with multi-frame responses"""
+        async def scenario():
+            bus = VirtualCANBus()
+            async with ECUServer(bus) as server:
+                ecu = VirtualECU("STREAM_ECU")
+                PeriodicScheduler(server.send_periodic, fast=0.01).install(ecu)
+                ecu.set_data_identifier(0xF201, bytes(range(20)))
+                ecu.set_data_identifier(0x0100, bytes(range(30)))
+                server.add_ecu(ecu, 0x7E0, 0x7E8)
+                tester = IsoTpChannel(bus, 0x7E8, 0x7E0)
+                assert await tester.request(b"\x2A\x03\x01", timeout=1) == b"\x6A"
+                messages = []
+                for _ in range(5):
+                    await tester.send(b"\x22\x01\x00")
+                    while True:
+                        message = await tester.recv(timeout=1)
+                        messages.append(message)
+                        if message[0] == 0x62:
+                            break
+                await tester.request(b"\x2A\x04", timeout=1)
+                return messages, server.periodic_errors
+        
+        messages, errors = asyncio.run(scenario())
+        assert messages.count(b"\x62\x01\x00" + bytes(range(30))) == 5
+        assert set(messages) <= {b"\x62\x01\x00" + bytes(range(30)), b"\x01" + bytes(range(20))}
+        assert errors == 0
+    
+    def test_failed_send_counted(self):
+        """Test a periodic message nobody acknowledges is counted as an error"""
+        async def scenario():
+            bus = VirtualCANBus()
+            async with ECUServer(bus, IsoTpConfig(n_bs=0.01)) as server:
+                ecu = VirtualECU("STREAM_ECU")
+                server.add_ecu(ecu, 0x7E0, 0x7E8)
+                server.send_periodic(ecu, b"\x01" + bytes(20))
+                await asyncio.sleep(0.05)
+                return server.periodic_errors, server.last_periodic_error
+        
+        errors, last_error = asyncio.run(scenario())
+        assert errors == 1
+        assert "N_Bs" in str(last_error)
@@ -0,0 +1,106 @@
+"""Tests for the read-service response cache"""
+
+import pytest
+from src.response_cache import ResponseCache
+from src.virtual_ecu import VirtualECU
+
+READ_DID = b"\x03\x22\x01\x00"
+READ_DTCS = b"\x03\x19\x02\xFF"
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create ECU with the response cache enabled"""
+        ecu = VirtualECU("CACHED_ECU")
+        ecu.set_data_identifier(0x0100, b"\x12\x34")
+        ecu.add_dtc(0x123456, 0x09)
+        ecu.enable_response_cache(capacity=4)
+        return ecu
+    
+    def test_hit(self, ecu):
+        """Test a repeated read is answered from the cache"""
+        first = ecu.process_request(READ_DID)
+        
+        assert ecu.process_request(READ_DID) == first == b"\x05\x62\x01\x00\x12\x34"
+        assert (ecu.response_cache.hits, ecu.response_cache.misses) == (1, 1)
+        assert ecu.response_cache.hit_ratio == 0.5
+    
+    def test_write_invalidates(self, ecu):
+        """Test DID writes and DTC changes are never served stale"""
+        ecu.process_request(READ_DID)
+        ecu.process_request(READ_DTCS)
+        
+        ecu.process_request(b"\x05\x2E\x01\x00\xAB\xCD")
+        assert ecu.process_request(READ_DID) == b"\x05\x62\x01\x00\xAB\xCD"
+        
+        ecu.process_request(b"\x04\x14\xFF\xFF\xFF")
+        assert ecu.process_request(READ_DTCS) == b"\x03\x59\x02\xFF"
+        assert ecu.response_cache.hits == 0
+    
+    def test_session_in_key(self, ecu):
+        """Test responses depending on the session are cached per session"""
+        ecu.process_request(READ_DID)
+        ecu.process_request(b"\x02\x10\x03")
+        
+        ecu.process_request(READ_DID)
+        assert ecu.response_cache.hits == 0
+    
+    def test_other_services_bypass(self, ecu):
+        """Test non-read services are not cached"""
+        ecu.process_request(b"\x02\x3E\x00")
+        ecu.process_request(b"\x02\x3E\x00")
+        
+        assert len(ecu.response_cache) == 0
+    
+    def test_lru_eviction(self, ecu):
+        """Test least recently used entries are evicted"""
+        for did in range(6):
+            ecu.set_data_identifier(0x0200 + did, bytes([did]))
+        ecu.process_request(b"\x03\x22\x02\x00")
+        for did in range(1, 5):
+            ecu.process_request(bytes([0x03, 0x22, 0x02, did]))
+        
+        assert len(ecu.response_cache) == 4
+        ecu.process_request(b"\x03\x22\x02\x04")
+        ecu.process_request(b"\x03\x22\x02\x00")
+        assert ecu.response_cache.hits == 1
+    
+    def test_process_many(self, ecu):
+        """Test the batched frame path uses the cache"""
+        out = ecu.process_many(READ_DID + b"\x00" * 4 + READ_DID + b"\x00" * 4)
+        
+        assert bytes(out[:8]) == bytes(out[8:])
+        assert ecu.response_cache.hits == 1
+    
+    def test_channels_share_cache(self, ecu):
+        """Test tester channels share the ECU's cache"""
+        ecu.process_request(READ_DID)
+        ecu.channel(0xF1).process_frame(READ_DID)
+        
+        assert ecu.response_cache.hits == 1
+    
+    def test_metrics(self, ecu):
+        """Test hit ratio reported in metrics"""
+        ecu.enable_metrics()
+        for _ in range(4):
+            ecu.process_request(READ_DID)
+        
+        cache = ecu.metrics.snapshot()["services"]["0x22"]["response_cache"]
+        assert cache == {"hits": 3, "misses": 1, "hit_ratio": 0.75}
+        assert 'uds_response_cache_lookups_total{sid="0x22",result="hit"} 3' in \
+            ecu.metrics.to_prometheus()
+    
+    def test_disabled(self, ecu):
+        """Test disabling the cache"""
+        ecu.disable_response_cache()
+        
+        assert ecu.process_request(READ_DID) == b"\x05\x62\x01\x00\x12\x34"
+        assert ecu.response_cache is None
+    
+    def test_invalid_capacity(self):
+        """Test zero capacity is rejected"""
+        with pytest.raises(ValueError):
+            ResponseCache(0)
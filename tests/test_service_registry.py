@@ -0,0 +1,84 @@
+"""Tests for UDS service dispatch table"""
+
+import pytest
+from src.service_registry import ServiceRegistry
+
+
+class TestServiceRegistry:
+    """Test suite for Service Registry"""
+    
+    @pytest.fixture
+    def registry(self):
+        """Create Service Registry instance"""
+        return ServiceRegistry()
+    
+    def test_registry_initialization(self, registry):
+        """Test registry starts empty"""
+        assert len(registry.handlers) == 256
+        assert registry.supported_services() == []
+    
+    def test_register_service(self, registry):
+        """Test registering a service-level handler"""
+        @registry.register(0x3E)
+        def tester_present(ecu, payload):
+            return b"\x7E"
+        
+        assert registry.lookup(0x3E, b"") is tester_present
+        assert registry.supported_services() == [0x3E]
+    
+    def test_register_subfunction(self, registry):
+        """Test sub-function handlers are selected by first payload byte"""
+        @registry.register(0x19, 0x02)
+        def report_dtc(ecu, payload):
+            return b"\x59\x02"
+        
+        assert registry.lookup(0x19, b"\x02\xFF") is report_dtc
+        assert registry.lookup(0x19, b"\x82\xFF") is report_dtc  # Suppress bit set
+        assert registry.lookup(0x19, b"\x01") is None
+        assert registry.lookup(0x19, b"") is None
+    
+    def test_subfunction_falls_back_to_service(self, registry):
+        """Test service handler is used for unregistered sub-functions"""
+        registry.register(0x31)(lambda ecu, payload: b"\x71")
+        registry.register(0x31, 0x01)(lambda ecu, payload: b"\x71\x01")
+        
+        assert registry.lookup(0x31, b"\x03")(None, b"") == b"\x71"
+        assert registry.lookup(0x31, b"\x01")(None, b"") == b"\x71\x01"
+    
+    def test_register_invalid_service_id(self, registry):
+        """Test registering out-of-range service ID"""
+        with pytest.raises(ValueError):
+            registry.register(0x100)
+    
+    def test_copy_is_independent(self, registry):
+        """Test copied registry does not share tables"""
+        registry.register(0x19, 0x01)(lambda ecu, payload: b"")
+        clone = registry.copy()
+        clone.register(0x19, 0x02)(lambda ecu, payload: b"")
+        clone.register(0x3E)(lambda ecu, payload: b"")
+        
+        assert registry.lookup(0x19, b"\x02") is None
+        assert registry.lookup(0x3E, b"") is None
+        assert clone.lookup(0x19, b"\x01") is not None
+    
+    def test_original_changes_after_copy(self, registry):
+        """Test registering on the original does not leak into a copy"""
+        registry.register(0x22)(lambda ecu, payload: b"\x62")
+        clone = registry.copy()
+        assert clone.handlers is registry.handlers  # Shared until written
+        
+        registry.register(0x2E)(lambda ecu, payload: b"\x6E")
+        registry.unregister(0x22)
+        
+        assert clone.lookup(0x2E, b"") is None
+        assert clone.lookup(0x22, b"") is not None
+        assert registry.lookup(0x22, b"") is None
+    
+    def test_unregister(self, registry):
+        """Test removing a service with sub-functions"""
+        registry.register(0x19, 0x01)(lambda ecu, payload: b"")
+        registry.unregister(0x19)
+        registry.unregister(0x85)  # Not registered: no-op
+        
+        assert registry.lookup(0x19, b"\x01") is None
+        assert 0x19 not in registry.supported_services()
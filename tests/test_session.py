@@ -0,0 +1,141 @@
+"""Tests for the diagnostic session and SecurityAccess state machine"""
+
+import time
+
+import pytest
+from src.session import default_key
+from src.timer_wheel import TimerWheel
+from src.virtual_ecu import VirtualECU
+
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self):
+        """Start at zero"""
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        """Current time"""
+        return self.now
+
+
+class TestDiagnosticSession:
+    """Test suite for Diagnostic Session"""
+    
+    @pytest.fixture
+    def clock(self):
+        """Create a fake clock"""
+        return FakeClock()
+    
+    @pytest.fixture
+    def ecu(self, clock):
+        """Create ECU driven by a fake-clock timer wheel"""
+        return VirtualECU("SESSION_ECU", timers=TimerWheel(clock=clock))
+    
+    def unlock(self, ecu, level: int = 1) -> bytes:
+        """Run requestSeed / sendKey with the correct key"""
+        seed = ecu.process_uds_request(bytes([0x27, 2 * level - 1]))[2:]
+        return ecu.process_uds_request(bytes([0x27, 2 * level]) + default_key(seed, level))
+    
+    def test_session_control_response(self, ecu):
+        """Test the response carries P2 and P2* timing"""
+        response = ecu.process_uds_request(bytes([0x10, 0x03]))
+        
+        assert response == bytes([0x50, 0x03, 0x00, 0x32, 0x01, 0xF4])
+        assert ecu.uds.session_active is True
+    
+    def test_unsupported_session(self, ecu):
+        """Test unknown session types are rejected"""
+        assert ecu.process_uds_request(bytes([0x10, 0x42]))[2] == 0x12
+    
+    def test_s3_timeout_returns_to_default(self, ecu, clock):
+        """Test the session falls back to default without requests"""
+        ecu.process_uds_request(bytes([0x10, 0x03]))
+        clock.now = 5.1
+        ecu.session.timers.advance()
+        
+        assert ecu.session.session == 0x01
+        assert ecu.uds.session_active is False
+    
+    def test_tester_present_keeps_session(self, ecu, clock):
+        """Test TesterPresent restarts S3"""
+        ecu.process_uds_request(bytes([0x10, 0x03]))
+        for second in range(1, 20):
+            clock.now = float(second)
+            assert ecu.process_uds_request(bytes([0x3E, 0x80])) == b""  # Suppressed
+        
+        assert ecu.session.session == 0x03
+        clock.now = 25.0
+        ecu.session.timers.advance()
+        assert ecu.session.session == 0x01
+    
+    def test_security_access_unlock(self, ecu):
+        """Test requestSeed / sendKey unlocks the level"""
+        ecu.process_uds_request(bytes([0x10, 0x03]))
+        
+        assert self.unlock(ecu) == bytes([0x67, 0x02])
+        assert ecu.uds.security_unlocked is True
+        assert ecu.process_uds_request(bytes([0x27, 0x01])) == bytes([0x67, 0x01, 0, 0, 0, 0])
+    
+    def test_security_access_in_default_session(self, ecu):
+        """Test SecurityAccess is not available in the default session"""
+        assert ecu.process_uds_request(bytes([0x27, 0x01]))[2] == 0x7F
+    
+    def test_send_key_without_seed(self, ecu):
+        """Test sendKey before requestSeed"""
+        ecu.process_uds_request(bytes([0x10, 0x03]))
+        
+        assert ecu.process_uds_request(bytes([0x27, 0x02, 0, 0, 0, 0]))[2] == 0x24
+    
+    def test_security_lockout(self, ecu, clock):
+        """Test invalid keys lock SecurityAccess for the security delay"""
+        ecu.process_uds_request(bytes([0x10, 0x03]))
+        nrcs = []
+        for _ in range(3):
+            ecu.process_uds_request(bytes([0x27, 0x01]))
+            nrcs.append(ecu.process_uds_request(bytes([0x27, 0x02, 0, 0, 0, 0]))[2])
+        
+        assert nrcs == [0x35, 0x35, 0x36]
+        assert ecu.process_uds_request(bytes([0x27, 0x01]))[2] == 0x37
+        
+        clock.now = 4.0
+        ecu.process_uds_request(bytes([0x3E, 0x00]))
+        clock.now = 8.0
+        ecu.process_uds_request(bytes([0x3E, 0x00]))
+        clock.now = 10.5
+        assert self.unlock(ecu) == bytes([0x67, 0x02])
+    
+    def test_session_change_relocks(self, ecu):
+        """Test a session transition relocks security"""
+        ecu.process_uds_request(bytes([0x10, 0x03]))
+        self.unlock(ecu)
+        ecu.process_uds_request(bytes([0x10, 0x02]))
+        
+        assert ecu.session.security_level == 0
+        assert ecu.uds.security_unlocked is False
+    
+    def test_response_pending(self, ecu):
+        """Test slow services are preceded by NRC 0x78"""
+        @ecu.services.register(0x31)
+        def slow_routine(ecu, payload):
+            time.sleep(0.02)
+            return bytes([0x71]) + payload
+        ecu.session.p2_server = 0.01
+        
+        frames = ecu.process_frame(bytes([0x04, 0x31, 0x01, 0xFF, 0x00]))
+        
+        assert frames == [bytes([0x03, 0x7F, 0x31, 0x78]), bytes([0x04, 0x71, 0x01, 0xFF, 0x00])]
+    
+    def test_shared_wheel_for_fleet(self):
+        """Test many ECUs share one wheel with one timer each"""
+        clock = FakeClock()
+        wheel = TimerWheel(clock=clock)
+        ecus = [VirtualECU(f"ECU_{i}", timers=wheel) for i in range(1000)]
+        for ecu in ecus:
+            ecu.process_uds_request(bytes([0x10, 0x03]))
+        
+        assert len(wheel) == 1000
+        clock.now = 6.0
+        assert wheel.advance() == 1000
+        assert all(ecu.session.session == 0x01 for ecu in ecus)
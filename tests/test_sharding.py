@@ -0,0 +1,55 @@
+"""Tests for process-pool sharded runtime"""
+
+import pytest
+from src.sharding import ShardedRuntime, shard_for
+from src.virtual_ecu import VirtualECU
+
+
+def make_ecu(ecu_id: str) -> VirtualECU:
+    """Create an ECU whose DID 0xF190 holds its numeric suffix"""
+    ecu = VirtualECU(ecu_id)
+    ecu.set_data_identifier(0xF190, bytes([int(ecu_id.split("_")[1])]))
+    return ecu
+
+
+class TestShardedRuntime:
+    """Test suite for Sharded Runtime"""
+    
+    @pytest.fixture
+    def ecu_ids(self):
+        """ECU IDs for an 8-ECU fleet"""
+        return [f"ECU_{i}" for i in range(8)]
+    
+    def test_shard_for_is_stable(self):
+        """Test shard assignment is deterministic and in range"""
+        assert shard_for("ECU_1", 4) == shard_for("ECU_1", 4)
+        assert all(0 <= shard_for(f"ECU_{i}", 3) < 3 for i in range(100))
+    
+    def test_partition_covers_all_ecus(self, ecu_ids):
+        """Test every ECU is assigned to exactly one worker"""
+        runtime = ShardedRuntime(ecu_ids, make_ecu, workers=3)
+        
+        assert sorted(sum(runtime._shards, [])) == sorted(ecu_ids)
+    
+    def test_process_preserves_order(self, ecu_ids):
+        """Test responses come back in input order across workers and chunks"""
+        frame = bytes([0x03, 0x22, 0xF1, 0x90]).ljust(8, b"\x00")
+        targets = [ecu_ids[i % len(ecu_ids)] for i in range(50)]
+        
+        with ShardedRuntime(ecu_ids, make_ecu, workers=2, batch_size=16) as runtime:
+            out = runtime.process(targets, frame * len(targets))
+        
+        for i, ecu_id in enumerate(targets):
+            expected = make_ecu(ecu_id).process_request(frame).ljust(8, b"\x00")
+            assert out[i * 8:i * 8 + 8] == expected
+    
+    def test_process_unknown_ecu(self, ecu_ids):
+        """Test frames for unknown ECUs are rejected"""
+        with ShardedRuntime(ecu_ids, make_ecu, workers=1) as runtime:
+            with pytest.raises(ValueError):
+                runtime.process(["ECU_99"], bytes(8))
+    
+    def test_process_requires_start(self, ecu_ids):
+        """Test processing before start"""
+        with pytest.raises(RuntimeError):
+            ShardedRuntime(ecu_ids, make_ecu, workers=1).process([], b"")
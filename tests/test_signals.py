@@ -0,0 +1,205 @@
+"""Tests for lazy DID providers and signal generators"""
+
+import pytest
+from src.periodic import PeriodicScheduler
+from src.signals import CsvColumn, DataProviders, Ramp, Sine
+from src.timer_wheel import TimerWheel
+from src.virtual_ecu import VirtualECU
+
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self):
+        """Start at zero"""
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        """Current time"""
+        return self.now
+
+
+class TestSignals:
+    """Test suite for signal generators"""
+    
+    def test_sine(self):
+        """Test sine wave values"""
+        wave = Sine(amplitude=2.0, period=4.0, offset=10.0)
+        
+        assert wave(0.0) == 10.0
+        assert wave(1.0) == pytest.approx(12.0)
+        assert wave(3.0) == pytest.approx(8.0)
+    
+    def test_ramp(self):
+        """Test open and restarting ramps"""
+        assert Ramp(start=100.0, rate=0.5)(10.0) == 105.0
+        sawtooth = Ramp(start=0.0, rate=10.0, stop=50.0)
+        assert sawtooth(4.0) == 40.0
+        assert sawtooth(6.0) == 10.0
+    
+    def test_ramp_never_stops(self):
+        """Test a ramp heading away from stop is rejected"""
+        with pytest.raises(ValueError):
+            Ramp(start=10.0, rate=-1.0, stop=20.0)
+    
+    def test_csv_column(self, tmp_path):
+        """Test replaying a timestamped CSV column"""
+        path = tmp_path / "trace.csv"
+        path.write_text("time,rpm,speed\n5.0,800,0\n5.5,1200,3\n6.5,2000,9\n")
+        rpm = CsvColumn(str(path), "rpm", time_column="time", interval=0.5)
+        
+        assert [rpm(t) for t in (0.0, 0.4, 0.5, 1.4, 1.5)] == [800, 800, 1200, 1200, 2000]
+        assert rpm(2.0) == 800  # Looped after 1.5 + 0.5 seconds
+        assert CsvColumn(str(path), "speed", interval=1.0, loop=False)(10.0) == 9
+    
+    def test_sample(self, tmp_path):
+        """Test batch sampling matches the per-call values"""
+        path = tmp_path / "trace.csv"
+        path.write_text("time,rpm\n0.0,800\n0.3,1200\n0.9,2000\n")
+        times = [i * 0.07 for i in range(100)]
+        generators = [Sine(amplitude=2.0, period=4.0, offset=10.0, phase=0.5),
+                      Ramp(start=100.0, rate=0.5), Ramp(start=0.0, rate=10.0, stop=50.0),
+                      CsvColumn(str(path), "rpm", time_column="time"),
+                      CsvColumn(str(path), "rpm", time_column="time", loop=False)]
+        
+        for generator in generators:
+            assert generator.sample(times) == [generator(t) for t in times]
+    
+    def test_csv_missing_column(self, tmp_path):
+        """Test an unknown column is rejected"""
+        path = tmp_path / "trace.csv"
+        path.write_text("time,rpm\n0,800\n")
+        
+        with pytest.raises(ValueError):
+            CsvColumn(str(path), "voltage")
+
+
+class TestDataProviders:
+    """Test suite for DataProviders"""
+    
+    @pytest.fixture
+    def clock(self):
+        """Create fake clock"""
+        return FakeClock()
+    
+    @pytest.fixture
+    def ecu(self, clock):
+        """Create ECU with an RPM sawtooth on 0x0C00 and a static DID"""
+        ecu = VirtualECU("LIVE_ECU")
+        ecu.set_data_identifier(0x0100, b"\x12\x34")
+        signals = DataProviders(clock).install(ecu)
+        signals.register(0x0C00, Ramp(rate=1000.0, stop=8000.0), "uint16", scale=0.25)
+        return ecu
+    
+    def test_lazy_read(self, ecu, clock):
+        """Test a provided DID is computed when read"""
+        assert ecu.process_request(b"\x03\x22\x0C\x00") == b"\x05\x62\x0C\x00\x00\x00"
+        clock.now = 2.0
+        assert ecu.process_request(b"\x03\x22\x0C\x00") == b"\x05\x62\x0C\x00\x1F\x40"
+    
+    def test_only_called_on_read(self, clock):
+        """Test providers are not called without reads"""
+        calls = []
+        ecu = VirtualECU("LIVE_ECU")
+        DataProviders(clock).install(ecu).register(0x0200, lambda t: calls.append(t) or b"\x01")
+        
+        clock.now = 5.0
+        assert calls == []
+        ecu.process_request(b"\x03\x22\x02\x00")
+        assert calls == [5.0]
+    
+    def test_mixed_read(self, ecu, clock):
+        """Test provided and static DIDs in one request"""
+        clock.now = 0.001
+        
+        assert ecu.process_uds_request(b"\x22\x01\x00\x0C\x00") == \
+            b"\x62\x01\x00\x12\x34\x0C\x00\x00\x04"
+    
+    def test_ttl(self, ecu, clock):
+        """Test a TTL reuses the computed value"""
+        calls = []
+        ecu.signals.register(0x0200, lambda t: calls.append(t) or bytes([int(t)]), ttl=1.0)
+        
+        for now in (0.0, 0.5, 0.9, 1.0, 1.5):
+            clock.now = now
+            ecu.process_request(b"\x03\x22\x02\x00")
+        assert calls == [0.0, 1.0]
+    
+    def test_saturation(self, ecu):
+        """Test numeric values are saturated to the encoding"""
+        ecu.signals.register(0x0300, lambda t: -5.0, "uint8")
+        ecu.signals.register(0x0301, lambda t: 1e6, "int16")
+        
+        assert ecu.process_request(b"\x03\x22\x03\x00") == b"\x04\x62\x03\x00\x00"
+        assert ecu.process_request(b"\x03\x22\x03\x01") == b"\x05\x62\x03\x01\x7F\xFF"
+    
+    def test_invalid_registration(self, ecu):
+        """Test unknown encodings and numbers without an encoding"""
+        with pytest.raises(ValueError):
+            ecu.signals.register(0x0300, Sine(), "float64")
+        ecu.signals.register(0x0300, Sine())
+        with pytest.raises(TypeError):
+            ecu.signals.read(0x0300)
+    
+    def test_not_cached(self, ecu, clock):
+        """Test responses with provided DIDs bypass the response cache"""
+        ecu.enable_response_cache()
+        ecu.process_request(b"\x03\x22\x0C\x00")
+        clock.now = 1.0
+        
+        assert ecu.process_request(b"\x03\x22\x0C\x00") == b"\x05\x62\x0C\x00\x0F\xA0"
+        ecu.process_request(b"\x03\x22\x01\x00")
+        ecu.process_request(b"\x03\x22\x01\x00")
+        assert (ecu.response_cache.hits, len(ecu.response_cache)) == (1, 1)
+    
+    def test_register_invalidates_cache(self, ecu):
+        """Test (un)registering a provider is not hidden by cached responses"""
+        ecu.enable_response_cache()
+        ecu.process_request(b"\x03\x22\x01\x00")
+        ecu.process_request(b"\x03\x22\x02\x00")
+        
+        ecu.signals.register(0x0100, lambda t: b"\x99")
+        ecu.signals.register(0x0200, lambda t: b"\x42")
+        assert ecu.process_request(b"\x03\x22\x01\x00") == b"\x04\x62\x01\x00\x99"
+        assert ecu.process_request(b"\x03\x22\x02\x00") == b"\x04\x62\x02\x00\x42"
+        
+        ecu.signals.unregister(0x0100)
+        assert ecu.process_request(b"\x03\x22\x01\x00") == b"\x05\x62\x01\x00\x12\x34"
+    
+    def test_install_invalidates_cache(self, clock):
+        """Test installing providers on an ECU with cached responses"""
+        ecu = VirtualECU("LATE_ECU")
+        ecu.enable_response_cache()
+        signals = DataProviders(clock).register(0x0200, lambda t: b"\x42")
+        assert ecu.process_request(b"\x03\x22\x02\x00") == b"\x03\x7F\x00\x31"
+        
+        signals.install(ecu)
+        assert ecu.process_request(b"\x03\x22\x02\x00") == b"\x04\x62\x02\x00\x42"
+    
+    def test_dynamic_did_source(self, ecu, clock):
+        """Test a dynamic DID built from a provided DID"""
+        ecu.process_uds_request(b"\x2C\x01\xF2\x01\x0C\x00\x01\x02")
+        clock.now = 1.0
+        
+        assert ecu.process_request(b"\x03\x22\xF2\x01") == b"\x05\x62\xF2\x01\x0F\xA0"
+    
+    def test_periodic_read(self, ecu, clock):
+        """Test periodic reads of a provided DID"""
+        messages = []
+        wheel = TimerWheel(tick=0.01, clock=clock)
+        PeriodicScheduler(lambda ecu, message: messages.append(message), wheel,
+                          fast=0.5).install(ecu)
+        ecu.signals.register(0xF210, Ramp(rate=2.0), "uint8")
+        
+        assert ecu.process_uds_request(b"\x2A\x03\x10") == b"\x6A"
+        for now in (0.5, 1.0):
+            clock.now = now
+            wheel.advance()
+        assert messages == [b"\x10\x01", b"\x10\x02"]
+    
+    def test_channels(self, ecu, clock):
+        """Test tester channels read the ECU's providers"""
+        clock.now = 1.0
+        
+        assert ecu.channel(0xF1).process_request(b"\x03\x22\x0C\x00") == \
+            b"\x05\x62\x0C\x00\x0F\xA0"
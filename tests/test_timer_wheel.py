@@ -0,0 +1,102 @@
+"""Tests for the hierarchical timer wheel"""
+
+import pytest
+from src.timer_wheel import TimerWheel
+
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self):
+        """Start at zero"""
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        """Current time"""
+        return self.now
+
+
+class TestTimerWheel:
+    """Test suite for Timer Wheel"""
+    
+    @pytest.fixture
+    def clock(self):
+        """Create a fake clock"""
+        return FakeClock()
+    
+    @pytest.fixture
+    def wheel(self, clock):
+        """Create a 10 ms wheel with small levels to exercise cascading"""
+        return TimerWheel(tick=0.01, slots=8, levels=3, clock=clock)
+    
+    def test_fires_after_delay(self, wheel):
+        """Test a timer fires once its delay has passed"""
+        fired = []
+        wheel.schedule(0.05, fired.append, "a")
+        
+        assert wheel.advance(0.04) == 0
+        assert wheel.advance(0.05) == 1
+        assert fired == ["a"]
+        assert len(wheel) == 0
+    
+    def test_cascades_across_levels(self, wheel):
+        """Test timers on coarser levels fire at their exact tick"""
+        fired = []
+        for delay in (0.07, 0.09, 0.63, 0.64, 3.0, 7.5):
+            wheel.schedule(delay, lambda d=delay: fired.append((d, wheel.time)))
+        
+        wheel.advance(10.0)
+        
+        assert [d for d, _ in fired] == [0.07, 0.09, 0.63, 0.64, 3.0, 7.5]
+        assert all(abs(d - t) < 1e-9 for d, t in fired)
+    
+    def test_beyond_wheel_range(self, wheel):
+        """Test timers longer than the wheel's range are re-inserted until due"""
+        fired = []
+        wheel.schedule(12.0, fired.append, 1)  # Range is 8**3 ticks = 5.12 s
+        
+        wheel.advance(11.99)
+        assert fired == []
+        wheel.advance(12.0)
+        assert fired == [1]
+    
+    def test_cancel(self, wheel):
+        """Test cancelled timers do not fire"""
+        fired = []
+        timer = wheel.schedule(0.1, fired.append, 1)
+        timer.cancel()
+        
+        wheel.advance(1.0)
+        
+        assert fired == []
+        assert len(wheel) == 0
+    
+    def test_advance_uses_clock(self, wheel, clock):
+        """Test advancing to the clock's time"""
+        fired = []
+        wheel.schedule(1.0, fired.append, 1)
+        clock.now = 2.0
+        
+        wheel.advance()
+        
+        assert fired == [1]
+        assert wheel.time == pytest.approx(2.0)
+    
+    def test_callback_can_reschedule(self, wheel):
+        """Test a callback scheduling a new timer while the wheel advances"""
+        fired = []
+        
+        def periodic():
+            fired.append(wheel.time)
+            if len(fired) < 3:
+                wheel.schedule(0.5, periodic)
+        
+        wheel.schedule(0.5, periodic)
+        wheel.advance(5.0)
+        
+        assert fired == pytest.approx([0.5, 1.0, 1.5])
+    
+    def test_invalid_slot_count(self):
+        """Test slots per level must be a power of two"""
+        with pytest.raises(ValueError):
+            TimerWheel(slots=10)
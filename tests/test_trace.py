@@ -0,0 +1,132 @@
+"""Tests for CAN trace replay and recording"""
+
+import pytest
+from src.gateway import Gateway
+from src.trace import (TraceFrame, TracePlayer, TraceRecorder, diff_recordings, read_asc,
+                       read_candump, read_recording, read_trace)
+from src.virtual_ecu import VirtualECU
+
+CANDUMP = """\
+(1700000000.000000) vcan0 7E0#0322F190
+(1700000000.010000) vcan0 7E8#100B62F190574D57
+(1700000000.020000) vcan0 7E0#300000
+(1700000000.030000) vcan0 7E0#R
+(1700000000.040000) vcan0 7E0#023E00
+"""
+
+ASC = """\
+date Wed Nov 15 10:00:00 am 2023
+base hex  timestamps absolute
+internal events logged
+Begin Triggerblock Wed Nov 15 10:00:00 am 2023
+   0.000000 Start of measurement
+   0.100000 1  7E0             Rx   d 4 03 22 F1 90
+   0.200000 1  18DA10F1x       Rx   d 2 01 3E
+   0.300000 1  ErrorFrame
+End TriggerBlock
+"""
+
+
+class TestTrace:
+    """Test suite for Trace replay"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create ECU with a VIN"""
+        ecu = VirtualECU("TRACE_ECU")
+        ecu.set_data_identifier(0xF190, b"WVWZZZ1JZXW000001")
+        return ecu
+    
+    @pytest.fixture
+    def candump(self, tmp_path):
+        """Write a candump log"""
+        path = tmp_path / "trace.log"
+        path.write_text(CANDUMP)
+        return str(path)
+    
+    def test_read_candump(self, candump):
+        """Test candump lines are parsed and remote frames skipped"""
+        frames = list(read_candump(candump))
+        
+        assert len(frames) == 4
+        assert frames[0] == TraceFrame(1700000000.0, 0x7E0, bytes([0x03, 0x22, 0xF1, 0x90]))
+    
+    def test_read_asc(self, tmp_path):
+        """Test ASC data lines are parsed and other lines skipped"""
+        path = tmp_path / "trace.asc"
+        path.write_text(ASC)
+        
+        frames = list(read_trace(str(path)))
+        
+        assert frames == [
+            TraceFrame(0.1, 0x7E0, bytes([0x03, 0x22, 0xF1, 0x90])),
+            TraceFrame(0.2, 0x18DA10F1, bytes([0x01, 0x3E])),
+        ]
+        assert list(read_asc(str(path))) == frames
+    
+    def test_unsupported_format(self):
+        """Test unknown trace extensions"""
+        with pytest.raises(ValueError):
+            read_trace("trace.xyz")
+    
+    def test_replay(self, ecu, candump):
+        """Test only request frames are replayed and responses yielded"""
+        player = TracePlayer.for_ecu(ecu, 0x7E0, 0x7E8)
+        
+        responses = list(player.play(read_candump(candump)))
+        
+        assert [frame.data[0] >> 4 for frame in responses] == [0x1, 0x2, 0x2, 0x0]
+        assert all(frame.arbitration_id == 0x7E8 for frame in responses)
+        assert player.frames_in == 4
+        assert player.frames_out == 4
+    
+    def test_realtime_replay(self, ecu):
+        """Test accurate-timing mode sleeps for the trace gaps"""
+        now = [0.0]
+        sleeps = []
+        
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+        
+        player = TracePlayer.for_ecu(ecu, 0x7E0, 0x7E8, realtime=True, speed=2.0,
+                                     clock=lambda: now[0], sleep=sleep)
+        frames = [TraceFrame(10.0 + i, 0x7E0, bytes([0x02, 0x3E, 0x00])) for i in range(3)]
+        list(player.play(frames))
+        
+        assert sleeps == [0.5, 0.5]
+    
+    def test_record_and_diff(self, ecu, candump, tmp_path):
+        """Test recordings of the same replay are identical and differences found"""
+        first = str(tmp_path / "first.rec")
+        second = str(tmp_path / "second.rec")
+        TracePlayer.for_ecu(ecu, 0x7E0, 0x7E8).record(read_candump(candump), first)
+        
+        other = VirtualECU("OTHER")
+        other.set_data_identifier(0xF190, b"WVWZZZ1JZXW000002")
+        TracePlayer.for_ecu(other, 0x7E0, 0x7E8).record(read_candump(candump), second)
+        
+        assert len(list(read_recording(first))) == 4
+        assert list(diff_recordings(first, first)) == []
+        assert [index for index, _, _ in diff_recordings(first, second)] == [2]
+    
+    def test_recorder_round_trip(self, tmp_path):
+        """Test recorded frames read back unchanged"""
+        path = str(tmp_path / "frames.rec")
+        frames = [TraceFrame(0.5, 0x7E8, b"\x02\x7E\x00"), TraceFrame(1.0, 0x18DAF110, b"")]
+        with TraceRecorder(path) as recorder:
+            for frame in frames:
+                recorder.write(frame)
+        
+        assert list(read_recording(path)) == frames
+    
+    def test_replay_through_gateway(self, tmp_path):
+        """Test a trace addressed to several ECUs"""
+        gateway = Gateway()
+        for i in range(3):
+            gateway.add_ecu(VirtualECU(f"ECU_{i}"), 0x7E0 + i, 0x7E8 + i)
+        frames = [TraceFrame(0.0, 0x7DF, bytes([0x02, 0x3E, 0x00]))]
+        
+        responses = list(TracePlayer(gateway).play(frames))
+        
+        assert [frame.arbitration_id for frame in responses] == [0x7E8, 0x7E9, 0x7EA]
@@ -0,0 +1,199 @@
+"""Tests for asyncio ISO-TP transport"""
+
+import asyncio
+import threading
+
+import pytest
+from src.transport import (
+    CANBus, ECUServer, IsoTpChannel, IsoTpConfig, IsoTpError, PythonCANBus, VirtualCANBus,
+    st_min_to_seconds
+)
+from src.virtual_ecu import VirtualECU
+
+
+def run(coro):
+    """Run a coroutine to completion"""
+    return asyncio.run(coro)
+
+
+class TestTransport:
+    """Test suite for asyncio transport"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create Virtual ECU with a long DID handler"""
+        ecu = VirtualECU("TEST_ECU")
+        ecu.set_data_identifier(0x0102, b"\x12\x34")
+        
+        @ecu.services.register(0x31)
+        def echo(ecu, payload):
+            return bytes([0x71]) + payload
+        
+        return ecu
+    
+    def test_st_min_to_seconds(self):
+        """Test STmin decoding"""
+        assert st_min_to_seconds(0x00) == 0
+        assert st_min_to_seconds(0x14) == 0.020
+        assert st_min_to_seconds(0xF5) == pytest.approx(0.0005)
+        assert st_min_to_seconds(0xFF) == 0.127
+    
+    def test_bus_is_abstract(self):
+        """Test a bus without ``send`` cannot be created"""
+        with pytest.raises(TypeError):
+            CANBus()
+    
+    def test_single_frame_request(self, ecu):
+        """Test single frame request / response through the server"""
+        async def scenario():
+            bus = VirtualCANBus()
+            async with ECUServer(bus) as server:
+                server.add_ecu(ecu, 0x7E0, 0x7E8)
+                tester = IsoTpChannel(bus, 0x7E8, 0x7E0)
+                return await tester.request(b"\x22\x01\x02", timeout=1)
+        
+        assert run(scenario()) == b"\x62\x01\x02\x12\x34"
+    
+    def test_multi_frame_both_directions(self, ecu):
+        """Test multi-frame request and response with block size and STmin"""
+        payload = bytes(range(200))
+        
+        async def scenario():
+            bus = VirtualCANBus()
+            config = IsoTpConfig(block_size=4, st_min=0xF1)
+            server = ECUServer(bus, config)
+            server.add_ecu(ecu, 0x7E0, 0x7E8)
+            await server.start()
+            tester = IsoTpChannel(bus, 0x7E8, 0x7E0, IsoTpConfig(block_size=3))
+            response = await tester.request(b"\x31" + payload, timeout=1)
+            await server.stop()
+            return response
+        
+        assert run(scenario()) == b"\x71" + payload
+    
+    def test_response_pending_while_busy(self, ecu):
+        """Test a handler thread lets NRC 0x78 go out before the handler returns"""
+        release = threading.Event()
+        
+        @ecu.services.register(0x31)
+        def slow_routine(ecu, payload):
+            release.wait(2)
+            return bytes([0x71]) + payload
+        ecu.session.p2_server = 0.02
+        ecu.session.p2_star_server = 0.05
+        
+        async def scenario():
+            bus = VirtualCANBus()
+            async with ECUServer(bus, handler_thread=True) as server:
+                server.add_ecu(ecu, 0x7E0, 0x7E8)
+                tester = IsoTpChannel(bus, 0x7E8, 0x7E0)
+                await tester.send(b"\x31\x01\xFF\x00")
+                messages = [await tester.recv(timeout=1) for _ in range(2)]
+                release.set()
+                while messages[-1][0] == 0x7F:
+                    messages.append(await tester.recv(timeout=1))
+                return messages
+        
+        messages = run(scenario())
+        assert messages[:2] == [b"\x7F\x31\x78"] * 2
+        assert messages[-1] == b"\x71\x01\xFF\x00"
+    
+    def test_bad_requests_keep_serving(self, ecu):
+        """Test an empty Single Frame and a raising handler do not end the serve loop"""
+        @ecu.services.register(0x85)
+        def broken(ecu, payload):
+            raise RuntimeError("handler bug")
+        
+        async def scenario(handler_thread):
+            bus = VirtualCANBus()
+            async with ECUServer(bus, handler_thread=handler_thread) as server:
+                server.add_ecu(ecu, 0x7E0, 0x7E8)
+                tester = IsoTpChannel(bus, 0x7E8, 0x7E0)
+                await bus.send(0x7E0, b"\x00")
+                empty = await tester.recv(timeout=1)
+                await tester.send(b"\x85\x01")
+                alive = await tester.request(b"\x3E\x00", timeout=1)
+                return empty, alive, server.request_errors
+        
+        for handler_thread in (False, True):
+            assert run(scenario(handler_thread)) == (b"\x7F\x00\x12", b"\x7E\x00", 1)
+    
+    def test_n_bs_timeout(self):
+        """Test sender gives up when no flow control arrives"""
+        async def scenario():
+            bus = VirtualCANBus()
+            tester = IsoTpChannel(bus, 0x7E8, 0x7E0, IsoTpConfig(n_bs=0.01))
+            await tester.send(bytes(20))
+        
+        with pytest.raises(IsoTpError):
+            run(scenario())
+    
+    def test_n_cr_timeout_recovers(self, ecu):
+        """Test server drops an incomplete message and keeps serving"""
+        async def scenario():
+            bus = VirtualCANBus()
+            server = ECUServer(bus, IsoTpConfig(n_cr=0.01))
+            server.add_ecu(ecu, 0x7E0, 0x7E8)
+            await server.start()
+            tester = IsoTpChannel(bus, 0x7E8, 0x7E0)
+            await bus.send(0x7E0, tester.docan.segment(bytes(20))[0])
+            assert (await tester._flow_control.get())[0] == 0x30
+            await asyncio.sleep(0.05)
+            response = await tester.request(b"\x3E\x00", timeout=1)
+            await server.stop()
+            return response
+        
+        assert run(scenario()) == b"\x7E\x00"
+    
+    def test_many_concurrent_testers(self):
+        """Test one server handles many ECUs and testers concurrently"""
+        async def scenario():
+            bus = VirtualCANBus()
+            server = ECUServer(bus)
+            testers = []
+            for i in range(100):
+                ecu = VirtualECU(f"ECU_{i:03d}")
+                ecu.set_data_identifier(0xF190, bytes([i]))
+                server.add_ecu(ecu, 0x600 + i, 0x700 + i)
+                testers.append(IsoTpChannel(bus, 0x700 + i, 0x600 + i))
+            await server.start()
+            responses = await asyncio.gather(
+                *(tester.request(b"\x22\xF1\x90", timeout=1) for tester in testers)
+            )
+            await server.stop()
+            return responses
+        
+        responses = run(scenario())
+        assert [r[3] for r in responses] == list(range(100))
+    
+    def test_can_fd_channel(self):
+        """Test a response over 4095 bytes on a CAN FD channel"""
+        ecu = VirtualECU("FD_ECU", frame_size=64)
+        ecu.set_data_identifier(0x0200, bytes(i & 0xFF for i in range(5000)))
+        fd = IsoTpConfig(frame_size=64)
+        
+        async def scenario():
+            bus = VirtualCANBus()
+            async with ECUServer(bus) as server:
+                server.add_ecu(ecu, 0x7E0, 0x7E8, fd)
+                tester = IsoTpChannel(bus, 0x7E8, 0x7E0, fd)
+                return await tester.request(b"\x22\x02\x00", timeout=1)
+        
+        assert run(scenario()) == b"\x62\x02\x00" + bytes(i & 0xFF for i in range(5000))
+    
+    def test_python_can_fd_frames(self):
+        """Test long frames go out as padded CAN FD frames on python-can"""
+        can = pytest.importorskip("can")
+        bus = PythonCANBus("fd_test", fd=True)
+        receiver = can.Bus(channel="fd_test", interface="virtual", fd=True)
+        try:
+            run(bus.send(0x7E8, bytes(10)))
+            run(bus.send(0x7E8, bytes(8)))
+            fd, classic = receiver.recv(1), receiver.recv(1)
+        finally:
+            bus.close()
+            receiver.shutdown()
+        
+        assert fd.is_fd and fd.bitrate_switch
+        assert bytes(fd.data) == bytes(10) + b"\xCC\xCC"
+        assert not classic.is_fd and bytes(classic.data) == bytes(8)
@@ -1,6 +1,9 @@
 """Tests for Virtual ECU implementation"""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from src.docan_bus import DoCAN
 from src.virtual_ecu import VirtualECU
 
 
@@ -86,8 +89,9 @@ class TestVirtualECU:
         response = ecu.process_request(request)
         
         assert response[1] == 0x59  # Positive response
-        # Response format: [SF_header, SID+0x40, sub_func, status, count_high, count_low]
-        assert response[4] == 0x02  # Number of DTCs (at index 4 for SF format)
+        # Response format: [SF_header, SID+0x40, sub_func, availability_mask,
+        #                   format_identifier, count_high, count_low]
+        assert response[5:7] == bytes([0x00, 0x02])  # Number of DTCs
     
     def test_unsupported_service(self, ecu):
         """Test unsupported service response"""
@@ -97,3 +101,391 @@ class TestVirtualECU:
         
         assert response[1] == 0x7F  # Negative response
         assert response[3] == 0x12  # Service not supported NRC
+    
+    def test_empty_single_frame(self, ecu):
+        """Test a Single Frame without a SID is answered with NRC 0x12"""
+        assert ecu.process_frame(b"\x00") == [b"\x03\x7F\x00\x12"]
+        assert ecu.process_uds_responses(b"") == [b"\x7F\x00\x12"]
+    
+    def test_multi_frame_request(self, ecu):
+        """Test multi-frame request is reassembled before dispatch"""
+        ecu.set_data_identifier(0x0102, b"\x00")
+        frames = ecu.docan.segment(bytes([0x2E, 0x01, 0x02]) + bytes(range(10)))
+        
+        flow_control = ecu.process_request(frames[0])
+        assert flow_control[0] == 0x30  # Flow control, continue to send
+        
+        response = ecu.process_request(frames[1])
+        assert response[1] == 0x6E  # Positive response
+        assert response[2:4] == bytes([0x01, 0x02])
+        assert ecu.data_identifiers[0x0102] == bytes(range(10))
+    
+    def test_register_custom_service(self, ecu):
+        """Test adding a service to one ECU without subclassing"""
+        @ecu.services.register(0x31, 0x01)
+        def start_routine(ecu, payload):
+            return bytes([0x71]) + payload[:3]
+        
+        response = ecu.process_request(bytes([0x04, 0x31, 0x01, 0xFF, 0x00]))
+        
+        assert response[1:] == bytes([0x71, 0x01, 0xFF, 0x00])
+        assert VirtualECU("OTHER").process_request(bytes([0x02, 0x31, 0x01]))[1] == 0x7F
+    
+    def test_process_many_matches_process_request(self, ecu):
+        """Test batched processing gives the same responses as per-frame calls"""
+        ecu.set_data_identifier(0x0102, b"\x12\x34")
+        requests = [
+            bytes([0x01, 0x3E]),
+            bytes([0x03, 0x22, 0x01, 0x02]),
+            bytes([0x02, 0x10, 0x03]),
+            bytes([0x01, 0xFF]),
+        ]
+        frames = b"".join(r.ljust(8, b"\x00") for r in requests)
+        
+        reference = VirtualECU("REF")
+        reference.set_data_identifier(0x0102, b"\x12\x34")
+        
+        out = ecu.process_many(frames)
+        
+        assert len(out) == len(frames)
+        for i, request in enumerate(requests):
+            expected = reference.process_request(request).ljust(8, b"\x00")
+            assert out[i * 8:i * 8 + 8] == expected
+    
+    def test_process_many_multi_frame(self, ecu):
+        """Test batched processing handles multi-frame requests"""
+        ecu.set_data_identifier(0x0102, b"\x00")
+        frames = ecu.docan.segment(bytes([0x2E, 0x01, 0x02]) + bytes(10))
+        out = ecu.process_many(memoryview(b"".join(f.ljust(8, b"\x00") for f in frames)))
+        
+        assert out[0] == 0x30  # Flow control for the first frame
+        assert out[9] == 0x6E  # Positive response after the consecutive frame
+    
+    def test_process_many_numpy(self, ecu):
+        """Test batched processing accepts a NumPy frame matrix"""
+        np = pytest.importorskip("numpy")
+        frames = np.zeros((3, 8), dtype=np.uint8)
+        frames[:, 0] = 0x01
+        frames[:, 1] = 0x3E
+        
+        out = ecu.process_many(frames)
+        
+        assert out == bytes([0x01, 0x7E] + [0] * 6) * 3
+    
+    def test_process_many_invalid_length(self, ecu):
+        """Test batched processing rejects partial frames"""
+        with pytest.raises(ValueError):
+            ecu.process_many(bytes(12))
+    
+    def test_read_dtc_by_status_mask(self, ecu):
+        """Test reportDTCByStatusMask filters on the status byte"""
+        ecu.add_dtc(0x123456, 0x09)
+        ecu.add_dtc(0x234567, 0x04)  # Pending only
+        
+        response = ecu.process_request(bytes([0x03, 0x19, 0x02, 0x08]))
+        
+        assert response[1:4] == bytes([0x59, 0x02, 0xFF])
+        assert response[4:] == bytes([0x12, 0x34, 0x56, 0x09])
+    
+    def test_count_dtc_by_status_mask(self, ecu):
+        """Test reportNumberOfDTCByStatusMask filters on the status byte"""
+        ecu.add_dtc(0x123456, 0x09)
+        ecu.add_dtc(0x234567, 0x04)
+        
+        response = ecu.process_request(bytes([0x03, 0x19, 0x01, 0x04]))
+        
+        assert response[5:7] == bytes([0x00, 0x01])
+    
+    def test_count_dtc_saturates(self, ecu):
+        """Test the 2-byte DTC count saturates instead of overflowing"""
+        for dtc in range(0x10000 + 5):
+            ecu.add_dtc(dtc)
+        
+        response = ecu.process_request(bytes([0x03, 0x19, 0x01, 0xFF]))
+        
+        assert response[5:7] == bytes([0xFF, 0xFF])
+    
+    def test_clear_diagnostic_information(self, ecu):
+        """Test ClearDiagnosticInformation for all DTCs and a single DTC"""
+        ecu.add_dtc(0x123456)
+        ecu.add_dtc(0x234567)
+        
+        response = ecu.process_request(bytes([0x04, 0x14, 0x12, 0x34, 0x56]))
+        assert response[1] == 0x54
+        assert list(ecu.dtc_codes) == [0x234567]
+        
+        response = ecu.process_request(bytes([0x04, 0x14, 0xFF, 0xFF, 0xFF]))
+        assert response[1] == 0x54
+        assert len(ecu.dtc_codes) == 0
+    
+    def test_clear_diagnostic_information_unknown_group(self, ecu):
+        """Test ClearDiagnosticInformation rejects unsupported groups"""
+        response = ecu.process_request(bytes([0x04, 0x14, 0x00, 0x00, 0x01]))
+        
+        assert response[1] == 0x7F
+        assert response[3] == 0x31  # Request out of range
+    
+    def test_write_data_identifier(self, ecu):
+        """Test Write Data By Identifier stores the value"""
+        ecu.set_data_identifier(0x0102, b"\x00\x00")
+        response = ecu.process_request(bytes([0x05, 0x2E, 0x01, 0x02, 0xAB, 0xCD]))
+        
+        assert response[1:4] == bytes([0x6E, 0x01, 0x02])
+        assert ecu.data_identifiers[0x0102] == b"\xAB\xCD"
+    
+    def test_write_unknown_data_identifier(self, ecu):
+        """Test Write Data By Identifier does not create DIDs"""
+        response = ecu.process_request(bytes([0x05, 0x2E, 0x01, 0x02, 0xAB, 0xCD]))
+        
+        assert response[3] == 0x31  # Request out of range
+        assert 0x0102 not in ecu.data_identifiers
+    
+    def test_write_data_identifier_too_short(self, ecu):
+        """Test Write Data By Identifier without a value"""
+        response = ecu.process_request(bytes([0x03, 0x2E, 0x01, 0x02]))
+        
+        assert response[3] == 0x13  # Incorrect length
+    
+    def test_read_data_identifier_full_length(self, ecu):
+        """Test long DID values are sent as First Frame + Consecutive Frames"""
+        vin = b"WVWZZZ1JZXW000001"
+        ecu.set_data_identifier(0xF190, vin)
+        
+        first_frame = ecu.process_frame(bytes([0x03, 0x22, 0xF1, 0x90]))
+        assert first_frame == [bytes([0x10, 0x14, 0x62, 0xF1, 0x90]) + vin[:3]]
+        
+        consecutive_frames = ecu.process_frame(bytes([0x30, 0x00, 0x00]))
+        assert [frame[0] for frame in consecutive_frames] == [0x21, 0x22]
+        
+        tester = DoCAN()
+        received = tester.reassemble(first_frame[0])
+        for frame in consecutive_frames:
+            received = tester.reassemble(frame)
+        assert received["data"] == b"\x62\xF1\x90" + vin
+    
+    def test_read_data_identifier_block_size(self, ecu):
+        """Test Flow Control block size limits each block of Consecutive Frames"""
+        ecu.set_data_identifier(0xF190, bytes(100))
+        ecu.process_frame(bytes([0x03, 0x22, 0xF1, 0x90]))
+        
+        assert len(ecu.process_frame(bytes([0x30, 0x04, 0x00]))) == 4
+        assert ecu.process_frame(bytes([0x31, 0x00, 0x00])) == []  # Wait
+        assert len(ecu.process_frame(bytes([0x30, 0x00, 0x00]))) == 10
+        assert ecu.process_frame(bytes([0x30, 0x00, 0x00])) == []  # Transfer done
+    
+    def test_read_multiple_data_identifiers(self, ecu):
+        """Test several DIDs in one request; unsupported DIDs are skipped"""
+        ecu.set_data_identifier(0x0102, b"\x12")
+        ecu.set_data_identifier(0x0103, b"\x34")
+        
+        response = ecu.process_request(bytes([0x07, 0x22, 0x01, 0x02, 0x99, 0x99, 0x01, 0x03]))
+        
+        assert response == bytes([0x07, 0x62, 0x01, 0x02, 0x12, 0x01, 0x03, 0x34])
+    
+    def test_read_data_identifier_unsupported(self, ecu):
+        """Test reading only unsupported DIDs"""
+        response = ecu.process_request(bytes([0x03, 0x22, 0x99, 0x99]))
+        
+        assert response[3] == 0x31  # Request out of range
+    
+    def test_clone_shares_tables(self, ecu):
+        """Test a clone reads the template's DIDs and DTCs without copying them"""
+        ecu.set_data_identifier(0xF190, b"VIN")
+        ecu.add_dtc(0x123456)
+        clone = ecu.clone("CLONE")
+        
+        assert clone.ecu_id == "CLONE"
+        assert clone.data_identifiers.base is ecu.data_identifiers.base
+        assert clone.process_uds_request(b"\x22\xF1\x90") == b"\x62\xF1\x90VIN"
+        assert clone.dtc_codes.count_by_status_mask(0xFF) == 1
+    
+    def test_clone_writes_are_private(self, ecu):
+        """Test DID and DTC writes on a clone or its template stay local"""
+        ecu.set_data_identifier(0x0102, b"\x01")
+        ecu.add_dtc(0x123456)
+        clone = ecu.clone()
+        
+        assert clone.process_uds_request(b"\x2E\x01\x02\x02") == b"\x6E\x01\x02"
+        clone.add_dtc(0x654321)
+        ecu.set_data_identifier(0x0103, b"\x03")
+        ecu.process_uds_request(b"\x14\xFF\xFF\xFF")
+        
+        assert ecu.data_identifiers[0x0102] == b"\x01"
+        assert 0x0103 not in clone.data_identifiers
+        assert clone.data_identifiers[0x0102] == b"\x02"
+        assert list(clone.dtc_codes) == [0x123456, 0x654321]
+        assert len(ecu.dtc_codes) == 0
+    
+    def test_clone_of_written_clone(self, ecu):
+        """Test cloning a clone carries its written DIDs"""
+        ecu.set_data_identifier(0x0102, b"\x01")
+        first = ecu.clone()
+        first.set_data_identifier(0x0103, b"\x03")
+        second = first.clone()
+        first.set_data_identifier(0x0103, b"\x04")
+        
+        assert sorted(second.data_identifiers.keys()) == [0x0102, 0x0103]
+        assert second.data_identifiers[0x0103] == b"\x03"
+        assert len(second.data_identifiers) == 2
+    
+    def test_clone_session_configuration(self, ecu):
+        """Test clones copy session settings but start in the default session"""
+        ecu.session.s3_server = 1.5
+        ecu.process_uds_request(b"\x10\x03")
+        clone = ecu.clone()
+        
+        assert clone.session.session == 0x01
+        assert clone.session.s3_server == 1.5
+        assert clone.session.timers is ecu.session.timers
+    
+    def test_clone_has_fresh_state(self, ecu):
+        """Test a clone gets every attribute of a new ECU, without optional features"""
+        ecu.enable_metrics()
+        ecu.enable_response_cache()
+        clone = ecu.clone()
+        
+        assert vars(clone).keys() == vars(VirtualECU()).keys()
+        assert (clone.metrics, clone.response_cache, clone.state_version) == (None, None, 0)
+        assert clone._write_lock is not ecu._write_lock
+
+
+class TestChannelContext:
+    """Test suite for per-tester channels"""
+    
+    @pytest.fixture
+    def ecu(self):
+        """Create ECU with a long DID"""
+        ecu = VirtualECU("CHANNEL_ECU")
+        ecu.set_data_identifier(0xF190, bytes(range(20)))
+        return ecu
+    
+    def test_sessions_are_per_tester(self, ecu):
+        """Test a session change on one channel leaves the others alone"""
+        assert ecu.channel(0x7E0).process_request(b"\x02\x10\x03")[1] == 0x50
+        
+        assert ecu.channel(0x7E0).session.session == 0x03
+        assert ecu.channel(0x7E1).session.session == 0x01
+        assert ecu.session.session == 0x01
+        assert ecu.channel(0x7E0) is ecu.channel(0x7E0)
+    
+    def test_reassembly_is_per_tester(self, ecu):
+        """Test interleaved multi-frame requests from two testers"""
+        first, second = ecu.channel(0x7E0), ecu.channel(0x7E1)
+        ecu.set_data_identifier(0x0100, b"")
+        ecu.set_data_identifier(0x0200, b"")
+        
+        assert first.process_frame(b"\x10\x0A\x2E\x01\x00\x11\x11\x11") == [b"\x30\x00\x00"]
+        assert second.process_frame(b"\x10\x0A\x2E\x02\x00\x22\x22\x22") == [b"\x30\x00\x00"]
+        assert first.process_frame(b"\x21\x11\x11\x11\x11") == [b"\x03\x6E\x01\x00"]
+        assert second.process_frame(b"\x21\x22\x22\x22\x22") == [b"\x03\x6E\x02\x00"]
+        assert ecu.data_identifiers[0x0100] == b"\x11" * 7
+        assert ecu.data_identifiers[0x0200] == b"\x22" * 7
+    
+    def test_shared_tables(self, ecu):
+        """Test DIDs, DTCs and metrics are shared with the ECU"""
+        metrics = ecu.enable_metrics()
+        channel = ecu.channel(0x7E0)
+        ecu.add_dtc(0xC0FF01)
+        
+        assert channel.process_request(b"\x03\x19\x01\xFF")[-1] == 1
+        assert channel.process_request(b"\x04\x14\xFF\xFF\xFF") == b"\x01\x54"
+        assert len(ecu.dtc_codes) == 0
+        assert metrics.frames_received[DoCAN.SINGLE_FRAME] == 2
+    
+    def test_dynamic_dids_shared(self, ecu):
+        """Test channels define dynamic DIDs in one shared table"""
+        requests = [(tester, b"\x2C\x01" + bytes([0xF2, tester]) + b"\xF1\x90\x01\x02")
+                    for tester in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(ecu.channel(tester).process_uds_request, request)
+                       for tester, request in requests]
+            assert [future.result()[0] for future in futures] == [0x6C] * 8
+        
+        assert sorted(ecu.dynamic_dids.plans) == [0xF200 + tester for tester in range(8)]
+        assert ecu.channel(0x7E0).process_request(b"\x03\x22\xF2\x07") == \
+            b"\x05\x62\xF2\x07\x00\x01"
+    
+    def test_rejected_definition_keeps_version(self, ecu):
+        """Test a rejected 0x2C request leaves cached responses valid"""
+        version = ecu.state_version
+        
+        assert ecu.process_uds_request(b"\x2C\x01\x01\x00\xF1\x90\x01\x02")[2] == 0x31
+        assert ecu.state_version == version
+        assert ecu.process_uds_request(b"\x2C\x01\xF2\x01\xF1\x90\x01\x02") == \
+            b"\x6C\x01\xF2\x01"
+        assert ecu.state_version == version + 1
+    
+    def test_dtc_reads_while_adding(self, ecu):
+        """Test DTC reports on one channel while DTCs are added elsewhere"""
+        for dtc in range(100):
+            ecu.add_dtc(0x100000 + dtc)
+        channel = ecu.channel(0x7E0)
+        
+        def add():
+            for dtc in range(2000):
+                ecu.add_dtc(0x200000 + dtc)
+        
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            adding = pool.submit(add)
+            while not adding.done():
+                assert channel.process_uds_request(b"\x19\x02\xFF")[:2] == b"\x59\x02"
+            adding.result()
+        assert len(channel.process_uds_request(b"\x19\x02\xFF")) == 3 + 4 * 2100
+    
+    def test_process_concurrently(self, ecu):
+        """Test frames from many testers on a thread pool"""
+        requests = []
+        for tester in range(16):
+            ecu.set_data_identifier(0x1000 | tester, b"\x00")
+            requests += [(tester, b"\x02\x10\x03"), (tester, b"\x03\x22\xF1\x90"),
+                         (tester, b"\x30\x00\x00"),
+                         (tester, bytes([0x04, 0x2E, 0x10, tester, 0xAA]))]
+        results = ecu.process_concurrently(requests)
+        
+        assert sorted(results) == list(range(16))
+        for tester, frames in results.items():
+            assert frames[1][0][:5] == b"\x10\x17\x62\xF1\x90"
+            assert len(frames[2]) == 3
+            assert frames[3] == [bytes([0x03, 0x6E, 0x10, tester])]
+            assert ecu.channel(tester).session.session == 0x03
+        assert all(ecu.data_identifiers[0x1000 | tester] == b"\xAA" for tester in range(16))
+
+
+class TestCANFDFramePath:
+    """Test suite for CAN FD frame sizes on the ECU frame path"""
+    
+    def test_escaped_single_frame_response(self):
+        """Test a 40-byte response fits one CAN FD frame"""
+        ecu = VirtualECU("FD_ECU", frame_size=64)
+        ecu.set_data_identifier(0xF190, bytes(range(40)))
+        
+        assert ecu.process_frame(b"\x03\x22\xF1\x90") == \
+            [b"\x00\x2B\x62\xF1\x90" + bytes(range(40))]
+        assert ecu.process_frame(b"\x00\x03\x22\xF1\x90") == ecu.process_frame(b"\x03\x22\xF1\x90")
+    
+    def test_process_many_uses_frame_size(self):
+        """Test batches are split into slots of the frame size"""
+        ecu = VirtualECU("FD_ECU", frame_size=16)
+        ecu.set_data_identifier(0x0100, bytes(range(10)))
+        out = ecu.process_many(b"\x03\x22\x01\x00".ljust(16, b"\x00") * 2)
+        
+        assert bytes(out[:16]) == b"\x00\x0D\x62\x01\x00" + bytes(range(10)) + b"\x00"
+        assert out[16:] == out[:16]
+        with pytest.raises(ValueError):
+            ecu.process_many(bytes(8))
+    
+    def test_oversized_first_frame(self):
+        """Test a First Frame over the receive limit gets FC OVFLW"""
+        ecu = VirtualECU("CLASSIC_ECU")
+        
+        assert ecu.process_frame(b"\x10\x00\x10\x00\x00\x00\x00\x00") == [b"\x32\x00\x00"]
+        assert ecu.docan.expected_length == 0
+    
+    def test_frame_size_per_channel(self):
+        """Test classic and CAN FD testers on one ECU"""
+        ecu = VirtualECU("MIXED_ECU")
+        ecu.set_data_identifier(0xF190, bytes(range(40)))
+        
+        assert ecu.channel(0xF1).process_frame(b"\x03\x22\xF1\x90")[0][:2] == b"\x10\x2B"
+        fd_channel = ecu.channel(0xF2, frame_size=64)
+        assert fd_channel.process_frame(b"\x03\x22\xF1\x90")[0][:2] == b"\x00\x2B"